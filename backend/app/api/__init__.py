@@ -19,6 +19,7 @@ from .routes.admin import router as admin_router
 from .routes.download_clients import router as download_clients_router
 from .routes.quality_profiles import router as quality_profiles_router  # ADDED - NEW
 from .routes.search import router as search_router  # ADDED - NEW
+from .routes.downloads import router as downloads_router
 
 # Include routers
 # NOTE: Don't add prefix here if the router already has one defined!
@@ -31,9 +32,10 @@ router.include_router(admin_router, tags=["Admin"])
 router.include_router(download_clients_router, tags=["Download Clients"])
 router.include_router(quality_profiles_router, tags=["Quality Profiles"])  # ADDED - NEW
 router.include_router(search_router, tags=["Search"])  # ADDED - NEW
+router.include_router(downloads_router, tags=["Downloads"])
 
 # TODO: Implement these routers
-# from .routes import authors, downloads, settings
+# from .routes import authors, settings
 # router.include_router(authors.router, prefix="/authors", tags=["Authors"])
 # router.include_router(settings.router, prefix="/settings", tags=["Settings"])
 
@@ -52,6 +54,7 @@ async def api_status():
             "download_clients": "/api/download-clients - Manage download clients (Deluge, qBittorrent)",
             "quality_profiles": "/api/quality-profiles - Manage format preferences",  # ADDED - NEW
             "search": "/api/search - Search and download books",  # ADDED - NEW
+            "downloads": "/api/downloads - Download progress (and a live stream)",
             "authors": "/api/authors - (Coming soon)",
             "settings": "/api/settings - (Coming soon)"
         }
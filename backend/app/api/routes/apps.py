@@ -20,6 +20,8 @@ from backend.app.schemas.apps import (
     TestStatus
 )
 from backend.app.services.app_tester import app_tester
+from backend.app.services.indexer_catalog import indexer_catalog
+from backend.app.services.jackett_session import jackett_sessions
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/apps", tags=["apps"])
@@ -93,6 +95,7 @@ async def create_app(
     db.add(new_app)
     await db.commit()
     await db.refresh(new_app)
+    indexer_catalog.invalidate()
     
     # AUTO-SYNC INDEXERS for Prowlarr/Jackett
     if new_app.app_type in ['prowlarr', 'jackett']:
@@ -139,6 +142,7 @@ async def update_app(
     
     await db.commit()
     await db.refresh(app)
+    indexer_catalog.invalidate()
     
     return AppResponse.model_validate(app)
 
@@ -170,6 +174,9 @@ async def delete_app(
     await db.delete(app)
     await db.commit()
     
+    jackett_sessions.forget(app_id)
+    indexer_catalog.invalidate()
+    
     return None
 
 @router.post("/cleanup")
@@ -197,6 +204,8 @@ async def cleanup_orphaned_data(
             await db.delete(indexer)
         
         await db.commit()
+        if deleted_count:
+            indexer_catalog.invalidate()
         
         return {
             "success": True,
@@ -4,6 +4,7 @@
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import datetime, timedelta
@@ -17,8 +18,10 @@ from backend.app.schemas.books import (
     BookUpdate
 )
 from backend.app.services.metadata_manager import metadata_manager
+from backend.app.services.metadata_snapshot import metadata_snapshot
 from sqlalchemy import select, func, or_, and_
 import logging
+import orjson
 
 router = APIRouter(prefix="/books", tags=["books"])
 logger = logging.getLogger(__name__)
@@ -45,6 +48,41 @@ def deserialize_book_categories(book, db_session=None):
     return book
 
 
+# List endpoints select exactly the BookResponse columns and build the JSON
+# from row tuples - no ORM objects, no per-row pydantic validation
+_BOOK_FIELDS = tuple(BookResponse.model_fields)
+_BOOK_COLUMNS = tuple(getattr(Book, field) for field in _BOOK_FIELDS)
+
+
+def _parse_categories(value):
+    """Categories column (JSON string) -> list"""
+    if value is None:
+        return None
+    try:
+        categories = orjson.loads(value)
+    except orjson.JSONDecodeError:
+        return []
+    return categories if isinstance(categories, list) else []
+
+
+def book_list_response(rows, total: int, page: int, page_size: int) -> ORJSONResponse:
+    """Serialize `_BOOK_COLUMNS` rows as a BookListResponse body"""
+    fields = _BOOK_FIELDS
+    books = []
+    for row in rows:
+        book = dict(zip(fields, row))
+        book["categories"] = _parse_categories(book["categories"])
+        books.append(book)
+    
+    return ORJSONResponse({
+        "books": books,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "pages": (total + page_size - 1) // page_size
+    })
+
+
 @router.get("", response_model=BookListResponse)
 async def get_books(
     page: int = Query(1, ge=1),
@@ -67,7 +105,7 @@ async def get_books(
     offset = (page - 1) * page_size
     
     # Build query - join with libraries to get library_type
-    query = select(Book).join(Library, Book.library_id == Library.id)
+    query = select(*_BOOK_COLUMNS).join(Library, Book.library_id == Library.id)
     count_query = select(func.count(Book.id)).select_from(Book).join(Library, Book.library_id == Library.id)
     
     filters = []
@@ -95,21 +133,8 @@ async def get_books(
     # Get paginated books
     query = query.offset(offset).limit(page_size).order_by(Book.created_at.desc())
     result = await db.execute(query)
-    books = list(result.scalars().all())
-    
-    # Deserialize categories for each book (expunge to prevent auto-save)
-    books = [deserialize_book_categories(book, db) for book in books]
-    
-    # Calculate total pages
-    pages = (total + page_size - 1) // page_size
     
-    return BookListResponse(
-        books=books,
-        total=total,
-        page=page,
-        page_size=page_size,
-        pages=pages
-    )
+    return book_list_response(result.all(), total, page, page_size)
 
 
 @router.get("/search", response_model=BookListResponse)
@@ -141,7 +166,7 @@ async def search_books(
         db: Database session
     """
     # Build base query with library join
-    search_query = select(Book).join(Library, Book.library_id == Library.id)
+    search_query = select(*_BOOK_COLUMNS).join(Library, Book.library_id == Library.id)
     
     # Apply filters
     filters = []
@@ -197,21 +222,8 @@ async def search_books(
     
     # Execute
     result = await db.execute(search_query)
-    books = list(result.scalars().all())
     
-    # Deserialize categories for each book (expunge to prevent auto-save)
-    books = [deserialize_book_categories(book, db) for book in books]
-    
-    # Calculate pages
-    pages = (total + page_size - 1) // page_size
-    
-    return BookListResponse(
-        books=books,
-        total=total,
-        page=page,
-        page_size=page_size,
-        pages=pages
-    )
+    return book_list_response(result.all(), total, page, page_size)
 
 
 @router.get("/stats")
@@ -352,6 +364,12 @@ async def update_book(
             
             logger.info(f"📝 Metadata saved for '{book.title}': {results}")
             
+            # 🗄️ Record the edit in the library snapshot
+            if book.library_id:
+                library = await db.get(Library, book.library_id)
+                if library:
+                    metadata_snapshot.put(library.path, book)
+            
         except Exception as e:
             # Don't fail the update if metadata save fails
             logger.error(f"Failed to save metadata files: {e}")
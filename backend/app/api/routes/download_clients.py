@@ -290,7 +290,8 @@ async def test_download_client_connection(
         username=test_request.username,
         password=test_request.password,
         api_key=test_request.api_key,
-        use_ssl=test_request.use_ssl
+        use_ssl=test_request.use_ssl,
+        config=test_request.config
     )
     
     return result
@@ -318,7 +319,8 @@ async def test_existing_download_client(
         username=client.username,
         password=client.password,
         api_key=client.api_key,
-        use_ssl=client.use_ssl
+        use_ssl=client.use_ssl,
+        config=client.config
     )
     
     # Update client with test results
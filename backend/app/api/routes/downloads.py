@@ -0,0 +1,144 @@
+# File: backend/app/api/routes/downloads.py
+"""
+Downloads API Routes
+Progress of grabs sent to download clients
+"""
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.api.routes.search import stream_frame
+from backend.app.db.database import get_db
+from backend.app.db.models.download import Download
+from backend.app.services.client_balancer import client_balancer
+from backend.app.services.download_tracker import download_tracker
+
+router = APIRouter(prefix="/downloads", tags=["downloads"])
+
+# Seconds between keep-alive events on an idle stream
+STREAM_PING_INTERVAL = 15.0
+
+
+@router.get("")
+async def list_downloads(
+    status_filter: Optional[str] = Query(None, alias="status", description="Filter by status (queued, downloading, completed, ...)"),
+    active_only: bool = Query(False, description="Only downloads still being tracked"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """List downloads, newest first"""
+    query = select(Download)
+    
+    if status_filter:
+        query = query.where(Download.status == status_filter)
+    elif active_only:
+        query = query.where(Download.status.in_(download_tracker.TRACKED_STATUSES))
+    
+    result = await db.execute(query.order_by(Download.created_at.desc()).limit(limit))
+    downloads = [download.to_dict() for download in result.scalars().all()]
+    
+    return {
+        "downloads": downloads,
+        "total": len(downloads),
+        "tracker": download_tracker.status(),
+        "clients": client_balancer.status()
+    }
+
+
+@router.get("/stream")
+async def stream_downloads(
+    format: str = Query("sse", pattern="^(ndjson|sse)$", description="Stream framing: ndjson or sse"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Push download progress as it changes
+    
+    Starts with a `snapshot` event of all tracked downloads, then sends
+    `added` for new grabs, `progress` with the downloads that changed
+    on each poll and `imported` after finished downloads were imported;
+    `ping` keeps idle connections open.
+    """
+    # Subscribe before reading the snapshot so no change falls in between
+    queue = download_tracker.subscribe()
+    try:
+        result = await db.execute(
+            select(Download)
+            .where(Download.status.in_(download_tracker.TRACKED_STATUSES))
+            .order_by(Download.created_at.desc())
+        )
+        snapshot = [download.to_dict() for download in result.scalars().all()]
+    except Exception:
+        download_tracker.unsubscribe(queue)
+        raise
+    
+    async def events():
+        try:
+            yield stream_frame("snapshot", {"downloads": snapshot}, format)
+            while True:
+                try:
+                    event, downloads = await asyncio.wait_for(queue.get(), STREAM_PING_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield stream_frame("ping", {}, format)
+                    continue
+                yield stream_frame(event, {"downloads": downloads}, format)
+        finally:
+            download_tracker.unsubscribe(queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if format == "sse" else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/poll")
+async def poll_downloads():
+    """Refresh progress from the download clients now"""
+    active = await download_tracker.poll_once()
+    download_tracker.wake()
+    return {"active": active, "tracker": download_tracker.status()}
+
+
+@router.get("/{download_id}")
+async def get_download(
+    download_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a specific download by ID"""
+    download = (await db.execute(select(Download).where(Download.id == download_id))).scalar_one_or_none()
+    
+    if not download:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Download with ID {download_id} not found"
+        )
+    
+    return download.to_dict()
+
+
+@router.post("/{download_id}/import")
+async def import_download(
+    download_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Import a completed download into its library (again)"""
+    download = (await db.execute(select(Download).where(Download.id == download_id))).scalar_one_or_none()
+    
+    if not download:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Download with ID {download_id} not found"
+        )
+    
+    if download.status not in ("completed", "imported"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Download is {download.status}, not completed"
+        )
+    
+    results = await download_tracker.import_downloads([download_id])
+    return results[0] if results else {"id": download_id, "success": False, "error": "Nothing imported"}
@@ -10,50 +10,62 @@ from pydantic import BaseModel
 from backend.app.db.database import get_db
 from backend.app.db.models.indexer import Indexer
 from backend.app.db.models.app import App
+from backend.app.config import settings
+from backend.app.services.indexer_catalog import indexer_catalog
+from backend.app.services.indexer_health import indexer_health
 from backend.app.services.indexer_sync import indexer_sync_service
+from backend.app.services.search_service import search_service
 
 router = APIRouter()
 
 
+def _indexer_health(indexer: Indexer, app: App) -> Optional[dict]:
+    """
+    Live health for an indexer: latency histogram, error rate, adaptive
+    timeout and circuit state. Prowlarr indexers (and Jackett in aggregate
+    mode) are searched through their app, so they report the app's health.
+    """
+    if app.app_type == "jackett" and settings.jackett_per_tracker:
+        return indexer_health.snapshot(indexer_health.indexer_key(indexer.id), settings.jackett_tracker_timeout)
+    return indexer_health.snapshot(indexer_health.app_key(app.id), search_service.timeout)
+
+
 @router.get("/indexers")
 async def list_indexers(
     enabled_only: bool = Query(False, description="Filter to enabled indexers only"),
     protocol: Optional[str] = Query(None, description="Filter by protocol (torrent/usenet)"),
     configured_only: bool = Query(False, description="Filter to configured indexers only"),
-    search: Optional[str] = Query(None, description="Search indexer names"),
-    db: AsyncSession = Depends(get_db)
+    search: Optional[str] = Query(None, description="Search indexer names")
 ):
     """
-    List all indexers with optional filters
+    List all indexers with optional filters (served from the in-memory indexer catalog)
     """
-    query = select(Indexer, App).join(App, Indexer.app_id == App.id)
+    entries = await indexer_catalog.entries()
     
     if enabled_only:
-        query = query.where(Indexer.enabled == True)
+        entries = [entry for entry in entries if entry.indexer.enabled]
     
     if configured_only:
-        query = query.where(Indexer.configured == True)
+        entries = [entry for entry in entries if entry.indexer.configured]
     
     if protocol:
-        query = query.where(Indexer.protocol == protocol.lower())
+        protocol = protocol.lower()
+        entries = [entry for entry in entries if entry.indexer.protocol == protocol]
     
     if search:
-        query = query.where(Indexer.name.ilike(f"%{search}%"))
-    
-    # Order by priority (lower = higher priority), then by name
-    query = query.order_by(Indexer.priority.asc(), Indexer.name.asc())
-    
-    result = await db.execute(query)
-    rows = result.all()
+        search = search.lower()
+        entries = [entry for entry in entries if search in entry.indexer.name.lower()]
     
+    # Entries are already ordered by priority (lower = higher priority), then by name
     indexers = []
-    for indexer, app in rows:
+    for entry in entries:
+        indexer, app = entry.indexer, entry.app
         indexers.append({
             "id": indexer.id,
             "name": indexer.name,
             "description": indexer.description,
             "protocol": indexer.protocol,
-            "categories": indexer.categories.split(",") if indexer.categories else [],
+            "categories": entry.categories,
             "enabled": indexer.enabled,
             "configured": indexer.configured,
             "priority": indexer.priority,
@@ -62,23 +74,13 @@ async def list_indexers(
             "total_searches": indexer.total_searches or 0,
             "total_grabs": indexer.total_grabs or 0,
             "last_search_at": indexer.last_search_at.isoformat() if indexer.last_search_at else None,
-            "last_sync_at": indexer.last_sync_at.isoformat() if indexer.last_sync_at else None
+            "last_sync_at": indexer.last_sync_at.isoformat() if indexer.last_sync_at else None,
+            "health": _indexer_health(indexer, app)
         })
     
-    # Get summary stats - simple count approach
-    all_indexers_query = select(Indexer)
-    all_result = await db.execute(all_indexers_query)
-    all_indexers_list = all_result.scalars().all()
-    
-    stats = {
-        "total": len(all_indexers_list),
-        "enabled": sum(1 for idx in all_indexers_list if idx.enabled),
-        "configured": sum(1 for idx in all_indexers_list if idx.configured)
-    }
-    
     return {
         "indexers": indexers,
-        "stats": stats
+        "stats": await indexer_catalog.counts()
     }
 
 
@@ -117,6 +119,7 @@ async def get_indexer(
         "total_grabs": indexer.total_grabs or 0,
         "last_search_at": indexer.last_search_at.isoformat() if indexer.last_search_at else None,
         "last_sync_at": indexer.last_sync_at.isoformat() if indexer.last_sync_at else None,
+        "health": _indexer_health(indexer, app),
         "created_at": indexer.created_at.isoformat(),
         "updated_at": indexer.updated_at.isoformat()
     }
@@ -148,6 +151,7 @@ async def update_indexer(
     
     await db.commit()
     await db.refresh(indexer)
+    indexer_catalog.update_indexers([indexer.id], enabled=indexer.enabled, priority=indexer.priority)
     
     return {
         "id": indexer.id,
@@ -197,6 +201,7 @@ async def bulk_enable_indexers(
     stmt = update(Indexer).where(Indexer.id.in_(request.indexer_ids)).values(enabled=request.enabled)
     await db.execute(stmt)
     await db.commit()
+    indexer_catalog.update_indexers(request.indexer_ids, enabled=request.enabled)
     
     return {
         "status": "success",
@@ -223,6 +228,7 @@ async def delete_indexer(
     
     await db.delete(indexer)
     await db.commit()
+    indexer_catalog.remove_indexer(indexer_id)
     
     return {
         "status": "success",
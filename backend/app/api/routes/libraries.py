@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text
+from sqlalchemy import select, text, insert
 from typing import List, Optional
 from datetime import datetime
 import logging
@@ -10,6 +10,7 @@ from pathlib import Path
 from backend.app.db.database import get_db
 from backend.app.db.models.library import Library
 from backend.app.services.library_scanner import LibraryScanner
+from backend.app.services.metadata_snapshot import metadata_snapshot
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
@@ -282,6 +283,82 @@ async def scan_library(
     )
 
 
+@router.post("/{library_id}/restore")
+async def restore_library_from_snapshot(
+    library_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Rebuild a library's books from its metadata snapshot
+    
+    Reads the snapshot file in the library folder and bulk-inserts every book
+    whose file still exists and isn't already in the database. No rescan and
+    no metadata lookups - useful after database loss or migration.
+    """
+    from backend.app.db.models.book import Book
+    
+    logger.info(f"🗄️ [API] Restoring library {library_id} from snapshot")
+    
+    library = await db.get(Library, library_id)
+    if not library:
+        raise HTTPException(status_code=404, detail="Library not found")
+    
+    try:
+        entries = metadata_snapshot.read(library.path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not entries:
+        raise HTTPException(status_code=404, detail="No metadata snapshot found for this library")
+    
+    result = await db.execute(
+        text("SELECT file_path FROM books WHERE library_id = :library_id"),
+        {"library_id": library_id}
+    )
+    existing_paths = {row[0] for row in result.fetchall()}
+    
+    rows = []
+    missing = 0
+    for payload in entries.values():
+        file_path = os.path.normpath(os.path.join(library.path, payload.get('path', '')))
+        if file_path in existing_paths:
+            continue
+        if not os.path.exists(file_path):
+            missing += 1
+            continue
+        
+        row = {field: payload.get(field) for field in metadata_snapshot.FIELDS}
+        row.update(
+            library_id=library_id,
+            title=row.get('title') or Path(file_path).stem,
+            file_path=file_path,
+            monitored=bool(row.get('monitored')),
+            status=row.get('status') or 'available'
+        )
+        rows.append(row)
+        existing_paths.add(file_path)
+    
+    if rows:
+        await db.execute(insert(Book), rows)
+    
+    result = await db.execute(
+        text("SELECT COUNT(*) FROM books WHERE library_id = :library_id"),
+        {"library_id": library_id}
+    )
+    library.total_items = result.scalar_one()
+    await db.commit()
+    
+    logger.info(f"✅ [LIBRARY] Restored {len(rows)} books into {library.name} ({missing} missing on disk)")
+    
+    return {
+        "status": "restored",
+        "library_id": library_id,
+        "restored": len(rows),
+        "already_present": len(entries) - len(rows) - missing,
+        "missing_files": missing
+    }
+
+
 @router.get("/{library_id}/scan/status")
 async def get_scan_status(library_id: int):
     """
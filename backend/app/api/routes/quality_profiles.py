@@ -11,12 +11,12 @@ import json
 
 from backend.app.db.database import get_db
 from backend.app.db.models.quality_profile import QualityProfile
+from backend.app.services.quality_profiles import quality_engine
 from backend.app.schemas.quality_profiles import (
     QualityProfileCreate,
     QualityProfileUpdate,
     QualityProfileResponse,
     QualityProfileListResponse,
-    FormatItem,
     DEFAULT_PROFILES
 )
 
@@ -41,16 +41,14 @@ async def list_quality_profiles(
     result = await db.execute(query)
     profiles = result.scalars().all()
     
-    # Deserialize format_items JSON
+    # format_items come from the compiled profile (parsed once per version)
     response_profiles = []
     for profile in profiles:
-        format_items = json.loads(profile.format_items) if profile.format_items else []
-        
         profile_dict = {
             "id": profile.id,
             "name": profile.name,
             "description": profile.description,
-            "format_items": [FormatItem(**item) for item in format_items],
+            "format_items": quality_engine.compile(profile).format_items,
             "cutoff_format": profile.cutoff_format,
             "allow_upgrades": profile.allow_upgrades,
             "upgrade_until_cutoff": profile.upgrade_until_cutoff,
@@ -85,14 +83,11 @@ async def get_quality_profile(
             detail=f"Quality profile with ID {profile_id} not found"
         )
     
-    # Deserialize format_items
-    format_items = json.loads(profile.format_items) if profile.format_items else []
-    
     profile_dict = {
         "id": profile.id,
         "name": profile.name,
         "description": profile.description,
-        "format_items": [FormatItem(**item) for item in format_items],
+        "format_items": quality_engine.compile(profile).format_items,
         "cutoff_format": profile.cutoff_format,
         "allow_upgrades": profile.allow_upgrades,
         "upgrade_until_cutoff": profile.upgrade_until_cutoff,
@@ -158,12 +153,11 @@ async def create_quality_profile(
     await db.refresh(new_profile)
     
     # Return response
-    format_items = json.loads(new_profile.format_items)
     profile_dict = {
         "id": new_profile.id,
         "name": new_profile.name,
         "description": new_profile.description,
-        "format_items": [FormatItem(**item) for item in format_items],
+        "format_items": quality_engine.compile(new_profile).format_items,
         "cutoff_format": new_profile.cutoff_format,
         "allow_upgrades": new_profile.allow_upgrades,
         "upgrade_until_cutoff": new_profile.upgrade_until_cutoff,
@@ -224,12 +218,11 @@ async def update_quality_profile(
     await db.refresh(profile)
     
     # Return response
-    format_items = json.loads(profile.format_items)
     profile_dict = {
         "id": profile.id,
         "name": profile.name,
         "description": profile.description,
-        "format_items": [FormatItem(**item) for item in format_items],
+        "format_items": quality_engine.compile(profile).format_items,
         "cutoff_format": profile.cutoff_format,
         "allow_upgrades": profile.allow_upgrades,
         "upgrade_until_cutoff": profile.upgrade_until_cutoff,
@@ -275,6 +268,7 @@ async def delete_quality_profile(
     
     await db.delete(profile)
     await db.commit()
+    quality_engine.invalidate(profile_id)
     
     return None
 
@@ -4,17 +4,25 @@ Search API Routes
 Search for books across indexers and send to download clients
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import logging
+import orjson
+import time
 
 from backend.app.db.database import get_db
 from backend.app.db.models.book import Book
-from backend.app.db.models.quality_profile import QualityProfile
 from backend.app.services.search_service import search_service
+from backend.app.services.search_cache import search_cache
+from backend.app.services.bulk_search import bulk_search
+from backend.app.services.indexer_catalog import indexer_catalog
+from backend.app.services.indexer_limiter import indexer_limiter
 from backend.app.services.download_manager import download_manager
+from backend.app.services.quality_profiles import quality_engine
+from backend.app.services.rss_monitor import rss_monitor
 
 router = APIRouter(prefix="/search", tags=["search"])
 logger = logging.getLogger(__name__)
@@ -26,6 +34,8 @@ class SearchRequest(BaseModel):
     indexer_ids: Optional[List[int]] = None
     categories: Optional[List[str]] = None
     limit: int = 100
+    timeout: Optional[float] = Field(None, gt=0, le=300, description="Search deadline in seconds, per source from when its request is sent")
+    bypass_cache: bool = False  # Always query indexers (fresh results still refresh the cache)
 
 
 class SearchResponse(BaseModel):
@@ -33,6 +43,18 @@ class SearchResponse(BaseModel):
     results: List[dict]
     total: int
     query: str
+    partial: bool = False  # True if any source timed out or failed (skipped sources count as complete)
+    sources: List[dict] = []  # Per-app status: ok/partial/timeout/error + latency
+    cache: Optional[str] = None  # hit / stale / coalesced / miss / bypass
+
+
+class BulkSearchRequest(BaseModel):
+    """Request schema for a bulk search job"""
+    queries: List[str] = []
+    book_ids: List[int] = []  # Searched as "author title"
+    categories: Optional[List[str]] = None
+    limit: int = 100
+    results_per_query: int = Field(20, ge=1, le=100)
 
 
 class DownloadRequest(BaseModel):
@@ -45,6 +67,7 @@ class DownloadRequest(BaseModel):
     book_id: Optional[int] = None
     quality_profile_id: Optional[int] = None
     media_type: str = "ebook"
+    infohash: Optional[str] = None  # From the search result; lets already-grabbed torrents be skipped without a request
 
 
 class DownloadResponse(BaseModel):
@@ -54,71 +77,6 @@ class DownloadResponse(BaseModel):
     details: Optional[dict] = None
 
 
-def filter_videos_and_movies(results: List) -> List:
-    """
-    Filter out video files and movies from search results
-    
-    This ensures only books, audiobooks, comics, and magazines come through
-    """
-    # Video file extensions to block
-    video_formats = [
-        'mp4', 'avi', 'mkv', 'mov', 'wmv', 'flv', 'webm', 
-        'm4v', 'mpg', 'mpeg', 'ts', 'vob', '3gp', 'ogv',
-        'divx', 'xvid', 'rm', 'rmvb', 'asf', 'qt'
-    ]
-    
-    # Movie/TV indicators in title
-    movie_indicators = [
-        'bluray', 'blu-ray', 'webrip', 'web-dl', 'hdtv', 'brrip',
-        '1080p', '720p', '2160p', '4k', 'x264', 'x265', 'hevc',
-        'dvdrip', 'cam', 'hdrip', 'proper', 'repack', 'remux',
-        'web.dl', 'webdl', 'hdcam', 'screener', 'dvdscr',
-        's01e', 's02e', 's03e', 's04e', 's05e',  # TV series patterns
-        'season', 'complete.series'
-    ]
-    
-    # Book/media indicators - if present, likely not a movie
-    book_indicators = [
-        'epub', 'mobi', 'azw', 'azw3', 'cbz', 'cbr', 'cb7', 'cbt',
-        'm4b', 'audiobook', 'comic', 'manga', 'graphic.novel',
-        'ebook', 'e-book', 'magazine', 'pdf'
-    ]
-    
-    filtered_results = []
-    filtered_count = 0
-    
-    for result in results:
-        title_lower = result.title.lower()
-        file_format = result.file_format.lower() if result.file_format else None
-        
-        # Check 1: Block video file formats
-        if file_format and file_format in video_formats:
-            logger.info(f"🎬 Filtering video (format={file_format}): {result.title[:60]}")
-            filtered_count += 1
-            continue
-        
-        # Check 2: Has book indicators? Allow it
-        has_book_indicator = any(ind in title_lower for ind in book_indicators)
-        if has_book_indicator:
-            filtered_results.append(result)
-            continue
-        
-        # Check 3: Has movie indicators? Block it (unless has book indicators above)
-        has_movie_indicator = any(ind in title_lower for ind in movie_indicators)
-        if has_movie_indicator:
-            logger.info(f"🎬 Filtering movie (indicator): {result.title[:60]}")
-            filtered_count += 1
-            continue
-        
-        # Default: Allow
-        filtered_results.append(result)
-    
-    if filtered_count > 0:
-        logger.info(f"🗑 Filtered out {filtered_count} videos/movies from {len(results)} total results")
-    
-    return filtered_results
-
-
 @router.post("/books", response_model=SearchResponse)
 async def search_books(
     search_request: SearchRequest,
@@ -130,24 +88,28 @@ async def search_books(
     This queries Prowlarr and Jackett to find available downloads
     """
     try:
-        results = await search_service.search(
+        results, sources, cache_state = await search_service.search_with_status(
             db=db,
             query=search_request.query,
             indexer_ids=search_request.indexer_ids,
             categories=search_request.categories,
-            limit=search_request.limit
+            limit=search_request.limit,
+            deadline=search_request.timeout,
+            use_cache=not search_request.bypass_cache
         )
         
-        # ⭐ FILTER OUT VIDEOS AND MOVIES
-        filtered_results = filter_videos_and_movies(results)
-        
-        logger.info(f"📊 Search '{search_request.query}': {len(filtered_results)} results after filtering")
+        logger.info(f"📊 Search '{search_request.query}': {len(results)} results after filtering")
         
-        return SearchResponse(
-            results=[result.to_dict() for result in filtered_results],
-            total=len(filtered_results),
-            query=search_request.query
-        )
+        # Serialized straight to JSON with orjson - re-validating thousands of
+        # plain result dicts through SearchResponse costs more than the search
+        return ORJSONResponse({
+            "results": [result.to_dict() for result in results],
+            "total": len(results),
+            "query": search_request.query,
+            "partial": not search_service.is_complete(sources),
+            "sources": sources,
+            "cache": cache_state
+        })
     
     except Exception as e:
         logger.error(f"Search failed: {e}", exc_info=True)
@@ -157,6 +119,175 @@ async def search_books(
         )
 
 
+def stream_frame(event: str, data: dict, stream_format: str) -> bytes:
+    """Frame one streaming event as an NDJSON line or an SSE message"""
+    if stream_format == "sse":
+        return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+    return orjson.dumps({"event": event, **data}) + b"\n"
+
+
+@router.post("/books/stream")
+async def stream_search_books(
+    search_request: SearchRequest,
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$", description="Stream framing: ndjson or sse"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Search for books and stream results as each app responds
+    
+    Emits a `results` event per app (already filtered, sorted within the
+    batch, with that app's status) as soon as it answers, then a final
+    `summary` event with totals and per-source status.
+    
+    A cached search is sent as a single `results` event (with `cached` set)
+    followed by the summary.
+    """
+    # Read everything needed from the DB now - the session is closed
+    # before the response body is streamed
+    sources = await search_service.load_sources(db)
+    search_args = dict(
+        categories=search_request.categories,
+        limit=search_request.limit,
+        indexer_ids=search_request.indexer_ids
+    )
+    
+    if search_request.bypass_cache:
+        cached, cache_state = None, "bypass"
+        search_cache.record("bypassed")
+    else:
+        cached, cache_state = search_service.get_cached(
+            sources, search_request.query, deadline=search_request.timeout, **search_args
+        )
+        if not cached:
+            cache_state = "miss"
+            search_cache.record("misses")
+    
+    async def events():
+        started = time.monotonic()
+        statuses = []
+        total = 0
+        
+        if cached:
+            results, statuses = cached
+            total = len(results)
+            
+            yield stream_frame("results", {
+                "cached": True,
+                "sources": statuses,
+                "count": total,
+                "results": [result.to_dict() for result in results]
+            }, format)
+        else:
+            raw_results = []
+            try:
+                async for results, source in search_service.stream_sources(
+                    sources,
+                    search_request.query,
+                    deadline=search_request.timeout,
+                    **search_args
+                ):
+                    statuses.append(source)
+                    raw_results.extend(results)
+                    batch = search_service.filter_and_sort(results)
+                    total += len(batch)
+                    
+                    yield stream_frame("results", {
+                        "source": source,
+                        "count": len(batch),
+                        "results": [result.to_dict() for result in batch]
+                    }, format)
+                
+                search_service.remember(
+                    sources, search_request.query, raw_results, statuses, **search_args
+                )
+            except Exception as e:
+                logger.error(f"Streaming search failed: {e}", exc_info=True)
+                yield stream_frame("error", {"message": f"Search failed: {str(e)}"}, format)
+        
+        logger.info(f"📊 Streamed search '{search_request.query}': {total} results (cache {cache_state})")
+        
+        yield stream_frame("summary", {
+            "query": search_request.query,
+            "total": total,
+            "partial": not search_service.is_complete(statuses),
+            "sources": statuses,
+            "cache": cache_state,
+            "elapsed_ms": round((time.monotonic() - started) * 1000)
+        }, format)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if format == "sse" else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/cache/stats")
+async def get_search_cache_stats():
+    """Search cache counters: hits, stale hits, misses, hit rate, size"""
+    return search_cache.metrics()
+
+
+@router.delete("/cache")
+async def clear_search_cache():
+    """Drop all cached search results"""
+    cleared = search_cache.clear()
+    logger.info(f"🧹 Cleared {cleared} cached searches")
+    return {"success": True, "cleared": cleared}
+
+
+@router.post("/bulk", status_code=status.HTTP_202_ACCEPTED)
+async def create_bulk_search(
+    bulk_request: BulkSearchRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Start a background job searching many queries and/or books
+    
+    Poll GET /search/bulk/{job_id} for progress; each query's results are
+    available as soon as it finishes.
+    """
+    try:
+        job = await bulk_search.create_job(
+            db,
+            queries=bulk_request.queries,
+            book_ids=bulk_request.book_ids,
+            categories=bulk_request.categories,
+            limit=bulk_request.limit,
+            results_per_query=bulk_request.results_per_query
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    return job.progress()
+
+
+@router.get("/bulk")
+async def list_bulk_searches():
+    """Recent bulk search jobs (newest first) and the per-indexer limits"""
+    return {"jobs": bulk_search.list_jobs(), "limits": indexer_limiter.snapshot()}
+
+
+@router.get("/bulk/{job_id}")
+async def get_bulk_search(
+    job_id: str,
+    since: int = Query(0, ge=0, description="Only return items from this position on (use `next` from the previous poll)")
+):
+    """Bulk search progress and finished queries"""
+    job = bulk_search.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Bulk search {job_id} not found")
+    return ORJSONResponse(job.to_dict(since))
+
+
+@router.delete("/bulk/{job_id}")
+async def cancel_bulk_search(job_id: str):
+    """Cancel a bulk search (queries already finished are kept)"""
+    if not bulk_search.cancel_job(job_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Bulk search {job_id} not found")
+    return {"success": True, "job_id": job_id}
+
+
 @router.post("/download", response_model=DownloadResponse)
 async def download_book(
     download_request: DownloadRequest,
@@ -177,12 +308,7 @@ async def download_book(
     
     # Validate quality profile if provided
     if download_request.quality_profile_id:
-        profile_result = await db.execute(
-            select(QualityProfile).where(
-                QualityProfile.id == download_request.quality_profile_id
-            )
-        )
-        profile = profile_result.scalar_one_or_none()
+        profile = await quality_engine.get(db, download_request.quality_profile_id)
         
         if not profile:
             raise HTTPException(
@@ -190,7 +316,28 @@ async def download_book(
                 detail="Quality profile not found"
             )
         
-        logger.info(f"Using quality profile: {profile.name}")
+        # Upgrades are judged against the book's existing file
+        current_format = None
+        if download_request.book_id:
+            book = (await db.execute(
+                select(Book).where(Book.id == download_request.book_id)
+            )).scalar_one_or_none()
+            if book and book.file_path:
+                current_format = book.file_format
+        
+        decision = profile.decide(
+            download_request.title,
+            download_request.size_bytes or 0,
+            download_request.file_format,
+            profile.current_priority(current_format)
+        )
+        if not decision.accepted:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Rejected by quality profile '{profile.name}': {decision.reason}"
+            )
+        
+        logger.info(f"Using quality profile: {profile.name} (format: {decision.file_format or 'unknown'})")
     
     # Send to download client
     try:
@@ -199,7 +346,9 @@ async def download_book(
             download_url=download_request.download_url,
             book_title=download_request.title,
             media_type=download_request.media_type,
-            file_format=download_request.file_format
+            file_format=download_request.file_format,
+            book_id=download_request.book_id,
+            infohash=download_request.infohash
         )
         
         if not result.get("success"):
@@ -228,6 +377,7 @@ async def download_book(
         if indexer:
             indexer.total_grabs = (indexer.total_grabs or 0) + 1
             await db.commit()
+            indexer_catalog.record_grab(indexer.id)
         
         logger.info(f"✅ Successfully sent '{download_request.title}' to download client")
         
@@ -272,6 +422,29 @@ async def auto_search_book(
             detail=f"Book with ID {book_id} not found"
         )
     
+    # Media type from the book's library, profile from the request or that type's default
+    media_type = await quality_engine.media_type_for(db, book.library_id)
+    
+    if quality_profile_id:
+        profile = await quality_engine.get(db, quality_profile_id)
+        if not profile:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Quality profile with ID {quality_profile_id} not found"
+            )
+    else:
+        profile = await quality_engine.get_default(db, media_type)
+    
+    current_format = book.file_format if book.file_path else None
+    if profile and not profile.wants_upgrade(current_format):
+        return {
+            "success": True,
+            "message": f"'{book.title}' already meets quality profile '{profile.name}'",
+            "book_id": book_id,
+            "quality_profile": profile.name,
+            "results": []
+        }
+    
     # Build search query
     search_query = book.title
     if book.author_name:
@@ -280,31 +453,34 @@ async def auto_search_book(
     # Search
     results = await search_service.search(
         db=db,
-        query=search_query,
-        limit=20
+        query=search_query
     )
     
-    # ⭐ FILTER OUT VIDEOS AND MOVIES
-    filtered_results = filter_videos_and_movies(results)
+    # Already filtered (no videos/movies); rank by the quality profile if there is one
+    # (otherwise keep the seeders order)
+    filtered_results = profile.rank(results, current_format) if profile else results
     
     if not filtered_results:
         return {
             "success": False,
             "message": f"No results found for '{search_query}'",
             "book_id": book_id,
+            "quality_profile": profile.name if profile else None,
             "results": []
         }
     
     # If auto_download, grab the best result
     if auto_download and filtered_results:
-        best_result = filtered_results[0]  # Already sorted by seeders
+        best_result = filtered_results[0]  # Best by profile (or seeders)
         
         download_result = await download_manager.send_to_client(
             db=db,
             download_url=best_result.download_url,
             book_title=book.title,
-            media_type="ebook",  # TODO: Detect from book's library type
-            file_format=best_result.file_format
+            media_type=media_type,
+            file_format=best_result.file_format,
+            book_id=book.id,
+            infohash=best_result.infohash
         )
         
         if download_result.get("success"):
@@ -319,6 +495,7 @@ async def auto_search_book(
                 "success": True,
                 "message": f"Automatically downloaded '{best_result.title}'",
                 "book_id": book_id,
+                "quality_profile": profile.name if profile else None,
                 "download": download_result,
                 "selected_result": best_result.to_dict()
             }
@@ -327,6 +504,7 @@ async def auto_search_book(
                 "success": False,
                 "message": "Search succeeded but download failed",
                 "book_id": book_id,
+                "quality_profile": profile.name if profile else None,
                 "error": download_result.get("error"),
                 "results": [r.to_dict() for r in filtered_results[:10]]
             }
@@ -335,6 +513,7 @@ async def auto_search_book(
         "success": True,
         "message": f"Found {len(filtered_results)} results for '{search_query}'",
         "book_id": book_id,
+        "quality_profile": profile.name if profile else None,
         "results": [r.to_dict() for r in filtered_results[:20]]
     }
 
@@ -348,7 +527,8 @@ async def monitor_book(
     """
     Enable or disable monitoring for a book
     
-    When monitored, the book will be automatically searched periodically
+    Monitored books that haven't been downloaded are matched against
+    indexer RSS feeds by the RSS monitor (see GET /search/rss)
     """
     result = await db.execute(select(Book).where(Book.id == book_id))
     book = result.scalar_one_or_none()
@@ -369,4 +549,15 @@ async def monitor_book(
         "book_id": book_id,
         "monitored": monitored,
         "status": book.status
-    }
\ No newline at end of file
+    }
+
+@router.get("/rss")
+async def get_rss_status():
+    """RSS monitor status: schedule, last run, totals and recent wanted-book matches"""
+    return rss_monitor.status()
+
+
+@router.post("/rss/run")
+async def run_rss_sync():
+    """Check the RSS feeds for wanted books now"""
+    return await rss_monitor.run_once()
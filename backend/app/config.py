@@ -76,6 +76,38 @@ class Settings(BaseSettings):
     kavita_url: Optional[str] = Field(default=None, alias="KAVITA_URL")
     kavita_api_key: Optional[str] = Field(default=None, alias="KAVITA_API_KEY")
     
+    # Search
+    search_cache_size: int = Field(default=256, alias="SEARCH_CACHE_SIZE")
+    search_cache_ttl: float = Field(default=300.0, alias="SEARCH_CACHE_TTL")  # seconds results stay fresh
+    search_cache_stale_ttl: float = Field(default=900.0, alias="SEARCH_CACHE_STALE_TTL")  # extra seconds served while refreshing
+    jackett_per_tracker: bool = Field(default=True, alias="JACKETT_PER_TRACKER")  # query each tracker separately instead of /indexers/all
+    jackett_tracker_timeout: float = Field(default=20.0, alias="JACKETT_TRACKER_TIMEOUT")  # seconds per tracker
+    jackett_max_concurrency: int = Field(default=6, alias="JACKETT_MAX_CONCURRENCY")  # trackers queried at once per app
+    indexer_failure_threshold: int = Field(default=5, alias="INDEXER_FAILURE_THRESHOLD")  # failures in a row before an indexer is skipped
+    indexer_cooldown: float = Field(default=300.0, alias="INDEXER_COOLDOWN")  # seconds before a skipped indexer is probed again
+    indexer_max_concurrency: int = Field(default=2, alias="INDEXER_MAX_CONCURRENCY")  # requests in flight per indexer, across all searches
+    indexer_rate_limit: float = Field(default=30.0, alias="INDEXER_RATE_LIMIT")  # requests per minute per indexer (0 = unlimited)
+    bulk_search_concurrency: int = Field(default=4, alias="BULK_SEARCH_CONCURRENCY")  # queries a bulk search job runs at once
+    rss_sync_interval: float = Field(default=15.0, alias="RSS_SYNC_INTERVAL")  # minutes between RSS checks for wanted books (0 = off)
+    rss_feed_limit: int = Field(default=100, alias="RSS_FEED_LIMIT")  # releases requested per feed
+    rss_auto_grab: bool = Field(default=False, alias="RSS_AUTO_GRAB")  # send matches to the download client instead of only reporting them
+
+    # Downloads
+    download_batch_window: float = Field(default=0.5, alias="DOWNLOAD_BATCH_WINDOW")  # seconds grabs are collected before one batched send (0 = send each at once)
+    download_batch_size: int = Field(default=50, alias="DOWNLOAD_BATCH_SIZE")  # grabs per batched send at most
+    download_poll_interval: float = Field(default=5.0, alias="DOWNLOAD_POLL_INTERVAL")  # seconds between progress polls while downloading (0 = off)
+    download_poll_max_interval: float = Field(default=120.0, alias="DOWNLOAD_POLL_MAX_INTERVAL")  # polls back off up to this when nothing is active
+    download_auto_import: bool = Field(default=True, alias="DOWNLOAD_AUTO_IMPORT")  # import finished downloads into their library
+    download_import_mode: str = Field(default="hardlink", alias="DOWNLOAD_IMPORT_MODE")  # hardlink (keeps seeding), move, or copy
+    download_path_map: str = Field(default="", alias="DOWNLOAD_PATH_MAP")  # client=local path prefixes, comma separated (e.g. /downloads=/data/downloads)
+    download_client_min_free_space: float = Field(default=1.0, alias="DOWNLOAD_CLIENT_MIN_FREE_SPACE")  # GB; clients with less free space get grabs last
+    download_client_stats_ttl: float = Field(default=30.0, alias="DOWNLOAD_CLIENT_STATS_TTL")  # seconds a client's free space is reused
+    download_client_cooldown: float = Field(default=60.0, alias="DOWNLOAD_CLIENT_COOLDOWN")  # seconds an unreachable client is tried last
+    torrent_cache_size: int = Field(default=200, alias="TORRENT_CACHE_SIZE")  # resolved torrent links kept in memory
+    torrent_cache_ttl: float = Field(default=3600.0, alias="TORRENT_CACHE_TTL")  # seconds a resolved link is reused
+    torrent_max_size: int = Field(default=10 * 1024 * 1024, alias="TORRENT_MAX_SIZE")  # bytes; larger .torrent downloads are rejected
+    torrent_cache_max_file_size: int = Field(default=256 * 1024, alias="TORRENT_CACHE_MAX_FILE_SIZE")  # bytes; larger .torrent files aren't cached
+    
     # Metadata Providers
     google_books_api_key: Optional[str] = Field(default=None, alias="GOOGLE_BOOKS_API_KEY")
     goodreads_api_key: Optional[str] = Field(default=None, alias="GOODREADS_API_KEY")
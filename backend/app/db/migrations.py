@@ -23,6 +23,18 @@ async def run_migrations(db: AsyncSession):
             "type": "VARCHAR(200)",
             "description": "Admin password for apps like Jackett"
         },
+        {
+            "table": "downloads",
+            "column": "import_path",
+            "type": "VARCHAR(1000)",
+            "description": "Where a finished download was imported"
+        },
+        {
+            "table": "downloads",
+            "column": "imported_at",
+            "type": "DATETIME",
+            "description": "When a finished download was imported"
+        },
         # ADDED - NEW: Quality profiles table migrations would go here
         # Note: For new tables, we use create_all() instead of ALTER TABLE
         # The quality_profiles table will be created automatically via Base.metadata.create_all()
@@ -10,6 +10,7 @@ from .app import App
 from .indexer import Indexer
 from .download_client import DownloadClient  # ADDED
 from .quality_profile import QualityProfile  # ADDED - NEW
+from .download import Download
 
 __all__ = [
     "Book", 
@@ -18,5 +19,6 @@ __all__ = [
     "App", 
     "Indexer", 
     "DownloadClient",  # ADDED
-    "QualityProfile"   # ADDED - NEW
+    "QualityProfile",  # ADDED - NEW
+    "Download"
 ]
\ No newline at end of file
@@ -0,0 +1,82 @@
+# File: backend/app/db/models/download.py
+"""
+Download Model
+One grab sent to a download client, tracked until it completes
+"""
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, BigInteger
+from datetime import datetime
+from backend.app.db.database import Base
+
+
+class Download(Base):
+    """
+    A torrent sent to a download client and its last known progress
+    Updated by the download tracker
+    """
+    __tablename__ = "downloads"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Where it went
+    client_id = Column(Integer, ForeignKey("download_clients.id", ondelete="CASCADE"), nullable=False, index=True)
+    torrent_id = Column(String(100), nullable=False, index=True)  # ID in the client (infohash)
+    book_id = Column(Integer, ForeignKey("books.id", ondelete="SET NULL"), nullable=True, index=True)
+
+    # What was grabbed
+    title = Column(String(500), nullable=False)
+    download_url = Column(Text, nullable=True)
+    media_type = Column(String(50), nullable=True)  # ebook, audiobook, comic, magazine
+    file_format = Column(String(10), nullable=True)
+    label = Column(String(100), nullable=True)
+
+    # Status: queued, checking, downloading, paused, error, completed, imported, removed
+    status = Column(String(30), nullable=False, default="queued", index=True)
+    client_state = Column(String(50), nullable=True)  # Raw state reported by the client
+    error = Column(Text, nullable=True)
+
+    # Progress
+    progress = Column(Float, nullable=False, default=0.0)  # 0-100
+    download_rate = Column(Integer, nullable=True)  # bytes/s
+    upload_rate = Column(Integer, nullable=True)  # bytes/s
+    eta = Column(Integer, nullable=True)  # seconds
+    total_size = Column(BigInteger, nullable=True)
+    downloaded = Column(BigInteger, nullable=True)
+    save_path = Column(String(1000), nullable=True)
+    import_path = Column(String(1000), nullable=True)  # File or folder in the library
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+    imported_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<Download {self.title} ({self.status} {self.progress:.0f}%)>"
+
+    def to_dict(self):
+        """Convert download to dictionary"""
+        return {
+            "id": self.id,
+            "client_id": self.client_id,
+            "torrent_id": self.torrent_id,
+            "book_id": self.book_id,
+            "title": self.title,
+            "media_type": self.media_type,
+            "file_format": self.file_format,
+            "label": self.label,
+            "status": self.status,
+            "client_state": self.client_state,
+            "error": self.error,
+            "progress": self.progress,
+            "download_rate": self.download_rate,
+            "upload_rate": self.upload_rate,
+            "eta": self.eta,
+            "total_size": self.total_size,
+            "downloaded": self.downloaded,
+            "save_path": self.save_path,
+            "import_path": self.import_path,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "imported_at": self.imported_at.isoformat() if self.imported_at else None,
+        }
@@ -15,6 +15,11 @@ from .config import settings
 from .db.database import init_db, close_db, get_db
 from .db.migrations import run_migrations
 from .api import router as api_router
+from .services.rss_monitor import rss_monitor
+from .services.deluge_service import deluge_service
+from .services.qbittorrent_service import qbittorrent_service
+from .services.torrent_resolver import torrent_resolver
+from .services.download_tracker import download_tracker
 from .logging_config import (
     setup_logging,
     log_startup,
@@ -63,12 +68,23 @@ async def lifespan(app: FastAPI):
         log_error(logger, "Failed to initialize database", exc=e)
         raise
     
+    # Periodic RSS check for wanted books
+    rss_monitor.start()
+    
+    # Download progress polling
+    download_tracker.start()
+    
     log_success(logger, "🦠 Morpho is ready! Application startup complete!")
     
     yield
     
     # Shutdown
     log_shutdown(logger, "🦠 Morpho is going to sleep...")
+    await rss_monitor.stop()
+    await download_tracker.stop()
+    await deluge_service.close()
+    await qbittorrent_service.close()
+    await torrent_resolver.close()
     try:
         await close_db()
         log_success(logger, "Database connection closed")
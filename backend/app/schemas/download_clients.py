@@ -93,6 +93,7 @@ class DownloadClientTestRequest(BaseModel):
     password: Optional[str] = None
     api_key: Optional[str] = None
     use_ssl: bool = False
+    config: Optional[Dict[str, Any]] = None
 
 class DownloadClientTestResponse(BaseModel):
     """Schema for test response"""
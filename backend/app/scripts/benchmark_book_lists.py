@@ -0,0 +1,135 @@
+"""
+📚 Book List Benchmark
+Times the book list response path the previous way (ORM objects, categories
+decoded and expunged per row, validated through BookListResponse, encoded
+with json) against the row-tuple + orjson path, at several page sizes, on a
+throwaway in-memory database.
+
+    python -m backend.app.scripts.benchmark_book_lists --books 5000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from backend.app.api.routes.books import _BOOK_COLUMNS, book_list_response, deserialize_book_categories
+from backend.app.db.database import Base
+from backend.app.db.models import Book, Library
+from backend.app.schemas.books import BookListResponse
+
+PAGE_SIZES = (20, 100, 1000)
+
+
+async def seed(session: AsyncSession, count: int, seed: int):
+    rng = random.Random(seed)
+    library = Library(name="Benchmark", path="/books", library_type="books")
+    session.add(library)
+    await session.flush()
+
+    start = datetime(2020, 1, 1)
+    session.add_all([
+        Book(
+            library_id=library.id,
+            title=f"Book {i}",
+            author_name=f"Author {rng.randint(1, 500)}",
+            isbn=f"{rng.randint(10**12, 10**13 - 1)}",
+            description="A description. " * rng.randint(5, 40),
+            publisher="Publisher",
+            published_date=str(rng.randint(1950, 2024)),
+            page_count=rng.randint(50, 900),
+            language="en",
+            cover_url=f"https://covers.example/{i}.jpg",
+            categories=json.dumps(rng.sample(["Fiction", "Fantasy", "History", "Science", "Poetry"], 2)),
+            file_path=f"/books/{i}.epub",
+            file_format="epub",
+            file_size=rng.randint(100_000, 20_000_000),
+            created_at=start + timedelta(minutes=i),
+            updated_at=start + timedelta(minutes=i)
+        )
+        for i in range(count)
+    ])
+    await session.commit()
+
+
+async def legacy_page(session: AsyncSession, page_size: int, total: int) -> bytes:
+    result = await session.execute(
+        select(Book).join(Library, Book.library_id == Library.id)
+        .limit(page_size).order_by(Book.created_at.desc())
+    )
+    books = [deserialize_book_categories(book, session) for book in result.scalars().all()]
+    response = BookListResponse(
+        books=books,
+        total=total,
+        page=1,
+        page_size=page_size,
+        pages=(total + page_size - 1) // page_size
+    )
+    return json.dumps(jsonable_encoder(response)).encode()
+
+
+async def row_page(session: AsyncSession, page_size: int, total: int) -> bytes:
+    result = await session.execute(
+        select(*_BOOK_COLUMNS).join(Library, Book.library_id == Library.id)
+        .limit(page_size).order_by(Book.created_at.desc())
+    )
+    return book_list_response(result.all(), total, 1, page_size).body
+
+
+async def timed(factory, fn, page_size: int, total: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        async with factory() as session:
+            start = time.perf_counter()
+            await fn(session, page_size, total)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def run(args):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with factory() as session:
+        await seed(session, args.books, args.seed)
+
+    async with factory() as session:
+        same = (
+            json.loads(await legacy_page(session, 20, args.books))
+            == json.loads(await row_page(session, 20, args.books))
+        )
+
+    print(f"Books:     {args.books:,} (same JSON: {same})")
+    print(f"{'page_size':>9}{'previous':>14}{'rows+orjson':>14}{'speedup':>10}")
+    for page_size in PAGE_SIZES:
+        before = await timed(factory, legacy_page, page_size, args.books, args.repeat)
+        after = await timed(factory, row_page, page_size, args.books, args.repeat)
+        print(
+            f"{page_size:>9}"
+            f"{page_size / before:>10,.0f} r/s"
+            f"{page_size / after:>10,.0f} r/s"
+            f"{before / after:>9.1f}x"
+        )
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark book list serialization")
+    parser.add_argument("--books", type=int, default=5000, help="Books in the test database")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per page size (best is reported)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
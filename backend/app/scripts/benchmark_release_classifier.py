@@ -0,0 +1,185 @@
+"""
+🏷️ Release Classifier Benchmark
+Times the compiled release classifier against the previous per-result
+filters on synthetic indexer titles, and checks both reach the same verdicts.
+
+    python -m backend.app.scripts.benchmark_release_classifier --count 100000
+"""
+
+import argparse
+import random
+import re
+import time
+
+from backend.app.services.release_classifier import release_classifier
+
+
+# ----------------------------------------------------------------------
+# Previous implementation (SearchResult.is_valid_media_file followed by
+# filter_videos_and_movies, plus get_media_type) - kept as the reference
+# ----------------------------------------------------------------------
+
+def legacy_is_valid_media_file(title, file_format):
+    title_lower = title.lower()
+    tv_patterns = [r's\d{2}e\d{2}', r'season\s+\d+', r's\d{2}\s', r'\d{1,2}x\d{2}']
+    if any(re.search(pattern, title_lower) for pattern in tv_patterns):
+        return False
+    movie_indicators = [
+        'bluray', 'blu-ray', 'webrip', 'web-dl', 'hdtv', 'brrip',
+        '1080p', '720p', '2160p', '4k', 'x264', 'x265', 'hevc',
+        'dvdrip', 'xvid', 'web.dl', 'webdl', 'hdrip', 'cam',
+        'screener', 'ts', 'proper', 'repack', 'remux'
+    ]
+    if any(ind in title_lower for ind in movie_indicators):
+        return False
+    if file_format:
+        video_formats = [
+            'mp4', 'avi', 'mkv', 'mov', 'wmv', 'flv', 'webm',
+            'm4v', 'mpg', 'mpeg', 'ts', 'vob', '3gp', 'ogv'
+        ]
+        if file_format.lower() in video_formats:
+            return False
+    software_keywords = ['repack', 'cracked', 'trainer', 'multi2', 'multi5', 'flt']
+    if any(kw in title_lower for kw in software_keywords):
+        return False
+    valid_formats = [
+        'epub', 'mobi', 'azw', 'azw3', 'pdf', 'txt', 'rtf', 'doc', 'docx',
+        'm4b', 'mp3', 'aac', 'flac', 'ogg', 'opus',
+        'cbz', 'cbr', 'cb7', 'cbt', 'zip', 'rar', '7z'
+    ]
+    if file_format and file_format.lower() in valid_formats:
+        return True
+    for fmt in valid_formats:
+        patterns = [f'.{fmt}', f'[{fmt}]', f'({fmt})', f' {fmt} ']
+        if any(pattern in title_lower for pattern in patterns):
+            return True
+    book_keywords = [
+        'ebook', 'e-book', 'audiobook', 'comic', 'comics', 'manga',
+        'novel', 'book', 'magazine', 'periodical', 'anthology'
+    ]
+    return any(kw in title_lower for kw in book_keywords)
+
+
+def legacy_not_video(title, file_format):
+    video_formats = [
+        'mp4', 'avi', 'mkv', 'mov', 'wmv', 'flv', 'webm',
+        'm4v', 'mpg', 'mpeg', 'ts', 'vob', '3gp', 'ogv',
+        'divx', 'xvid', 'rm', 'rmvb', 'asf', 'qt'
+    ]
+    movie_indicators = [
+        'bluray', 'blu-ray', 'webrip', 'web-dl', 'hdtv', 'brrip',
+        '1080p', '720p', '2160p', '4k', 'x264', 'x265', 'hevc',
+        'dvdrip', 'cam', 'hdrip', 'proper', 'repack', 'remux',
+        'web.dl', 'webdl', 'hdcam', 'screener', 'dvdscr',
+        's01e', 's02e', 's03e', 's04e', 's05e',
+        'season', 'complete.series'
+    ]
+    book_indicators = [
+        'epub', 'mobi', 'azw', 'azw3', 'cbz', 'cbr', 'cb7', 'cbt',
+        'm4b', 'audiobook', 'comic', 'manga', 'graphic.novel',
+        'ebook', 'e-book', 'magazine', 'pdf'
+    ]
+    title_lower = title.lower()
+    file_format = file_format.lower() if file_format else None
+    if file_format and file_format in video_formats:
+        return False
+    if any(ind in title_lower for ind in book_indicators):
+        return True
+    return not any(ind in title_lower for ind in movie_indicators)
+
+
+def legacy_media_type(title, file_format):
+    if not file_format:
+        return "ebook"
+    fmt = file_format.lower()
+    if fmt in ['m4b', 'mp3', 'aac', 'flac', 'ogg', 'opus']:
+        return "audiobook"
+    if fmt in ['cbz', 'cbr', 'cb7', 'cbt']:
+        return "comic"
+    if fmt == 'pdf':
+        title_lower = title.lower()
+        magazine_names = [
+            'wired', 'vogue', 'time', 'forbes', 'economist', 'nature',
+            'maxim', 'playboy', 'penthouse', 'gq', 'esquire'
+        ]
+        has_magazine_name = any(mag in title_lower for mag in magazine_names)
+        has_date_pattern = bool(re.search(r'\d{4}[-/]\d{2}|\b(january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{4}\b', title_lower))
+        has_magazine_keyword = any(word in title_lower for word in ['magazine', 'monthly', 'weekly'])
+        if has_magazine_name or (has_date_pattern and has_magazine_keyword):
+            return "magazine"
+    return "ebook"
+
+
+def legacy_classify(title, file_format):
+    allowed = legacy_is_valid_media_file(title, file_format) and legacy_not_video(title, file_format)
+    return allowed, legacy_media_type(title, file_format) if allowed else "ebook"
+
+
+# ----------------------------------------------------------------------
+# Synthetic titles
+# ----------------------------------------------------------------------
+
+WORDS = (
+    "the", "dark", "tower", "house", "of", "leaves", "dune", "messiah", "wired", "time",
+    "nature", "american", "gods", "secrets", "parts", "collected", "works", "saga",
+    "chronicles", "volume", "edition", "unabridged", "retail", "king", "stephen",
+    "brandon", "sanderson", "mistborn", "october", "monthly", "weekly", "camera"
+)
+TAGS = (
+    "epub", "[epub]", "(pdf)", ".mobi", "azw3", "m4b", "mp3", " cbz ", "cbr", "audiobook",
+    "ebook", "e-book", "comic", "manga", "graphic.novel", "magazine", "novel",
+    "1080p", "720p", "x264", "bluray", "web-dl", "hdtv", "hdcam", "dvdscr", "remux",
+    "s01e02", "s03e", "season 2", "S02 ", "3x07", "complete.series", "repack", "cracked",
+    "multi5", "flt", "2019-05", "march 2021", "zip", "rar"
+)
+FORMATS = (None, None, "epub", "pdf", "mobi", "m4b", "mp3", "cbz", "cbr", "mkv", "mp4", "ts", "divx", "zip", "EPUB", "PDF")
+
+
+def make_releases(count, seed=42):
+    rng = random.Random(seed)
+    releases = []
+    for _ in range(count):
+        parts = rng.sample(WORDS, rng.randint(2, 6)) + rng.sample(TAGS, rng.randint(0, 3))
+        rng.shuffle(parts)
+        sep = rng.choice((" ", ".", "_", " - "))
+        title = sep.join(parts)
+        if rng.random() < 0.5:
+            title = title.title()
+        releases.append((title, rng.choice(FORMATS)))
+    return releases
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the release classifier")
+    parser.add_argument("--count", type=int, default=100_000, help="Number of release titles")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    releases = make_releases(args.count, args.seed)
+
+    start = time.perf_counter()
+    legacy = [legacy_classify(title, fmt) for title, fmt in releases]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    verdicts = release_classifier.classify_batch(releases)
+    compiled_time = time.perf_counter() - start
+
+    mismatches = [
+        (release, expected, (verdict.allowed, verdict.media_type))
+        for release, expected, verdict in zip(releases, legacy, verdicts)
+        if expected != (verdict.allowed, verdict.media_type)
+    ]
+    allowed = sum(1 for verdict in verdicts if verdict.allowed)
+
+    print(f"Releases:   {len(releases):,} ({allowed:,} allowed)")
+    print(f"Previous:   {legacy_time:.3f}s ({legacy_time / len(releases) * 1e6:.2f} µs/title)")
+    print(f"Compiled:   {compiled_time:.3f}s ({compiled_time / len(releases) * 1e6:.2f} µs/title)")
+    print(f"Speedup:    {legacy_time / compiled_time:.1f}x")
+    print(f"Mismatches: {len(mismatches)}")
+    for release, expected, got in mismatches[:10]:
+        print(f"  {release!r}: previous={expected} compiled={got}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+📦 Search Result Benchmark
+Times building and serializing search results the previous way (a plain
+object with eager fields, validated through SearchResponse and encoded with
+json) against the slotted SearchResult encoded with orjson, and compares
+memory per result.
+
+    python -m backend.app.scripts.benchmark_search_results --count 5000
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+
+from backend.app.api.routes.search import SearchResponse
+from backend.app.scripts.benchmark_release_classifier import legacy_media_type, make_releases
+from backend.app.services.search_service import SearchResult
+
+
+class LegacySearchResult:
+    """Previous SearchResult - kept as the reference"""
+
+    def __init__(self, title, download_url, indexer_id, indexer_name, size_bytes, seeders=0,
+                 protocol="torrent", publish_date=None, info_url=None, categories=None,
+                 file_format=None, infohash=None):
+        self.title = title
+        self.download_url = download_url
+        self.indexer_id = indexer_id
+        self.indexer_name = indexer_name
+        self.size_bytes = size_bytes
+        self.size_mb = round(size_bytes / 1024 / 1024, 2)
+        self.seeders = seeders
+        self.protocol = protocol
+        self.publish_date = publish_date
+        self.info_url = info_url
+        self.categories = categories or []
+        self.file_format = file_format
+        self.infohash = infohash
+        self.media_type = None
+        self.sources = None
+
+    def to_dict(self):
+        return {
+            "title": self.title,
+            "download_url": self.download_url,
+            "indexer_id": self.indexer_id,
+            "indexer_name": self.indexer_name,
+            "size_bytes": self.size_bytes,
+            "size_mb": self.size_mb,
+            "seeders": self.seeders,
+            "protocol": self.protocol,
+            "publish_date": self.publish_date.isoformat() if self.publish_date else None,
+            "info_url": self.info_url,
+            "categories": self.categories,
+            "file_format": self.file_format,
+            "media_type": legacy_media_type(self.title, self.file_format),
+            "infohash": self.infohash,
+            "sources": self.sources or [{
+                "indexer_id": self.indexer_id,
+                "indexer_name": self.indexer_name,
+                "seeders": self.seeders,
+                "download_url": self.download_url,
+                "info_url": self.info_url
+            }]
+        }
+
+
+def make_rows(count, seed=42):
+    rng = random.Random(seed)
+    now = datetime(2024, 1, 1)
+    return [
+        dict(
+            title=title,
+            download_url=f"magnet:?xt=urn:btih:{rng.getrandbits(160):040x}",
+            indexer_id=rng.randint(1, 40),
+            indexer_name=f"Indexer {rng.randint(1, 40)}",
+            size_bytes=rng.randint(100_000, 2_000_000_000),
+            seeders=rng.randint(0, 500),
+            publish_date=now - timedelta(days=rng.randint(0, 3000)),
+            info_url=f"https://tracker.example/t/{i}",
+            categories=["Books", "Books/EBook"],
+            file_format=file_format
+        )
+        for i, (title, file_format) in enumerate(make_releases(count, seed))
+    ]
+
+
+def build(cls, rows):
+    return [cls(**row) for row in rows]
+
+
+def measure_memory(cls, rows):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    results = build(cls, rows)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del results
+    return (after - before) / len(rows)
+
+
+def serialize_legacy(results, query):
+    response = SearchResponse(
+        results=[result.to_dict() for result in results],
+        total=len(results),
+        query=query,
+        sources=[],
+        cache="miss"
+    )
+    return json.dumps(jsonable_encoder(response)).encode()
+
+
+def serialize_orjson(results, query):
+    return ORJSONResponse({
+        "results": [result.to_dict() for result in results],
+        "total": len(results),
+        "query": query,
+        "partial": False,
+        "sources": [],
+        "cache": "miss"
+    }).body
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark search result building and serialization")
+    parser.add_argument("--count", type=int, default=5000, help="Number of results")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rows = make_rows(args.count, args.seed)
+    legacy_results = build(LegacySearchResult, rows)
+    results = build(SearchResult, rows)
+
+    legacy_body = serialize_legacy(legacy_results, "benchmark")
+    body = serialize_orjson(results, "benchmark")
+    same = json.loads(legacy_body)["results"] == json.loads(body)["results"]
+
+    print(f"Results:       {args.count:,} (same JSON: {same})")
+    print(f"{'':15}{'previous':>12}{'current':>12}{'speedup':>10}")
+    for label, legacy_fn, current_fn, unit in (
+        ("Build",
+         lambda: build(LegacySearchResult, rows), lambda: build(SearchResult, rows), "µs"),
+        ("Serialize",
+         lambda: serialize_legacy(legacy_results, "benchmark"), lambda: serialize_orjson(results, "benchmark"), "µs"),
+    ):
+        before = timed(legacy_fn, args.repeat) / args.count * 1e6
+        after = timed(current_fn, args.repeat) / args.count * 1e6
+        print(f"{label + ' (' + unit + ')':15}{before:12.2f}{after:12.2f}{before / after:9.1f}x")
+
+    before = measure_memory(LegacySearchResult, rows)
+    after = measure_memory(SearchResult, rows)
+    print(f"{'Memory (B)':15}{before:12.0f}{after:12.0f}{before / after:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+🧲 qBittorrent Stand-in Check
+Runs the qBittorrent service against a small local stand-in for the Web API
+v2 (login, categories, /torrents/add, /sync/maindata with rid deltas) and
+checks what it sends and how it merges the answers:
+
+- one login, then the SID is reused (also under another cookie name)
+- a 403 (dropped session) logs in again and retries
+- /torrents/add carries the category and save path, magnets and .torrent files
+- /sync/maindata deltas are merged, including full_update and torrents_removed
+
+    python -m backend.app.scripts.check_qbittorrent
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import uuid
+from email.parser import BytesParser
+from email.policy import default
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlparse
+
+from backend.app.services.qbittorrent_service import QBittorrentService
+from backend.app.services.result_merger import parse_infohash
+from backend.app.services.torrent_resolver import torrent_infohash
+
+USERNAME = "admin"
+PASSWORD = "adminadmin"
+TORRENT = b"d8:announce3:url4:infod6:lengthi100e4:name6:a.epub12:piece lengthi16384e6:pieces0:ee"
+MAGNETS = [f"magnet:?xt=urn:btih:{c * 40}" for c in "abc"]
+
+
+class StandIn:
+    """In-memory qBittorrent: sessions, categories, torrents and sync snapshots"""
+
+    def __init__(self, cookie_name: str = "SID"):
+        self.cookie_name = cookie_name
+        self.sids = set()
+        self.calls: List[str] = []
+        self.logins = 0
+        self.categories: Dict[str, Dict[str, str]] = {}
+        self.added: List[Dict[str, Any]] = []
+        self.torrents: Dict[str, Dict[str, Any]] = {}
+        self.rid = 0
+        self.snapshots: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        self.last_sync: Dict[str, Any] = {}
+
+    def add(self, form: Dict[str, str], files: List[bytes]):
+        hashes = [parse_infohash(url) for url in (form.get("urls") or "").split("\n") if url]
+        hashes += [torrent_infohash(data) for data in files]
+        self.added.append({
+            "hashes": hashes,
+            "category": form.get("category"),
+            "savepath": form.get("savepath")
+        })
+        for torrent_hash in hashes:
+            self.torrents[torrent_hash] = {
+                "name": torrent_hash[:8],
+                "state": "metaDL",
+                "progress": 0.0,
+                "dlspeed": 0,
+                "category": form.get("category", ""),
+                "save_path": form.get("savepath", "/downloads")
+            }
+
+    def maindata(self, rid: int) -> Dict[str, Any]:
+        current = json.loads(json.dumps(self.torrents))
+        self.rid += 1
+        self.snapshots[self.rid] = current
+        state = {"free_space_on_disk": 500 * 1024 ** 3}
+
+        if rid not in self.snapshots:
+            body = {
+                "rid": self.rid,
+                "full_update": True,
+                "torrents": current,
+                "categories": self.categories,
+                "server_state": state
+            }
+        else:
+            previous = self.snapshots[rid]
+            changed = {}
+            for torrent_hash, torrent in current.items():
+                fields = {k: v for k, v in torrent.items() if previous.get(torrent_hash, {}).get(k) != v}
+                if fields:
+                    changed[torrent_hash] = fields
+            body = {"rid": self.rid, "torrents": changed, "server_state": state}
+            removed = [torrent_hash for torrent_hash in previous if torrent_hash not in current]
+            if removed:
+                body["torrents_removed"] = removed
+        self.last_sync = body
+        return body
+
+    def serve(self) -> ThreadingHTTPServer:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self.route()
+
+            def do_POST(self):
+                self.route()
+
+            def reply(self, status: int, body, content_type: str = "text/plain", sid: str = None):
+                if isinstance(body, (dict, list)):
+                    body, content_type = json.dumps(body), "application/json"
+                data = body if isinstance(body, bytes) else body.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                if sid:
+                    self.send_header("Set-Cookie", f"{stand_in.cookie_name}={sid}; HttpOnly; path=/")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def form(self):
+                raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                content_type = self.headers.get("Content-Type", "")
+                if not content_type.startswith("multipart/"):
+                    return {k: v[0] for k, v in parse_qs(raw.decode()).items()}, []
+                message = BytesParser(policy=default).parsebytes(
+                    b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + raw
+                )
+                form, files = {}, []
+                for part in message.iter_parts():
+                    if part.get_filename():
+                        files.append(part.get_payload(decode=True))
+                    else:
+                        name = part.get_param("name", header="content-disposition")
+                        form[name] = part.get_payload(decode=True).decode()
+                return form, files
+
+            def route(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                stand_in.calls.append(url.path)
+
+                if url.path == "/file.torrent":
+                    return self.reply(200, TORRENT, "application/x-bittorrent")
+                if url.path == "/api/v2/auth/login":
+                    form, _ = self.form()
+                    stand_in.logins += 1
+                    if form.get("username") == USERNAME and form.get("password") == PASSWORD:
+                        sid = uuid.uuid4().hex
+                        stand_in.sids.add(sid)
+                        return self.reply(200, "Ok.", sid=sid)
+                    return self.reply(200, "Fails.")
+
+                cookie = self.headers.get("Cookie", "")
+                if not any(f"{stand_in.cookie_name}={sid}" in cookie for sid in stand_in.sids):
+                    return self.reply(403, "Forbidden")
+
+                if url.path == "/api/v2/app/version":
+                    return self.reply(200, "v4.6.0")
+                if url.path == "/api/v2/torrents/categories":
+                    return self.reply(200, stand_in.categories)
+                if url.path == "/api/v2/torrents/createCategory":
+                    form, _ = self.form()
+                    if form["category"] in stand_in.categories:
+                        return self.reply(409, "Category already exists")
+                    stand_in.categories[form["category"]] = {"name": form["category"], "savePath": form.get("savePath", "")}
+                    return self.reply(200, "")
+                if url.path == "/api/v2/torrents/add":
+                    stand_in.add(*self.form())
+                    return self.reply(200, "Ok.")
+                if url.path == "/api/v2/sync/maindata":
+                    return self.reply(200, stand_in.maindata(int(query.get("rid", 0))))
+                self.reply(404, "Not Found")
+
+        return Handler
+
+
+class Checks:
+    def __init__(self):
+        self.passed = 0
+        self.failed = 0
+
+    def check(self, name: str, ok: bool, detail: Any = ""):
+        if ok:
+            self.passed += 1
+            print(f"  ✅ {name}")
+        else:
+            self.failed += 1
+            print(f"  ❌ {name} {detail}")
+
+
+async def run(args) -> bool:
+    stand_in = StandIn()
+    server = stand_in.serve()
+    port = server.server_address[1]
+    service = QBittorrentService()
+    session = service.session("127.0.0.1", port, USERNAME, PASSWORD)
+    checks = Checks()
+
+    try:
+        print("Login")
+        await session.request("GET", "app/version")
+        await session.request("GET", "app/version")
+        await service.get_free_space("127.0.0.1", port, USERNAME, PASSWORD)
+        checks.check("one login for three requests", stand_in.logins == 1 and session.stats["logins"] == 1, stand_in.logins)
+        checks.check("first sync is a full update", stand_in.last_sync.get("full_update") is True, stand_in.last_sync)
+        checks.check(
+            "same session for the same WebUI",
+            service.session("127.0.0.1", port, USERNAME, PASSWORD) is session
+        )
+
+        print("Re-login on 403")
+        stand_in.sids.clear()
+        version = (await session.request("GET", "app/version")).text
+        checks.check("request retried after logging in again", version == "v4.6.0" and stand_in.logins == 2, stand_in.logins)
+
+        print("Add with category and save path")
+        results = await service.add_torrents(
+            "127.0.0.1", port, USERNAME, PASSWORD,
+            MAGNETS[:2] + [f"http://127.0.0.1:{port}/file.torrent"],
+            category="audiobooks", save_path="/data/audiobooks"
+        )
+        file_hash = torrent_infohash(TORRENT)
+        checks.check("every item reported added", all(r["success"] for r in results), results)
+        checks.check(
+            "torrent ids are the infohashes",
+            [r.get("torrent_id") for r in results] == [parse_infohash(m) for m in MAGNETS[:2]] + [file_hash]
+        )
+        checks.check(
+            "one /torrents/add request",
+            stand_in.calls.count("/api/v2/torrents/add") == 1 and len(stand_in.added[0]["hashes"]) == 3,
+            stand_in.added
+        )
+        checks.check(
+            "category and save path sent",
+            stand_in.added[0]["category"] == "audiobooks" and stand_in.added[0]["savepath"] == "/data/audiobooks",
+            stand_in.added[0]
+        )
+        await service.add_torrent("127.0.0.1", port, USERNAME, PASSWORD, MAGNETS[2], category="audiobooks")
+        checks.check(
+            "category created once",
+            stand_in.calls.count("/api/v2/torrents/createCategory") == 1 and "audiobooks" in stand_in.categories
+        )
+
+        print("Incremental sync")
+        ids = [r["torrent_id"] for r in results] + [parse_infohash(MAGNETS[2])]
+        status = await service.get_torrents_status("127.0.0.1", port, USERNAME, PASSWORD, ids)
+        checks.check(
+            "added torrents arrive as a delta",
+            not stand_in.last_sync.get("full_update") and set(stand_in.last_sync["torrents"]) == set(ids),
+            stand_in.last_sync
+        )
+        checks.check("all torrents known", set(status) == set(ids), list(status))
+
+        stand_in.torrents[ids[0]].update(state="downloading", progress=0.5, dlspeed=1024)
+        status = await service.get_torrents_status("127.0.0.1", port, USERNAME, PASSWORD, ids)
+        checks.check(
+            "delta only carries changed fields",
+            not stand_in.last_sync.get("full_update")
+            and stand_in.last_sync["torrents"] == {ids[0]: {"state": "downloading", "progress": 0.5, "dlspeed": 1024}},
+            stand_in.last_sync
+        )
+        checks.check(
+            "delta merged into the kept fields",
+            status[ids[0]]["progress"] == 0.5 and status[ids[0]]["category"] == "audiobooks"
+            and status[ids[1]]["state"] == "metaDL",
+            status[ids[0]]
+        )
+
+        del stand_in.torrents[ids[1]]
+        status = await service.get_torrents_status("127.0.0.1", port, USERNAME, PASSWORD, ids)
+        checks.check(
+            "torrents_removed drops the torrent",
+            stand_in.last_sync.get("torrents_removed") == [ids[1]] and ids[1] not in status,
+            stand_in.last_sync
+        )
+
+        stand_in.snapshots.clear()
+        stand_in.torrents.pop(ids[2])
+        status = await service.get_torrents_status("127.0.0.1", port, USERNAME, PASSWORD, ids)
+        checks.check(
+            "full_update after a lost rid replaces the list",
+            stand_in.last_sync.get("full_update") is True and set(status) == {ids[0], ids[3]}
+            and status[ids[0]]["progress"] == 0.5,
+            list(status)
+        )
+        checks.check(
+            "free space from server_state",
+            session.server_state.get("free_space_on_disk") == 500 * 1024 ** 3
+        )
+
+        if args.verbose:
+            print(f"Session stats: {session.stats}")
+            print(f"Stand-in calls: {len(stand_in.calls)}")
+    finally:
+        await service.close()
+        server.shutdown()
+
+    # Newer qBittorrent releases name the session cookie per WebUI port
+    print("Per-port session cookie name")
+    stand_in = StandIn(cookie_name="QBT_SID_8080")
+    server = stand_in.serve()
+    port = server.server_address[1]
+    service = QBittorrentService()
+    session = service.session("127.0.0.1", port, USERNAME, PASSWORD)
+    try:
+        version = (await session.request("GET", "app/version")).text
+        await session.request("GET", "app/version")
+        checks.check("logged in and cookie reused", version == "v4.6.0" and stand_in.logins == 1, stand_in.logins)
+        stand_in.sids.clear()
+        version = (await session.request("GET", "app/version")).text
+        checks.check("re-login on 403", version == "v4.6.0" and stand_in.logins == 2, stand_in.logins)
+        rejected = await service.test_connection("127.0.0.1", port, USERNAME, "wrong")
+        checks.check("wrong password still rejected", not rejected["success"], rejected)
+    finally:
+        await service.close()
+        server.shutdown()
+
+    print(f"{checks.passed} passed, {checks.failed} failed")
+    return checks.failed == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the qBittorrent service against a local stand-in")
+    parser.add_argument("--verbose", action="store_true", help="Print session stats")
+    args = parser.parse_args()
+    if not asyncio.run(run(args)):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
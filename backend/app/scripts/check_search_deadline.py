@@ -0,0 +1,158 @@
+"""
+⏱️ Search Deadline Check
+Runs per-tracker Jackett searches against a local stand-in whose trackers
+answer after a set delay, and checks that trackers missing the search
+deadline or the app's own timeout are dropped as timeouts while the results
+of the trackers that already answered are kept.
+
+    python -m backend.app.scripts.check_search_deadline
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+from backend.app.config import settings
+from backend.app.db.models import App, Indexer
+from backend.app.services.indexer_health import indexer_health
+from backend.app.services.search_service import search_service
+
+# Tracker id -> seconds before it answers
+DELAYS = {"fast": 0.1, "slow": 10.0}
+
+
+def stand_in() -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            # /api/v2.0/indexers/<tracker>/results
+            tracker = self.path.split("/")[4]
+            time.sleep(DELAYS.get(tracker, 0))
+            body = json.dumps({"Results": [
+                {
+                    "Title": f"{tracker} release {i} epub",
+                    "MagnetUri": f"magnet:?xt=urn:btih:{i:040d}",
+                    "Size": 1024 * 1024,
+                    "Seeders": 10 - i
+                }
+                for i in range(2)
+            ]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class Checks:
+    def __init__(self):
+        self.passed = 0
+        self.failed = 0
+
+    def check(self, name: str, ok: bool, detail: Any = ""):
+        if ok:
+            self.passed += 1
+            print(f"  ✅ {name}")
+        else:
+            self.failed += 1
+            print(f"  ❌ {name} {detail}")
+
+
+def jackett(app_id: int, base_url: str, trackers: List[str]):
+    app = App(id=app_id, name=f"Jackett {app_id}", app_type="jackett", base_url=base_url, api_key="key", enabled=True)
+    indexers = [
+        Indexer(id=app_id * 10 + i, app_id=app_id, external_id=tracker, name=tracker, protocol="torrent", enabled=True)
+        for i, tracker in enumerate(trackers)
+    ]
+    return app, indexers
+
+
+async def search(app: App, indexers: List[Indexer], deadline: float):
+    started = time.monotonic()
+    sources = [
+        (results, source)
+        async for results, source in search_service.stream_sources([(app, indexers)], "release", deadline=deadline)
+    ]
+    return sources, time.monotonic() - started
+
+
+def trackers(source: Dict[str, Any]) -> Dict[str, str]:
+    return {t["indexer_name"]: t["status"] for t in source.get("indexers") or []}
+
+
+def timeouts(indexer: Indexer) -> int:
+    health = indexer_health.snapshot(indexer_health.indexer_key(indexer.id), settings.jackett_tracker_timeout)
+    return health["timeouts"] if health else 0
+
+
+async def run(args) -> bool:
+    server = stand_in()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    settings.jackett_per_tracker = True
+    settings.jackett_tracker_timeout = 30.0
+    checks = Checks()
+
+    try:
+        print(f"Search deadline ({args.deadline}s)")
+        app, indexers = jackett(1, base_url, ["fast", "slow"])
+        sources, elapsed = await search(app, indexers, args.deadline)
+        results, source = sources[0]
+        checks.check("one status for the app", len(sources) == 1, sources)
+        checks.check("returned by the deadline", elapsed < args.deadline + 0.5, f"{elapsed:.2f}s")
+        checks.check("fast tracker's results kept", len(results) == 2 and source["results"] == 2, source)
+        checks.check("app reported partial", source["status"] == "partial", source["status"])
+        checks.check("slow tracker timed out", trackers(source) == {"fast": "ok", "slow": "timeout"}, trackers(source))
+        checks.check("timeout recorded for the slow tracker only", (timeouts(indexers[0]), timeouts(indexers[1])) == (0, 1))
+
+        print(f"App timeout ({args.deadline}s, search deadline {args.deadline * 5}s)")
+        timeout, search_service.timeout = search_service.timeout, args.deadline
+        try:
+            app, indexers = jackett(2, base_url, ["fast", "slow"])
+            sources, elapsed = await search(app, indexers, args.deadline * 5)
+        finally:
+            search_service.timeout = timeout
+        results, source = sources[0]
+        checks.check("returned at the app timeout", elapsed < args.deadline + 0.5, f"{elapsed:.2f}s")
+        checks.check("fast tracker's results kept", len(results) == 2 and source["status"] == "partial", source)
+
+        print("Trackers still queued at the deadline")
+        concurrency, settings.jackett_max_concurrency = settings.jackett_max_concurrency, 1
+        try:
+            app, indexers = jackett(3, base_url, ["fast", "slow", "fast"])
+            sources, elapsed = await search(app, indexers, args.deadline)
+        finally:
+            settings.jackett_max_concurrency = concurrency
+        results, source = sources[0]
+        statuses = [t["status"] for t in source["indexers"]]
+        checks.check("answered tracker kept", len(results) == 2 and statuses == ["ok", "timeout", "timeout"], statuses)
+        checks.check(
+            "no timeout recorded for a tracker that never started",
+            [timeouts(indexer) for indexer in indexers] == [0, 1, 0]
+        )
+    finally:
+        server.shutdown()
+
+    print(f"{checks.passed} passed, {checks.failed} failed")
+    return checks.failed == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that per-tracker Jackett searches keep answered trackers at the deadline")
+    parser.add_argument("--deadline", type=float, default=1.0, help="Search deadline in seconds")
+    args = parser.parse_args()
+    if not asyncio.run(run(args)):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# File: backend/app/services/bulk_search.py
+"""
+📦 Bulk Search Jobs
+
+Runs many searches (free-text queries or book IDs) as one background job:
+
+- sources are loaded once and every query shares one HTTP connection pool
+- BULK_SEARCH_CONCURRENCY queries run at once; the global indexer limiter
+  keeps each indexer within INDEXER_MAX_CONCURRENCY / INDEXER_RATE_LIMIT
+- finished queries are appended to the job as they complete, so clients can
+  poll with a cursor (`since`) and show results incrementally
+- results go through the search cache like interactive searches
+
+Jobs live in memory; the most recent MAX_JOBS are kept.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.config import settings
+from backend.app.db.models.book import Book
+from backend.app.services.search_service import search_service
+
+logger = logging.getLogger(__name__)
+
+
+class BulkSearchJob:
+    """One bulk search: its queries, progress and finished items"""
+
+    def __init__(self, queries: List[Dict[str, Any]], limit: int, results_per_query: int):
+        self.id = uuid.uuid4().hex[:12]
+        self.queries = queries
+        self.limit = limit
+        self.results_per_query = results_per_query
+        self.status = "queued"  # queued / running / completed / cancelled / failed
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.completed = 0
+        self.failed = 0
+        # Finished queries in completion order
+        self.items: List[Dict[str, Any]] = []
+        self.task: Optional[asyncio.Task] = None
+        self.started = time.monotonic()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "cancelled", "failed")
+
+    def progress(self) -> Dict[str, Any]:
+        total = len(self.queries)
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "error": self.error,
+            "total": total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "percent": round(100 * (self.completed + self.failed) / total, 1) if total else 100.0,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "elapsed_ms": round((time.monotonic() - self.started) * 1000)
+        }
+
+    def to_dict(self, since: int = 0) -> Dict[str, Any]:
+        """Progress plus items finished from position `since` on"""
+        data = self.progress()
+        data["items"] = self.items[since:]
+        data["next"] = len(self.items)
+        return data
+
+
+class BulkSearchService:
+    """Creates, runs and tracks bulk search jobs"""
+
+    MAX_JOBS = 50
+    MAX_QUERIES = 1000
+
+    def __init__(self):
+        self._jobs: "OrderedDict[str, BulkSearchJob]" = OrderedDict()
+
+    async def create_job(
+        self,
+        db: AsyncSession,
+        queries: Optional[List[str]] = None,
+        book_ids: Optional[List[int]] = None,
+        categories: Optional[List[str]] = None,
+        limit: int = 100,
+        results_per_query: int = 20
+    ) -> BulkSearchJob:
+        """
+        Queue a job for free-text queries and/or book IDs (searched as
+        "author title"); raises ValueError if there is nothing to search
+        """
+        items = [{"query": query.strip(), "book_id": None} for query in queries or [] if query.strip()]
+
+        if book_ids:
+            result = await db.execute(
+                select(Book.id, Book.title, Book.author_name).where(Book.id.in_(book_ids))
+            )
+            found = {row.id: row for row in result.all()}
+            for book_id in book_ids:
+                book = found.get(book_id)
+                if book is None:
+                    continue
+                query = f"{book.author_name} {book.title}" if book.author_name else book.title
+                items.append({"query": query, "book_id": book_id})
+
+        if not items:
+            raise ValueError("No queries or known book IDs to search")
+        if len(items) > self.MAX_QUERIES:
+            raise ValueError(f"At most {self.MAX_QUERIES} queries per job")
+
+        # Everything the searches need from the DB is read now
+        sources = await search_service.load_sources(db)
+
+        job = BulkSearchJob(items, limit, results_per_query)
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.MAX_JOBS:
+            _, old = self._jobs.popitem(last=False)
+            if old.task and not old.done:
+                old.task.cancel()
+
+        job.task = asyncio.create_task(self._run(job, sources, categories))
+        logger.info(f"📦 Bulk search {job.id}: {len(items)} queries")
+        return job
+
+    async def _run(self, job: BulkSearchJob, sources, categories: Optional[List[str]]):
+        job.status = "running"
+        job.started = time.monotonic()
+        semaphore = asyncio.Semaphore(max(1, settings.bulk_search_concurrency))
+
+        async def run_query(item: Dict[str, Any], client):
+            async with semaphore:
+                started = time.monotonic()
+                try:
+                    results, statuses, cache_state = await search_service.search_sources(
+                        sources, item["query"], categories=categories, limit=job.limit, client=client
+                    )
+                except Exception as e:
+                    logger.error(f"Bulk search query '{item['query']}' failed: {e}", exc_info=True)
+                    job.failed += 1
+                    job.items.append({**item, "status": "error", "error": str(e), "total": 0, "results": []})
+                    return
+
+                job.completed += 1
+                job.items.append({
+                    **item,
+                    "status": "ok",
+                    "partial": not search_service.is_complete(statuses),
+                    "cache": cache_state,
+                    "total": len(results),
+                    "latency_ms": round((time.monotonic() - started) * 1000),
+                    "results": [result.to_dict() for result in results[:job.results_per_query]]
+                })
+
+        try:
+            async with search_service.shared_client() as client:
+                await asyncio.gather(*(run_query(item, client) for item in job.queries))
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+        except Exception as e:
+            logger.error(f"Bulk search {job.id} failed: {e}", exc_info=True)
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.utcnow()
+            logger.info(
+                f"📦 Bulk search {job.id} {job.status}: {job.completed} done, "
+                f"{job.failed} failed in {(time.monotonic() - job.started):.1f}s"
+            )
+
+    def get_job(self, job_id: str) -> Optional[BulkSearchJob]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        return [job.progress() for job in reversed(self._jobs.values())]
+
+    def cancel_job(self, job_id: str) -> bool:
+        """Cancel a running job (finished queries are kept); False if unknown"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        if job.task and not job.done:
+            job.task.cancel()
+            job.status = "cancelled"
+            job.finished_at = datetime.utcnow()
+        return True
+
+
+# Singleton instance
+bulk_search = BulkSearchService()
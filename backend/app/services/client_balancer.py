@@ -0,0 +1,186 @@
+# File: backend/app/services/client_balancer.py
+"""
+⚖️ Download Client Balancer
+
+Chooses which download client gets a grab when several are enabled.
+
+- Candidates are the enabled clients (or only the requested one). A client
+  whose `config` has `"media_types": [...]` is pinned: it only takes those
+  media types, and grabs of a pinned type only go to the clients pinned
+  to it
+- Candidates are ordered by live queue depth (tracked downloads still
+  queued/checking/downloading plus grabs being sent right now), then free
+  space; the default client wins ties
+- Free space is asked from each client at most every
+  DOWNLOAD_CLIENT_STATS_TTL seconds (Deluge core.get_free_space,
+  qBittorrent's sync server state); clients with less than
+  DOWNLOAD_CLIENT_MIN_FREE_SPACE GB free go last
+- A client that can't be reached is marked down for
+  DOWNLOAD_CLIENT_COOLDOWN seconds and goes last; the download manager
+  fails over to the next candidate
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.config import settings
+from backend.app.db.models.download import Download
+from backend.app.db.models.download_client import DownloadClient
+from backend.app.services.deluge_service import deluge_service, deluge_transport
+from backend.app.services.qbittorrent_service import qbittorrent_service
+
+logger = logging.getLogger(__name__)
+
+# Client types grabs can be sent to
+SUPPORTED_CLIENT_TYPES = ("deluge", "qbittorrent")
+
+# Download statuses that count towards a client's queue
+QUEUED_STATUSES = ("queued", "checking", "downloading")
+
+# Seconds to wait for a free-space answer before ranking without it
+FREE_SPACE_TIMEOUT = 3.0
+
+
+class ClientBalancer:
+    """Ranks download clients for a grab and remembers which are down"""
+
+    def __init__(self):
+        self._pending: Dict[int, int] = {}
+        self._down_until: Dict[int, float] = {}
+        self._free_space: Dict[int, Tuple[float, Optional[int]]] = {}
+        self.stats = {"selections": 0, "failovers": 0}
+
+    @staticmethod
+    def media_types(client: DownloadClient) -> Optional[List[str]]:
+        """Media types a client is pinned to (None if it takes everything)"""
+        if not client.config:
+            return None
+        try:
+            media_types = json.loads(client.config).get("media_types")
+        except (ValueError, AttributeError):
+            return None
+        return list(media_types) if media_types else None
+
+    async def candidates(
+        self,
+        db: AsyncSession,
+        media_type: str,
+        client_id: Optional[int] = None
+    ) -> List[DownloadClient]:
+        """Clients to try for a grab, best first"""
+        query = select(DownloadClient).where(DownloadClient.client_type.in_(SUPPORTED_CLIENT_TYPES))
+        if client_id:
+            query = query.where(DownloadClient.id == client_id)
+        else:
+            query = query.where(DownloadClient.enabled == True)
+        clients = list((await db.execute(query)).scalars().all())
+
+        if not client_id:
+            pinned = [client for client in clients if media_type in (self.media_types(client) or [])]
+            clients = pinned or [client for client in clients if self.media_types(client) is None]
+        if len(clients) <= 1:
+            self.stats["selections"] += 1
+            return clients
+
+        depth = dict((await db.execute(
+            select(Download.client_id, func.count(Download.id))
+            .where(
+                Download.client_id.in_([client.id for client in clients]),
+                Download.status.in_(QUEUED_STATUSES)
+            )
+            .group_by(Download.client_id)
+        )).all())
+        free = await asyncio.gather(*(self.free_space(client) for client in clients))
+        free_space = {client.id: space for client, space in zip(clients, free)}
+        min_free = settings.download_client_min_free_space * 1024 ** 3
+        now = time.monotonic()
+
+        def rank(client: DownloadClient):
+            space = free_space.get(client.id)
+            return (
+                self._down_until.get(client.id, 0) > now,
+                space is not None and space < min_free,
+                depth.get(client.id, 0) + self._pending.get(client.id, 0),
+                -(space or 0),
+                not client.is_default,
+                client.id
+            )
+
+        clients.sort(key=rank)
+        self.stats["selections"] += 1
+        order = ", ".join(f"{c.name} (queue {depth.get(c.id, 0) + self._pending.get(c.id, 0)})" for c in clients)
+        logger.debug(f"⚖️ Client order for {media_type}: {order}")
+        return clients
+
+    async def free_space(self, client: DownloadClient) -> Optional[int]:
+        """Free bytes on the client (cached; None if unknown)"""
+        cached = self._free_space.get(client.id)
+        if cached and time.monotonic() - cached[0] < settings.download_client_stats_ttl:
+            return cached[1]
+        if self._down_until.get(client.id, 0) > time.monotonic():
+            return cached[1] if cached else None
+
+        try:
+            if client.client_type == "qbittorrent":
+                fetch = qbittorrent_service.get_free_space(
+                    client.host, client.port, client.username, client.password, client.use_ssl
+                )
+            else:
+                fetch = deluge_service.get_free_space(
+                    client.host, client.port, client.password or "", client.use_ssl,
+                    client.username, deluge_transport(client.config)
+                )
+            space = await asyncio.wait_for(fetch, FREE_SPACE_TIMEOUT)
+            space = int(space) if space is not None and int(space) >= 0 else None
+        except (httpx.TransportError, ConnectionError, asyncio.TimeoutError) as e:
+            logger.warning(f"⚠️ {client.name} unreachable ({e!r}) - ranking it last")
+            self.mark_down(client)
+            space = None
+        except Exception as e:
+            logger.warning(f"⚠️ Could not get free space from {client.name}: {e}")
+            space = None
+
+        self._free_space[client.id] = (time.monotonic(), space)
+        return space
+
+    # ------------------------------------------------------------------
+    # Bookkeeping around a send
+    # ------------------------------------------------------------------
+
+    def reserve(self, client: DownloadClient):
+        """Count a grab being sent to a client (until `release`)"""
+        self._pending[client.id] = self._pending.get(client.id, 0) + 1
+
+    def release(self, client: DownloadClient):
+        count = self._pending.get(client.id, 0) - 1
+        if count > 0:
+            self._pending[client.id] = count
+        else:
+            self._pending.pop(client.id, None)
+
+    def mark_down(self, client: DownloadClient):
+        """Rank a client last for DOWNLOAD_CLIENT_COOLDOWN seconds"""
+        self._down_until[client.id] = time.monotonic() + settings.download_client_cooldown
+
+    def mark_up(self, client: DownloadClient):
+        self._down_until.pop(client.id, None)
+
+    def status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "pending": dict(self._pending),
+            "down": [client_id for client_id, until in self._down_until.items() if until > now],
+            "free_space": {client_id: space for client_id, (_, space) in self._free_space.items()},
+            "stats": dict(self.stats)
+        }
+
+
+# Singleton instance
+client_balancer = ClientBalancer()
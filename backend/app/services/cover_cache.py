@@ -0,0 +1,246 @@
+# File: backend/app/services/cover_cache.py
+"""
+🖼️ Cover Cache Service
+
+Content-addressed store for downloaded cover images.
+- Covers are streamed to disk and stored once per SHA-256 of their bytes
+- Conditional requests (ETag / Last-Modified) skip unchanged covers
+- Book folders get a hardlink to the stored blob (copy across devices)
+
+File I/O (temp file writes, the index, blob moves) runs in worker threads
+so cover downloads don't block the event loop.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+
+from backend.app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CoverCache:
+    """Deduplicated, conditionally refreshed cover image store"""
+
+    INDEX_FILENAME = "index.json"
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root) if root else settings.config_dir / "covers"
+        self.timeout = 30.0
+        # Covers checked this recently are reused without any request
+        self.revalidate_after = 3600.0
+        self._index: Optional[Dict[str, Dict]] = None
+        self._url_locks: Dict[str, asyncio.Lock] = {}
+        self._url_users: Dict[str, int] = {}
+        self._index_lock = asyncio.Lock()
+
+    # ------------------------------------------------------------------
+    # Index (url -> validators + content hash)
+    # ------------------------------------------------------------------
+
+    def _index_path(self) -> Path:
+        return self.root / self.INDEX_FILENAME
+
+    async def _load_index(self) -> Dict[str, Dict]:
+        if self._index is None:
+            async with self._index_lock:
+                if self._index is None:
+                    self._index = await asyncio.to_thread(self._read_index)
+        return self._index
+
+    def _read_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self._index_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"⚠️ Cover index unreadable, starting fresh: {e}")
+            return {}
+
+    async def _save_index(self):
+        """Write the index atomically so a crash never leaves it half-written"""
+        async with self._index_lock:
+            data = json.dumps(self._index or {})
+            await asyncio.to_thread(self._write_index, data)
+
+    def _write_index(self, data: str):
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".index-")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self._index_path())
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def blob_path(self, digest: str) -> Path:
+        """Path of the stored cover for a content hash"""
+        return self.root / digest[:2] / f"{digest}.img"
+
+    # ------------------------------------------------------------------
+    # Fetching
+    # ------------------------------------------------------------------
+
+    async def fetch(self, cover_url: str) -> Optional[Path]:
+        """
+        Return the stored blob for a cover URL, downloading it only if needed
+
+        Covers checked within `revalidate_after` seconds are reused without a
+        request. Older ones are revalidated with If-None-Match /
+        If-Modified-Since, so an unchanged cover costs a 304 and no body.
+        Concurrent calls for the same URL share a single request.
+        """
+        lock = self._url_locks.get(cover_url)
+        if lock is None:
+            lock = self._url_locks[cover_url] = asyncio.Lock()
+        self._url_users[cover_url] = self._url_users.get(cover_url, 0) + 1
+        try:
+            async with lock:
+                return await self._fetch(cover_url)
+        finally:
+            # Drop the lock once nobody holds or waits on it
+            users = self._url_users[cover_url] - 1
+            if users:
+                self._url_users[cover_url] = users
+            else:
+                del self._url_users[cover_url]
+                del self._url_locks[cover_url]
+
+    async def _fetch(self, cover_url: str) -> Optional[Path]:
+        index = await self._load_index()
+        entry = index.get(cover_url)
+        cached_blob = self.blob_path(entry["sha256"]) if entry else None
+
+        headers = {}
+        if cached_blob and await asyncio.to_thread(cached_blob.exists):
+            if time.time() - entry.get("checked_at", 0) < self.revalidate_after:
+                return cached_blob
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        else:
+            cached_blob = None
+
+        async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=True) as client:
+            async with client.stream("GET", cover_url, headers=headers) as response:
+                if response.status_code == 304 and cached_blob:
+                    logger.debug(f"🖼️ Cover not modified: {cover_url}")
+                    entry["checked_at"] = time.time()
+                    await self._save_index()
+                    return cached_blob
+
+                if response.status_code != 200:
+                    logger.error(f"Failed to download cover: HTTP {response.status_code}")
+                    return None
+
+                digest, blob = await self._stream_to_store(response)
+                etag = response.headers.get("etag")
+                last_modified = response.headers.get("last-modified")
+
+        index[cover_url] = {
+            "sha256": digest,
+            "etag": etag,
+            "last_modified": last_modified,
+            "checked_at": time.time()
+        }
+        await self._save_index()
+        return blob
+
+    async def _stream_to_store(self, response: httpx.Response) -> tuple[str, Path]:
+        """Stream the body to a temp file while hashing, then move it into place"""
+        hasher = hashlib.sha256()
+        f, tmp_path = await asyncio.to_thread(self._open_temp)
+        try:
+            try:
+                async for chunk in response.aiter_bytes(self.CHUNK_SIZE):
+                    hasher.update(chunk)
+                    await asyncio.to_thread(f.write, chunk)
+            finally:
+                await asyncio.to_thread(f.close)
+
+            digest = hasher.hexdigest()
+            blob = self.blob_path(digest)
+            if await asyncio.to_thread(self._store_blob, tmp_path, blob):
+                logger.debug(f"🖼️ Stored new cover: {digest[:12]}")
+            else:
+                # Identical image already stored for another book/URL
+                logger.debug(f"🖼️ Cover deduplicated: {digest[:12]}")
+            return digest, blob
+        except BaseException:
+            await asyncio.to_thread(self._discard, tmp_path)
+            raise
+
+    def _open_temp(self) -> tuple:
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".cover-")
+        return os.fdopen(fd, 'wb'), tmp_path
+
+    @staticmethod
+    def _store_blob(tmp_path: str, blob: Path) -> bool:
+        """Move a downloaded temp file to its blob path (False if already stored)"""
+        if blob.exists():
+            os.unlink(tmp_path)
+            return False
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, blob)
+        return True
+
+    @staticmethod
+    def _discard(tmp_path: str):
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+    # ------------------------------------------------------------------
+    # Linking into book folders
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def link_into(blob: Path, target: Path) -> bool:
+        """
+        Make `target` point at `blob`
+
+        Uses a hardlink so the bytes exist once on disk; falls back to a copy
+        when the book folder lives on another filesystem.
+        Returns False when the target already holds this exact blob.
+        Blocking - call it from a worker thread.
+        """
+        try:
+            if target.exists():
+                if os.path.samefile(blob, target):
+                    return False
+                # Cross-device copy from an earlier save - compare contents
+                if target.stat().st_size == blob.stat().st_size:
+                    with open(target, 'rb') as f:
+                        if hashlib.file_digest(f, "sha256").hexdigest() == blob.stem:
+                            return False
+        except OSError:
+            pass
+
+        tmp_target = target.with_name(f".{target.name}.tmp")
+        if tmp_target.exists():
+            tmp_target.unlink()
+        try:
+            os.link(blob, tmp_target)
+        except OSError:
+            shutil.copyfile(blob, tmp_target)
+        os.replace(tmp_target, target)
+        return True
+
+
+# Singleton instance
+cover_cache = CoverCache()
@@ -1,23 +1,388 @@
 # File: backend/app/services/deluge_service.py
+"""
+Deluge client
 
+Two transports, chosen per download client by its `config`:
+
+- "web" (default): JSON-RPC through the Deluge WebUI (port 8112)
+- "daemon" (`{"transport": "daemon"}`): rencode RPC straight to deluged
+  (port 58846, user from the daemon's auth file) over one persistent TLS
+  connection - no WebUI hop, and it keeps working when the WebUI is down
+
+Both keep one long-lived, authenticated session per server and expose the
+same calls, so everything above `DelugeService.session()` is shared.
+"""
+
+import asyncio
 import base64
+from abc import ABC, abstractmethod
 import httpx
+import json
 import logging
-from typing import Optional, Dict, Any
+import threading
+from typing import Optional, Dict, Any, List, Sequence, Set, Tuple, Union
+
+from deluge_client import DelugeRPCClient
+from deluge_client.client import DelugeClientException, RemoteException
+
+from backend.app.services.result_merger import parse_infohash
+from backend.app.services.torrent_resolver import torrent_resolver
 
 logger = logging.getLogger(__name__)
 
+# Deluge WebUI JSON-RPC error codes
+ERROR_NOT_AUTHENTICATED = 1
+ERROR_UNKNOWN_METHOD = 2
+
+TRANSPORT_WEB = "web"
+TRANSPORT_DAEMON = "daemon"
+
+# Socket timeout for daemon calls (same as the WebUI's HTTP timeout)
+DAEMON_TIMEOUT = 30.0
+
+
+def deluge_transport(config: Union[str, Dict[str, Any], None]) -> str:
+    """Transport from a download client's config (JSON text or dict)"""
+    if isinstance(config, str):
+        try:
+            config = json.loads(config)
+        except ValueError:
+            config = None
+    if isinstance(config, dict) and config.get("transport") == TRANSPORT_DAEMON:
+        return TRANSPORT_DAEMON
+    return TRANSPORT_WEB
+
+
+def is_connection_error(error: BaseException) -> bool:
+    """True if a call failed because the client couldn't be reached (not a rejected call)"""
+    return isinstance(error, (httpx.TransportError, ConnectionError))
+
+
+class DelugeRPCError(Exception):
+    """Error returned by a Deluge JSON-RPC call"""
+
+    def __init__(self, code: Optional[int], message: str):
+        super().__init__(f"{message} (code: {code})")
+        self.code = code
+        self.message = message
+
+
+class DelugeConnectionError(ConnectionError):
+    """The Deluge daemon can't be reached (or dropped the connection)"""
+
+
+class BaseDelugeSession(ABC):
+    """
+    Transport-independent part of a Deluge session
+    
+    Caches the label list and whether the label plugin is installed. Label
+    creation is serialized so concurrent grabs don't race to create the
+    same label.
+    """
+    
+    # Whether web.* methods (WebUI only) are available
+    web = True
+    
+    def __init__(self, base_url: str, password: str):
+        self.base_url = base_url
+        self.password = password
+        self._label_lock = asyncio.Lock()
+        self.labels: Optional[Set[str]] = None
+        self.label_plugin: Optional[bool] = None
+        self.stats = {"calls": 0, "logins": 0}
+    
+    @abstractmethod
+    async def login(self):
+        """Authenticate; raises if the server rejects the credentials"""
+    
+    @abstractmethod
+    async def call(self, method: str, *params) -> Any:
+        """Call one RPC method and return its result"""
+    
+    async def call_many(self, calls: Sequence[Tuple[str, Sequence[Any]]]) -> List[Any]:
+        """Several calls; one result (or exception instance) per call"""
+        return list(await asyncio.gather(
+            *(self.call(method, *params) for method, params in calls),
+            return_exceptions=True
+        ))
+    
+    async def set_label(self, torrent_id: str, label: str):
+        """
+        Apply a label, creating it if needed (non-fatal on errors)
+        
+        In steady state this is one call: label.set_torrent.
+        """
+        await self.set_labels([torrent_id], label)
+    
+    async def set_labels(self, torrent_ids: List[str], label: str):
+        """Apply one label to several torrents (checked/created once, set concurrently)"""
+        if self.label_plugin is False:
+            logger.info("[Deluge] ⚠️  Label plugin not installed - skipping label")
+            return
+        
+        try:
+            if self.labels is None or label not in self.labels:
+                await self._ensure_label(label)
+                if self.label_plugin is False:
+                    return
+            
+            results = await self.call_many([("label.set_torrent", (torrent_id, label)) for torrent_id in torrent_ids])
+            failed = [torrent_id for torrent_id, result in zip(torrent_ids, results) if isinstance(result, Exception)]
+            if failed:
+                error = next(result for result in results if isinstance(result, Exception))
+                if isinstance(error, DelugeRPCError) and error.code == ERROR_UNKNOWN_METHOD:
+                    self.label_plugin = False
+                    raise error
+                # Label removed in Deluge since we cached it - create it again
+                logger.info(f"[Deluge] 🔄 Label '{label}' rejected ({error}), refreshing labels")
+                self.labels = None
+                await self._ensure_label(label)
+                retried = await self.call_many([("label.set_torrent", (torrent_id, label)) for torrent_id in failed])
+                errors = [result for result in retried if isinstance(result, Exception)]
+                if errors:
+                    raise errors[0]
+            
+            logger.info(f"[Deluge] ✅ Label '{label}' applied to {len(torrent_ids)} torrent(s)")
+        except Exception as e:
+            logger.warning(f"[Deluge] ⚠️  Label operation failed (non-fatal): {e}")
+    
+    async def _ensure_label(self, label: str):
+        async with self._label_lock:
+            if self.labels is None:
+                try:
+                    self.labels = set(await self.call("label.get_labels") or [])
+                    self.label_plugin = True
+                except DelugeRPCError as e:
+                    if e.code == ERROR_UNKNOWN_METHOD:
+                        logger.warning("[Deluge] ⚠️  Label plugin not installed - skipping labels (non-fatal)")
+                        self.label_plugin = False
+                        return
+                    raise
+            
+            if label not in self.labels:
+                logger.info(f"[Deluge] ➕ Label '{label}' doesn't exist, creating it...")
+                await self.call("label.add", label)
+                self.labels.add(label)
+    
+    async def close(self):
+        pass
+
+
+class DelugeSession(BaseDelugeSession):
+    """
+    Long-lived session with one Deluge WebUI
+    
+    Keeps one HTTP client (and its `_session_id` cookie) open and logs in
+    again only when Deluge answers "Not authenticated".
+    """
+    
+    def __init__(self, base_url: str, password: str):
+        super().__init__(base_url, password)
+        self.client = httpx.AsyncClient(timeout=30.0)
+        self._authenticated = False
+        self._login_lock = asyncio.Lock()
+        self._request_id = 0
+    
+    async def _post(self, method: str, params: list) -> Dict[str, Any]:
+        self._request_id += 1
+        self.stats["calls"] += 1
+        response = await self.client.post(
+            f"{self.base_url}/json",
+            json={"method": method, "params": params, "id": self._request_id},
+            headers={"Content-Type": "application/json"}
+        )
+        return response.json()
+    
+    async def login(self):
+        """Log in (once for concurrent callers); raises if the password is rejected"""
+        async with self._login_lock:
+            if self._authenticated:
+                return
+            logger.info(f"[Deluge] 🔐 Authenticating to {self.base_url}...")
+            result = await self._post("auth.login", [self.password])
+            self.stats["logins"] += 1
+            if not result.get("result"):
+                logger.error(f"[Deluge] ❌ Authentication failed!")
+                raise Exception("Authentication failed")
+            self._authenticated = True
+            logger.info(f"[Deluge] ✅ Authenticated (session reused until Deluge drops it)")
+    
+    async def call(self, method: str, *params) -> Any:
+        """Call a JSON-RPC method and return its result; raises DelugeRPCError"""
+        if not self._authenticated:
+            await self.login()
+        
+        result = await self._post(method, list(params))
+        error = result.get("error")
+        if error and error.get("code") == ERROR_NOT_AUTHENTICATED:
+            # Session expired (or WebUI restarted) - log in again and retry once
+            logger.info(f"[Deluge] 🔄 Session expired, re-authenticating")
+            self._authenticated = False
+            await self.login()
+            result = await self._post(method, list(params))
+            error = result.get("error")
+        
+        if error:
+            raise DelugeRPCError(error.get("code"), error.get("message", "Unknown error"))
+        return result.get("result")
+    
+    async def close(self):
+        await self.client.aclose()
+
+
+class DelugeDaemonSession(BaseDelugeSession):
+    """
+    Persistent connection straight to a Deluge daemon (rencode RPC over TLS)
+    
+    deluge-client is blocking and its socket carries one call at a time, so
+    calls are serialized and run in a worker thread; `call_many` sends a
+    whole batch in one thread hop. The connection is opened (and logged in)
+    on first use and re-opened only when the daemon drops it.
+    """
+    
+    web = False
+    
+    def __init__(self, host: str, port: int, username: str, password: str):
+        super().__init__(f"deluge://{host}:{port}", password)
+        self.host = host
+        self.port = port
+        self.username = username
+        self._client: Optional[DelugeRPCClient] = None
+        self._lock = asyncio.Lock()
+        # Guards the socket itself - a timed-out caller's thread may still be using it
+        self._socket_lock = threading.Lock()
+    
+    async def login(self):
+        """Connect and log in (no-op if connected); raises if the daemon rejects the user"""
+        async with self._lock:
+            await asyncio.to_thread(self._run, [])
+    
+    async def call(self, method: str, *params) -> Any:
+        """Call a daemon method and return its result; raises DelugeRPCError"""
+        result = (await self.call_many([(method, params)]))[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+    
+    async def call_many(self, calls: Sequence[Tuple[str, Sequence[Any]]]) -> List[Any]:
+        """Several calls in one thread hop; one result (or exception instance) per call"""
+        async with self._lock:
+            self.stats["calls"] += len(calls)
+            return await asyncio.to_thread(self._run, list(calls))
+    
+    def _run(self, calls: List[Tuple[str, Sequence[Any]]]) -> List[Any]:
+        # Worker thread
+        with self._socket_lock:
+            client = self._connect()
+            results: List[Any] = []
+            for position, (method, params) in enumerate(calls):
+                try:
+                    results.append(client.call(method, *params))
+                except RemoteException as e:
+                    results.append(self._remote_error(e))
+                except (OSError, DelugeClientException) as e:
+                    # Connection lost and deluge-client's reconnect failed - the rest would fail too
+                    self._disconnect()
+                    error = DelugeConnectionError(f"Lost connection to Deluge daemon {self.host}:{self.port}: {e!r}")
+                    results.extend([error] * (len(calls) - position))
+                    break
+            return results
+    
+    def _connect(self) -> DelugeRPCClient:
+        if self._client is not None and self._client.connected:
+            return self._client
+        logger.info(f"[Deluge] 🔐 Connecting to daemon {self.host}:{self.port} as '{self.username}'...")
+        client = DelugeRPCClient(self.host, self.port, self.username, self.password, decode_utf8=True, timeout=DAEMON_TIMEOUT)
+        try:
+            client.connect()
+        except RemoteException as e:
+            logger.error(f"[Deluge] ❌ Daemon authentication failed!")
+            raise self._remote_error(e)
+        except (OSError, DelugeClientException) as e:
+            raise DelugeConnectionError(f"Cannot connect to Deluge daemon {self.host}:{self.port}: {e!r}")
+        self.stats["logins"] += 1
+        self._client = client
+        logger.info(f"[Deluge] ✅ Connected to daemon (connection kept open)")
+        return client
+    
+    def _disconnect(self):
+        client, self._client = self._client, None
+        if client is not None:
+            try:
+                client.disconnect()
+            except OSError:
+                pass
+    
+    @staticmethod
+    def _remote_error(error: RemoteException) -> DelugeRPCError:
+        """Map a daemon exception to the WebUI's error codes"""
+        # deluge-client names the exception class after the daemon's and appends the traceback
+        name = type(error).__name__
+        message = str(error).split("\n", 1)[0]
+        if name == "AttributeError":
+            return DelugeRPCError(ERROR_UNKNOWN_METHOD, message or "Unknown method")
+        if name in ("BadLoginError", "NotAuthorizedError", "AuthenticationRequired"):
+            return DelugeRPCError(ERROR_NOT_AUTHENTICATED, f"Authentication failed: {message or name}")
+        return DelugeRPCError(None, f"{name}: {message}")
+    
+    async def close(self):
+        async with self._lock:
+            await asyncio.to_thread(self._close)
+    
+    def _close(self):
+        with self._socket_lock:
+            self._disconnect()
+
+
 class DelugeService:
-    """Service for interacting with Deluge WebUI"""
+    """Service for interacting with Deluge (WebUI or daemon)"""
+    
+    def __init__(self):
+        self._sessions: Dict[Tuple[str, str, str], BaseDelugeSession] = {}
+    
+    def session(
+        self,
+        host: str,
+        port: int,
+        password: str,
+        use_ssl: bool = False,
+        username: Optional[str] = None,
+        transport: str = TRANSPORT_WEB
+    ) -> BaseDelugeSession:
+        """Shared session for a WebUI or daemon (changed credentials get a new one)"""
+        if transport == TRANSPORT_DAEMON:
+            # The daemon always speaks TLS
+            key = (f"deluge://{host}:{port}", username or "", password)
+        else:
+            protocol = "https" if use_ssl else "http"
+            key = (f"{protocol}://{host}:{port}", "", password)
+        session = self._sessions.get(key)
+        if session is None:
+            if transport == TRANSPORT_DAEMON:
+                session = DelugeDaemonSession(host, port, username or "", password)
+            else:
+                session = DelugeSession(key[0], password)
+            self._sessions[key] = session
+        return session
+    
+    async def close(self):
+        """Close all sessions (app shutdown)"""
+        sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            await session.close()
     
     async def test_connection(
         self,
         host: str,
         port: int,
         password: str,
-        use_ssl: bool = False
+        use_ssl: bool = False,
+        username: Optional[str] = None,
+        transport: str = TRANSPORT_WEB
     ) -> Dict[str, Any]:
-        """Test connection to Deluge WebUI"""
+        """Test connection to Deluge WebUI (or the daemon)"""
+        if transport == TRANSPORT_DAEMON:
+            return await self._test_daemon(host, port, username or "", password)
         try:
             protocol = "https" if use_ssl else "http"
             base_url = f"{protocol}://{host}:{port}"
@@ -87,6 +452,66 @@ class DelugeService:
                 "message": f"Error: {str(e)}"
             }
     
+    async def _test_daemon(self, host: str, port: int, username: str, password: str) -> Dict[str, Any]:
+        """Log in to the daemon and read its version"""
+        session = DelugeDaemonSession(host, port, username, password)
+        try:
+            version = await session.call("daemon.info")
+            return {
+                "success": True,
+                "message": f"Connected to Deluge daemon {version}",
+                "version_info": {"version": version, "transport": TRANSPORT_DAEMON}
+            }
+        except DelugeConnectionError:
+            return {
+                "success": False,
+                "message": f"Cannot connect to {host}:{port}. Is the Deluge daemon running and allowing remote connections?"
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Error: {str(e)}"
+            }
+        finally:
+            await session.close()
+    
+    async def _add_magnet(self, session: BaseDelugeSession, magnet: str, options: Dict[str, Any]) -> Optional[str]:
+        """Add one magnet: core.add_torrent_magnet, falling back to session.add_torrent_magnet"""
+        try:
+            return await session.call("core.add_torrent_magnet", magnet, options)
+        except DelugeRPCError as e:
+            if e.code != ERROR_UNKNOWN_METHOD:
+                raise
+        
+        logger.warning(f"[Deluge] ⚠️  core.add_torrent_magnet not available!")
+        logger.info(f"[Deluge] 🔄 Trying session method: session.add_torrent_magnet")
+        try:
+            return await session.call("session.add_torrent_magnet", magnet, options)
+        except DelugeRPCError as e:
+            if e.code == ERROR_UNKNOWN_METHOD:
+                # Log what IS available to help diagnose the daemon connection
+                logger.error(f"[Deluge] ❌ session.add_torrent_magnet also not available!")
+                try:
+                    available_methods = await session.call("daemon.get_method_list") or []
+                    magnet_methods = [m for m in available_methods if 'magnet' in m.lower() or 'torrent' in m.lower()]
+                    logger.info(f"[Deluge] 📋 Available torrent/magnet methods: {magnet_methods[:20]}")
+                except DelugeRPCError:
+                    logger.error(f"[Deluge] ❌ Could not get method list")
+                logger.error(f"[Deluge] 💡 Please check if Deluge daemon is properly connected")
+            raise
+    
+    async def _add_file(self, session: BaseDelugeSession, torrent_data: bytes, options: Dict[str, Any]) -> Optional[str]:
+        logger.info(f"[Deluge] 📤 Uploading to Deluge via core.add_torrent_file")
+        torrent_b64 = base64.b64encode(torrent_data).decode('utf-8')
+        return await session.call("core.add_torrent_file", "", torrent_b64, options)
+    
+    @staticmethod
+    def _options(download_path: Optional[str]) -> Dict[str, Any]:
+        options = {}
+        if download_path:
+            options["download_location"] = download_path
+        return options
+    
     async def add_torrent(
         self,
         host: str,
@@ -95,7 +520,9 @@ class DelugeService:
         torrent_url: str,  # Can be magnet link OR .torrent URL OR Prowlarr redirect
         label: Optional[str] = None,
         download_path: Optional[str] = None,
-        use_ssl: bool = False
+        use_ssl: bool = False,
+        username: Optional[str] = None,
+        transport: str = TRANSPORT_WEB
     ) -> Dict[str, Any]:
         """
         Add a torrent to Deluge via magnet link or .torrent URL
@@ -105,363 +532,190 @@ class DelugeService:
         - core.add_torrent_url for .torrent file URLs
         - core.add_torrent_magnet also works for magnets
         
-        We'll try multiple methods with fallback
+        We'll try multiple methods with fallback. Calls go through the shared
+        session for this WebUI (or daemon), so a grab is usually one or two
+        RPCs (add, then label.set_torrent) without logging in again.
         """
         try:
-            protocol = "https" if use_ssl else "http"
-            base_url = f"{protocol}://{host}:{port}"
+            session = self.session(host, port, password, use_ssl, username, transport)
             
-            # CRITICAL: Check if this is a Prowlarr/Jackett redirect URL
-            # These look like: http://prowlarr:9696/7/download?apikey=...
-            if "/download?" in torrent_url and "apikey=" in torrent_url:
-                logger.info(f"[Deluge] Detected indexer redirect URL, fetching actual torrent/magnet...")
-                
-                # Fetch the redirect to get the actual magnet link or torrent
-                try:
-                    async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as redirect_client:
-                        redirect_response = await redirect_client.get(torrent_url)
-                        
-                        # Check if we got a magnet link (redirect)
-                        if redirect_response.status_code == 200:
-                            # Check if response is a magnet link
-                            if redirect_response.text.startswith("magnet:"):
-                                torrent_url = redirect_response.text
-                                logger.info(f"[Deluge] Resolved to magnet link")
-                            # Check if final URL is a magnet (from redirect)
-                            elif str(redirect_response.url).startswith("magnet:"):
-                                torrent_url = str(redirect_response.url)
-                                logger.info(f"[Deluge] Redirected to magnet link")
-                            # Otherwise it should be torrent file content
-                            else:
-                                # Save torrent file content temporarily or use final URL
-                                final_url = str(redirect_response.url)
-                                if final_url != torrent_url:
-                                    torrent_url = final_url
-                                    logger.info(f"[Deluge] Redirected to: {final_url}")
-                except Exception as e:
-                    logger.warning(f"[Deluge] Failed to resolve redirect URL: {e}, will try original URL")
+            logger.info(f"[Deluge] 🚀 Adding torrent to {host}:{port} ({transport}, SSL: {use_ssl})")
+            logger.info(f"[Deluge] 🔗 Torrent URL/Magnet: {torrent_url[:150]}...")
+            logger.info(f"[Deluge] 📁 Download path: {download_path or 'default'} 🏷️  Label: {label or 'none'}")
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                # Step 1: Authenticate
-                logger.info(f"[Deluge] ========================================")
-                logger.info(f"[Deluge] 🚀 Starting torrent add process")
-                logger.info(f"[Deluge] 🌐 Host: {host}:{port}")
-                logger.info(f"[Deluge] 🔒 SSL: {use_ssl}")
-                logger.info(f"[Deluge] 🔗 Torrent URL/Magnet: {torrent_url[:150]}...")
-                logger.info(f"[Deluge] 📁 Download path: {download_path or 'default'}")
-                logger.info(f"[Deluge] 🏷️  Label: {label or 'none'}")
-                logger.info(f"[Deluge] ========================================")
-                
-                login_payload = {
-                    "method": "auth.login",
-                    "params": [password],
-                    "id": 1
-                }
-                
-                logger.info(f"[Deluge] 🔐 Step 1: Authenticating to {host}:{port}...")
-                
-                auth_response = await client.post(
-                    f"{base_url}/json",
-                    json=login_payload,
-                    headers={"Content-Type": "application/json"}
-                )
-                
-                auth_result = auth_response.json()
-                logger.info(f"[Deluge] 🔐 Auth response: {auth_result}")
-                
-                if not auth_result.get("result"):
-                    logger.error(f"[Deluge] ❌ Authentication failed!")
-                    raise Exception("Authentication failed")
-                
-                session_cookie = auth_response.cookies.get("_session_id")
-                cookies = {"_session_id": session_cookie} if session_cookie else {}
-                logger.info(f"[Deluge] ✅ Authentication successful! Session ID: {session_cookie[:20] if session_cookie else 'none'}...")
-                
-                logger.info("[Deluge] Authentication successful")
-                
-                # Step 2: Add torrent with method fallback
-                options = {}
-                if download_path:
-                    options["download_location"] = download_path
-                
-                is_magnet = torrent_url.startswith("magnet:")
-                is_http_url = torrent_url.startswith("http://") or torrent_url.startswith("https://")
-                torrent_id = None
-                
-                # SPECIAL CASE: Check if HTTP URL redirects to a magnet link  
-                # (This happens with Prowlarr/Jackett)
-                if is_http_url and not is_magnet:
-                    logger.info(f"[Deluge] 🔍 Checking if URL redirects to magnet...")
-                    try:
-                        check_response = await client.get(
-                            torrent_url,
-                            follow_redirects=False,
-                            timeout=10.0
-                        )
-                        if check_response.status_code in (301, 302, 303, 307, 308):
-                            location = check_response.headers.get('location', '')
-                            if location.startswith('magnet:'):
-                                logger.info(f"[Deluge] 🧲 URL redirects to MAGNET! Using magnet instead.")
-                                torrent_url = location
-                                is_magnet = True
-                                is_http_url = False
-                    except Exception as e:
-                        logger.warning(f"[Deluge] ⚠️  Redirect check failed: {e}, continuing with original URL")
-                
-                # Choose the right method based on URL type
-                if is_magnet:
-                    # MAGNETS: Try core.add_torrent_magnet first, fallback if not available
-                    logger.info(f"[Deluge] 🧲 Adding magnet link")
-                    logger.info(f"[Deluge] 🔗 Magnet URI: {torrent_url[:150]}...")
-                    
-                    add_payload = {
-                        "method": "core.add_torrent_magnet",
-                        "params": [torrent_url, options],
-                        "id": 2
-                    }
-                    
-                    logger.info(f"[Deluge] 📨 Payload method: {add_payload['method']}")
-                    logger.info(f"[Deluge] 📨 Payload options: {add_payload['params'][1]}")
-                    
-                    add_response = await client.post(
-                        f"{base_url}/json",
-                        json=add_payload,
-                        headers={"Content-Type": "application/json"},
-                        cookies=cookies
-                    )
-                    
-                    logger.info(f"[Deluge] 📬 Deluge API response status: {add_response.status_code}")
-                    result = add_response.json()
-                    logger.info(f"[Deluge] 📬 Deluge API response: {result}")
-                    
-                    # FALLBACK: If core.add_torrent_magnet doesn't exist, try session method
-                    if result.get("error") and result["error"].get("code") == 2:
-                        logger.warning(f"[Deluge] ⚠️  core.add_torrent_magnet not available!")
-                        logger.info(f"[Deluge] 🔄 Trying session method: session.add_torrent_magnet")
-                        
-                        # Try the daemon session method directly
-                        add_payload = {
-                            "method": "session.add_torrent_magnet",
-                            "params": [torrent_url, options],
-                            "id": 3
-                        }
-                        
-                        logger.info(f"[Deluge] 📨 Fallback method: {add_payload['method']}")
-                        
-                        add_response = await client.post(
-                            f"{base_url}/json",
-                            json=add_payload,
-                            headers={"Content-Type": "application/json"},
-                            cookies=cookies
-                        )
-                        
-                        logger.info(f"[Deluge] 📬 Fallback response status: {add_response.status_code}")
-                        result = add_response.json()
-                        logger.info(f"[Deluge] 📬 Fallback response: {result}")
-                        
-                        # If THAT doesn't work, let's see what methods ARE available
-                        if result.get("error") and result["error"].get("code") == 2:
-                            logger.error(f"[Deluge] ❌ session.add_torrent_magnet also not available!")
-                            logger.info(f"[Deluge] 🔍 Querying available daemon methods...")
-                            
-                            # Try to get list of available methods
-                            list_methods_payload = {
-                                "method": "daemon.get_method_list",
-                                "params": [],
-                                "id": 4
-                            }
-                            
-                            methods_response = await client.post(
-                                f"{base_url}/json",
-                                json=list_methods_payload,
-                                headers={"Content-Type": "application/json"},
-                                cookies=cookies
-                            )
-                            
-                            methods_result = methods_response.json()
-                            if methods_result.get("result"):
-                                available_methods = methods_result["result"]
-                                magnet_methods = [m for m in available_methods if 'magnet' in m.lower() or 'torrent' in m.lower()]
-                                logger.info(f"[Deluge] 📋 Available torrent/magnet methods: {magnet_methods[:20]}")
-                            else:
-                                logger.error(f"[Deluge] ❌ Could not get method list")
-                            
-                            logger.error(f"[Deluge] ❌ No working magnet methods found!")
-                            logger.error(f"[Deluge] 💡 Please check if Deluge daemon is properly connected")
-                    
-                elif is_http_url:
-                    # HTTP/HTTPS URLs: Download the .torrent file first, then upload it
-                    logger.info(f"[Deluge] 📥 Downloading torrent file from URL")
-                    logger.info(f"[Deluge] 🔗 URL: {torrent_url[:150]}...")
-                    
-                    try:
-                        # Download the .torrent file
-                        logger.info(f"[Deluge] 🌐 Making HTTP GET request...")
-                        torrent_response = await client.get(
-                            torrent_url,
-                            follow_redirects=True,  # Follow normal HTTP redirects
-                            timeout=30.0
-                        )
-                        logger.info(f"[Deluge] ✅ HTTP Response: {torrent_response.status_code}")
-                        logger.info(f"[Deluge] 📋 Content-Type: {torrent_response.headers.get('content-type', 'unknown')}")
-                        
-                        torrent_response.raise_for_status()
-                        torrent_data = torrent_response.content
-                        
-                        logger.info(f"[Deluge] 📦 Downloaded {len(torrent_data)} bytes")
-                        logger.info(f"[Deluge] 🔍 First 20 bytes (hex): {torrent_data[:20].hex()}")
-                        
-                        # Convert to base64
-                        logger.info(f"[Deluge] 🔄 Encoding to base64...")
-                        torrent_b64 = base64.b64encode(torrent_data).decode('utf-8')
-                        logger.info(f"[Deluge] ✅ Base64 length: {len(torrent_b64)} characters")
-                        
-                        logger.info(f"[Deluge] 📤 Uploading to Deluge via core.add_torrent_file")
-                        
-                        # Use core.add_torrent_file with base64 data
-                        add_payload = {
-                            "method": "core.add_torrent_file",
-                            "params": ["", torrent_b64, options],
-                            "id": 2
-                        }
-                        
-                        logger.info(f"[Deluge] 📨 Payload method: {add_payload['method']}")
-                        
-                        add_response = await client.post(
-                            f"{base_url}/json",
-                            json=add_payload,
-                            headers={"Content-Type": "application/json"},
-                            cookies=cookies
-                        )
-                        
-                        logger.info(f"[Deluge] 📬 Deluge API response status: {add_response.status_code}")
-                        result = add_response.json()
-                        logger.info(f"[Deluge] 📬 Deluge API response: {result}")
-                        
-                    except httpx.HTTPError as e:
-                        logger.error(f"[Deluge] ❌ HTTP download failed: {e}")
-                        raise Exception(f"Failed to download torrent file: {e}")
-                        
-                else:
-                    # Local file paths: Not supported
-                    logger.warning(f"[Deluge] Unexpected torrent format: {torrent_url[:100]}")
-                    raise Exception("Only magnet links and HTTP(S) URLs are supported")
-                
-                # Check for errors
-                logger.info(f"[Deluge] 🔍 Checking API response for errors...")
-                if result.get("error"):
-                    error_code = result["error"].get("code")
-                    error_msg = result["error"].get("message", "Unknown error")
-                    logger.error(f"[Deluge] ❌ API error (code {error_code}): {error_msg}")
-                    logger.error(f"[Deluge] ❌ Full error response: {result}")
-                    raise Exception(f"{error_msg} (code: {error_code})")
-                
-                logger.info(f"[Deluge] ✅ No errors in response")
-                torrent_id = result.get("result")
-                logger.info(f"[Deluge] 🆔 Torrent ID from result: {torrent_id}")
-                
-                if not torrent_id:
-                    logger.error(f"[Deluge] ❌ No torrent ID returned. Response: {result}")
-                    raise Exception("No torrent ID returned")
-                
-                logger.info(f"[Deluge] ✅✅✅ Torrent added successfully!")
-                logger.info(f"[Deluge] 🆔 Torrent ID: {torrent_id}")
-                
-                # Step 3: Set label (OPTIONAL - don't fail if this errors)
-                if label and torrent_id:
-                    logger.info(f"[Deluge] 🏷️  Step 4: Setting label '{label}'...")
-                    try:
-                        # First check if label exists, create if not
-                        logger.info(f"[Deluge] 🔍 Checking if label '{label}' exists...")
-                        
-                        # Get existing labels
-                        get_labels_payload = {
-                            "method": "label.get_labels",
-                            "params": [],
-                            "id": 3
-                        }
-                        
-                        labels_response = await client.post(
-                            f"{base_url}/json",
-                            json=get_labels_payload,
-                            headers={"Content-Type": "application/json"},
-                            cookies=cookies
-                        )
-                        
-                        labels_result = labels_response.json()
-                        logger.info(f"[Deluge] 📋 Label query result: {labels_result}")
-                        
-                        # Check if label plugin is available
-                        if labels_result.get("error"):
-                            error_code = labels_result["error"].get("code")
-                            if error_code == 2:  # Method not found
-                                logger.warning("[Deluge] ⚠️  Label plugin not installed - skipping label (non-fatal)")
-                            else:
-                                logger.warning(f"[Deluge] ⚠️  Label error: {labels_result['error'].get('message')}")
-                        else:
-                            # Label plugin exists, try to add label
-                            existing_labels = labels_result.get("result", [])
-                            logger.info(f"[Deluge] 📋 Existing labels: {existing_labels}")
-                            
-                            # Add label if it doesn't exist
-                            if label not in existing_labels:
-                                logger.info(f"[Deluge] ➕ Label '{label}' doesn't exist, creating it...")
-                                add_label_payload = {
-                                    "method": "label.add",
-                                    "params": [label],
-                                    "id": 4
-                                }
-                                
-                                add_label_response = await client.post(
-                                    f"{base_url}/json",
-                                    json=add_label_payload,
-                                    headers={"Content-Type": "application/json"},
-                                    cookies=cookies
-                                )
-                                add_label_result = add_label_response.json()
-                                logger.info(f"[Deluge] ✅ Label creation result: {add_label_result}")
-                            else:
-                                logger.info(f"[Deluge] ✅ Label '{label}' already exists")
-                            
-                            # Set the label on the torrent
-                            logger.info(f"[Deluge] 🏷️  Applying label '{label}' to torrent {torrent_id}...")
-                            set_label_payload = {
-                                "method": "label.set_torrent",
-                                "params": [torrent_id, label],
-                                "id": 5
-                            }
-                            
-                            label_set_response = await client.post(
-                                f"{base_url}/json",
-                                json=set_label_payload,
-                                headers={"Content-Type": "application/json"},
-                                cookies=cookies
-                            )
-                            
-                            label_set_result = label_set_response.json()
-                            logger.info(f"[Deluge] 📋 Label set result: {label_set_result}")
-                            
-                            if label_set_result.get("error"):
-                                logger.warning(f"[Deluge] ⚠️  Could not set label: {label_set_result['error'].get('message')}")
-                            else:
-                                logger.info(f"[Deluge] ✅✅ Label '{label}' applied successfully!")
-                    
-                    except Exception as e:
-                        logger.warning(f"[Deluge] ⚠️  Label operation failed (non-fatal): {e}")
-                
-                logger.info(f"[Deluge] ========================================")
-                logger.info(f"[Deluge] 🎉 TORRENT ADD COMPLETE!")
-                logger.info(f"[Deluge] 🆔 Torrent ID: {torrent_id}")
-                logger.info(f"[Deluge] ========================================")
-                
-                return {
-                    "success": True,
-                    "torrent_id": torrent_id
-                }
+            # One request for indexer links (none if already resolved, e.g. by the grab check)
+            torrent = await torrent_resolver.resolve(torrent_url)
+            
+            options = self._options(download_path)
+            if torrent.kind == "magnet":
+                logger.info(f"[Deluge] 🧲 Adding magnet link")
+                torrent_id = await self._add_magnet(session, torrent.payload, options)
+            else:
+                torrent_id = await self._add_file(session, torrent.payload, options)
+            
+            if not torrent_id:
+                logger.error(f"[Deluge] ❌ No torrent ID returned")
+                raise Exception("No torrent ID returned")
+            
+            logger.info(f"[Deluge] ✅ Torrent added successfully! ID: {torrent_id}")
+            
+            # Set label (OPTIONAL - don't fail if this errors)
+            if label:
+                await session.set_label(torrent_id, label)
+            
+            logger.info(f"[Deluge] 🎉 TORRENT ADD COMPLETE! ({session.stats['calls']} RPCs, {session.stats['logins']} logins on this session)")
+            
+            return {
+                "success": True,
+                "torrent_id": torrent_id
+            }
         
         except Exception as e:
             logger.error(f"[Deluge] add_torrent error: {e}")
             raise
+    
+    async def add_torrents(
+        self,
+        host: str,
+        port: int,
+        password: str,
+        torrent_urls: List[str],
+        label: Optional[str] = None,
+        download_path: Optional[str] = None,
+        use_ssl: bool = False,
+        username: Optional[str] = None,
+        transport: str = TRANSPORT_WEB
+    ) -> List[Dict[str, Any]]:
+        """
+        Add several torrents with the same label/path in as few calls as possible
+        
+        Links are resolved concurrently; all magnets go to Deluge in one
+        web.add_torrents call (daemon: one core.add_torrent_magnet per magnet,
+        all over the open connection), .torrent files are uploaded together,
+        and the label is checked once for the whole batch before being applied.
+        Never raises - returns one {"success", "torrent_id" | "error"} per URL
+        (`connection_error` marks items that failed because Deluge was
+        unreachable).
+        """
+        session = self.session(host, port, password, use_ssl, username, transport)
+        options = self._options(download_path)
+        results: List[Dict[str, Any]] = [{"success": False, "error": "Not sent"} for _ in torrent_urls]
+        
+        resolved = await asyncio.gather(
+            *(torrent_resolver.resolve(url) for url in torrent_urls),
+            return_exceptions=True
+        )
+        
+        magnets: List[Tuple[int, str]] = []
+        files: List[Tuple[int, bytes]] = []
+        for position, item in enumerate(resolved):
+            if isinstance(item, BaseException):
+                results[position] = {"success": False, "error": str(item)}
+            elif item.kind == "magnet":
+                magnets.append((position, item.payload))
+            else:
+                files.append((position, item.payload))
+        
+        def added(position: int, torrent_id: Any):
+            if isinstance(torrent_id, Exception):
+                results[position] = {"success": False, "error": str(torrent_id), "connection_error": is_connection_error(torrent_id)}
+            elif torrent_id:
+                results[position] = {"success": True, "torrent_id": torrent_id}
+            else:
+                results[position] = {"success": False, "error": "No torrent ID returned"}
+        
+        if magnets:
+            try:
+                for (position, _), torrent_id in zip(magnets, await self._add_magnets(session, [m for _, m in magnets], options)):
+                    added(position, torrent_id)
+            except Exception as e:
+                for position, _ in magnets:
+                    results[position] = {"success": False, "error": str(e), "connection_error": is_connection_error(e)}
+        
+        if files:
+            uploaded = await session.call_many([
+                ("core.add_torrent_file", ("", base64.b64encode(data).decode("utf-8"), options))
+                for _, data in files
+            ])
+            for (position, _), torrent_id in zip(files, uploaded):
+                added(position, torrent_id)
+        
+        torrent_ids = [result["torrent_id"] for result in results if result["success"]]
+        if label and torrent_ids:
+            await session.set_labels(torrent_ids, label)
+        
+        logger.info(
+            f"[Deluge] 📦 Batch of {len(torrent_urls)}: {len(torrent_ids)} added "
+            f"({len(magnets)} magnets, {len(files)} files)"
+        )
+        return results
+    
+    async def get_free_space(
+        self,
+        host: str,
+        port: int,
+        password: str,
+        use_ssl: bool = False,
+        username: Optional[str] = None,
+        transport: str = TRANSPORT_WEB
+    ) -> Optional[int]:
+        """Free bytes in the daemon's default download location"""
+        session = self.session(host, port, password, use_ssl, username, transport)
+        return await session.call("core.get_free_space")
+    
+    async def get_torrents_status(
+        self,
+        host: str,
+        port: int,
+        password: str,
+        torrent_ids: List[str],
+        fields: List[str],
+        use_ssl: bool = False,
+        username: Optional[str] = None,
+        transport: str = TRANSPORT_WEB
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Status of several torrents in one core.get_torrents_status call
+        
+        Returns {torrent_id: {field: value}}; torrents Deluge no longer has
+        are missing from the result.
+        """
+        session = self.session(host, port, password, use_ssl, username, transport)
+        return await session.call("core.get_torrents_status", {"id": list(torrent_ids)}, list(fields)) or {}
+    
+    async def _add_magnets(self, session: BaseDelugeSession, magnets: List[str], options: Dict[str, Any]) -> List[Any]:
+        """
+        Add magnets in one web.add_torrents call
+        
+        Deluge 2 answers with one [success, torrent_id] pair per magnet; older
+        WebUIs only answer true, so IDs are then taken from the magnets' info
+        hashes. Falls back to one call per magnet if the method is missing
+        (always the case on the daemon, which has no web.* methods).
+        """
+        # Per-magnet errors are returned in place of the ID, so one bad magnet
+        # doesn't fail the ones Deluge added
+        if not session.web:
+            return await session.call_many([("core.add_torrent_magnet", (magnet, options)) for magnet in magnets])
+        try:
+            result = await session.call(
+                "web.add_torrents",
+                [{"path": magnet, "options": options} for magnet in magnets]
+            )
+        except DelugeRPCError as e:
+            if e.code != ERROR_UNKNOWN_METHOD:
+                raise
+            return list(await asyncio.gather(
+                *(self._add_magnet(session, magnet, options) for magnet in magnets),
+                return_exceptions=True
+            ))
+        
+        if isinstance(result, list) and len(result) == len(magnets):
+            return [
+                item[1] if isinstance(item, (list, tuple)) and item and item[0] else None
+                for item in result
+            ]
+        return [parse_infohash(magnet) for magnet in magnets]
+
 
 # Singleton instance
 deluge_service = DelugeService()
\ No newline at end of file
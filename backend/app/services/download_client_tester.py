@@ -1,7 +1,8 @@
 import httpx
-from typing import Dict
+from typing import Any, Dict, Optional, Union
 from backend.app.schemas.download_clients import ClientType, TestStatus, DownloadClientTestResponse
-from backend.app.services.deluge_service import deluge_service
+from backend.app.services.deluge_service import TRANSPORT_DAEMON, deluge_service, deluge_transport
+from backend.app.services.qbittorrent_service import qbittorrent_service
 
 class DownloadClientTester:
     """Service for testing connections to download clients"""
@@ -17,13 +18,14 @@ class DownloadClientTester:
         username: str = None,
         password: str = None,
         api_key: str = None,
-        use_ssl: bool = False
+        use_ssl: bool = False,
+        config: Optional[Union[str, Dict[str, Any]]] = None
     ) -> DownloadClientTestResponse:
         """Test connection to a download client"""
         
         try:
             if client_type == ClientType.DELUGE:
-                return await self._test_deluge(host, port, password, use_ssl)
+                return await self._test_deluge(host, port, username, password, use_ssl, deluge_transport(config))
             elif client_type == ClientType.QBITTORRENT:
                 return await self._test_qbittorrent(host, port, username, password, use_ssl)
             elif client_type == ClientType.TRANSMISSION:
@@ -58,17 +60,29 @@ class DownloadClientTester:
         self,
         host: str,
         port: int,
+        username: str,
         password: str,
-        use_ssl: bool
+        use_ssl: bool,
+        transport: str
     ) -> DownloadClientTestResponse:
-        """Test Deluge WebUI connection"""
+        """Test Deluge WebUI (or daemon) connection"""
         if not password:
             return DownloadClientTestResponse(
                 status=TestStatus.FAILED,
                 message="Password is required for Deluge"
             )
+        if transport == TRANSPORT_DAEMON and not username:
+            return DownloadClientTestResponse(
+                status=TestStatus.FAILED,
+                message="Username is required for the Deluge daemon (an account from its auth file)"
+            )
         
-        return await deluge_service.test_connection(host, port, password, use_ssl)
+        result = await deluge_service.test_connection(host, port, password, use_ssl, username, transport)
+        return DownloadClientTestResponse(
+            status=TestStatus.SUCCESS if result["success"] else TestStatus.FAILED,
+            message=result["message"],
+            details=result.get("version_info")
+        )
     
     async def _test_qbittorrent(
         self,
@@ -78,11 +92,12 @@ class DownloadClientTester:
         password: str,
         use_ssl: bool
     ) -> DownloadClientTestResponse:
-        """Test qBittorrent connection - PLACEHOLDER"""
-        # TODO: Implement qBittorrent testing
+        """Test qBittorrent WebUI connection"""
+        result = await qbittorrent_service.test_connection(host, port, username, password, use_ssl)
         return DownloadClientTestResponse(
-            status=TestStatus.FAILED,
-            message="qBittorrent integration coming soon - placeholder only"
+            status=TestStatus.SUCCESS if result["success"] else TestStatus.FAILED,
+            message=result["message"],
+            details=result.get("version_info")
         )
     
     async def _test_transmission(
@@ -0,0 +1,342 @@
+# File: backend/app/services/download_importer.py
+"""
+📦 Download Importer
+
+Moves finished downloads into their library without a rescan.
+
+- The torrent's own file list (Deluge `files` + `save_path`, one
+  core.get_torrents_status call per client; qBittorrent /torrents/files)
+  says exactly which files to import - the download folder is never walked
+- Files keep their layout inside the torrent and are placed under the
+  library path by DOWNLOAD_IMPORT_MODE:
+  - hardlink (default): same data, the client keeps seeding
+  - move: rename on the same filesystem
+  - copy
+  Across filesystems (no hardlink/rename possible) a copy is written under a
+  temporary name, checked against the source (size + SHA-256) and renamed
+  into place
+- Only the placed paths go through the scanner's per-file processing, so
+  the cost is O(files in the torrent), not O(library)
+- A download grabbed for a wanted book fills that book
+
+Paths reported by the client can be mapped to local ones with
+DOWNLOAD_PATH_MAP (e.g. when Deluge runs in another container).
+"""
+
+import asyncio
+import errno
+import hashlib
+import logging
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.config import settings
+from backend.app.db.database import AsyncSessionLocal
+from backend.app.db.models.book import Book
+from backend.app.db.models.download import Download
+from backend.app.db.models.download_client import DownloadClient
+from backend.app.db.models.library import Library
+from backend.app.services.deluge_service import deluge_service, deluge_transport
+from backend.app.services.library_scanner import LibraryScanner
+from backend.app.services.qbittorrent_service import qbittorrent_service
+from backend.app.services.quality_profiles import LIBRARY_MEDIA_TYPES
+
+logger = logging.getLogger(__name__)
+
+IMPORT_MODES = ("hardlink", "move", "copy")
+COPY_CHUNK = 1024 * 1024
+
+# Library type for each grab media type
+MEDIA_LIBRARY_TYPES = {media_type: library_type for library_type, media_type in LIBRARY_MEDIA_TYPES.items()}
+
+# Extra files kept next to audiobooks (the scanner uses them as covers)
+AUDIOBOOK_EXTRAS = (".jpg", ".jpeg", ".png")
+
+
+class DownloadImportError(Exception):
+    """A download that can't be imported (reason in the message)"""
+
+
+class DownloadImporter:
+    """Imports completed downloads into libraries"""
+
+    # Deluge status fields needed to find a torrent's files
+    DELUGE_FIELDS = ["save_path", "files", "name"]
+
+    def __init__(self):
+        # One import at a time - two imports of the same torrent would race on its files
+        self._lock = asyncio.Lock()
+        self.stats = {"imported": 0, "failed": 0, "files": 0, "linked": 0, "moved": 0, "copied": 0, "existing": 0}
+
+    async def import_downloads(self, download_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """
+        Import completed downloads
+
+        Returns one result per download: {"id", "success", ...}.
+        """
+        download_ids = list(download_ids)
+        if not download_ids:
+            return []
+
+        async with self._lock:
+            async with AsyncSessionLocal() as db:
+                downloads = (await db.execute(
+                    select(Download).where(Download.id.in_(download_ids))
+                )).scalars().all()
+                if not downloads:
+                    return []
+
+                clients = {
+                    client.id: client
+                    for client in (await db.execute(
+                        select(DownloadClient).where(DownloadClient.id.in_({d.client_id for d in downloads}))
+                    )).scalars().all()
+                }
+                libraries = (await db.execute(
+                    select(Library).where(Library.enabled == True).order_by(Library.id)
+                )).scalars().all()
+
+                # One file-list call per client
+                by_client: Dict[int, List[Download]] = {}
+                for download in downloads:
+                    by_client.setdefault(download.client_id, []).append(download)
+                client_order = list(by_client)
+                fetched = await asyncio.gather(
+                    *(self._fetch(clients.get(client_id), [d.torrent_id for d in by_client[client_id]])
+                      for client_id in client_order),
+                    return_exceptions=True
+                )
+
+                results = []
+                for client_id, statuses in zip(client_order, fetched):
+                    for download in by_client[client_id]:
+                        try:
+                            if isinstance(statuses, BaseException):
+                                raise DownloadImportError(f"Could not get files from download client: {statuses}")
+                            if download.status not in ("completed", "imported"):
+                                raise DownloadImportError(f"Download is {download.status}, not completed")
+                            status = (statuses or {}).get(download.torrent_id)
+                            if not status:
+                                raise DownloadImportError("Torrent no longer in the download client")
+                            result = await self._import_one(db, download, status, libraries)
+                            self.stats["imported"] += 1
+                        except Exception as e:
+                            logger.warning(f"⚠️ Import of {download.title} failed: {e}")
+                            self.stats["failed"] += 1
+                            download.error = f"Import failed: {e}"
+                            download.updated_at = datetime.utcnow()
+                            await db.commit()
+                            result = {"success": False, "error": download.error}
+                        results.append({"id": download.id, **result, "download": download.to_dict()})
+
+                return results
+
+    async def _fetch(self, client: Optional[DownloadClient], torrent_ids: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """{torrent_id: {save_path, files, name}} from one client"""
+        if client is None:
+            raise DownloadImportError("Download client no longer exists")
+        if client.client_type == "deluge":
+            return await deluge_service.get_torrents_status(
+                host=client.host,
+                port=client.port,
+                password=client.password or "",
+                torrent_ids=torrent_ids,
+                fields=self.DELUGE_FIELDS,
+                use_ssl=client.use_ssl,
+                username=client.username,
+                transport=deluge_transport(client.config)
+            )
+        if client.client_type == "qbittorrent":
+            return await self._fetch_qbittorrent(client, torrent_ids)
+        raise DownloadImportError(f"Client type {client.client_type} not yet supported")
+
+    async def _fetch_qbittorrent(self, client: DownloadClient, torrent_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Same shape as Deluge's answer: save path from the sync state, files per torrent"""
+        connection = dict(
+            host=client.host,
+            port=client.port,
+            username=client.username,
+            password=client.password,
+            use_ssl=client.use_ssl
+        )
+        statuses = await qbittorrent_service.get_torrents_status(torrent_ids=torrent_ids, **connection)
+        found = list(statuses)
+        file_lists = await asyncio.gather(
+            *(qbittorrent_service.get_torrent_files(torrent_id=torrent_id, **connection) for torrent_id in found)
+        )
+        return {
+            torrent_id: {
+                "save_path": statuses[torrent_id].get("save_path"),
+                "name": statuses[torrent_id].get("name"),
+                "files": [{"path": item.get("name", "")} for item in files]
+            }
+            for torrent_id, files in zip(found, file_lists)
+        }
+
+    async def _import_one(
+        self,
+        db: AsyncSession,
+        download: Download,
+        status: Dict[str, Any],
+        libraries: List[Library]
+    ) -> Dict[str, Any]:
+        book = await db.get(Book, download.book_id) if download.book_id else None
+        library = self._pick_library(download, book, libraries)
+
+        save_path = self.map_path(status.get("save_path") or download.save_path or "")
+        if not save_path:
+            raise DownloadImportError("Download client reported no save path")
+
+        extensions = set(LibraryScanner.SUPPORTED_FORMATS.get(library.library_type, []))
+        if library.library_type == "audiobooks":
+            extensions.update(AUDIOBOOK_EXTRAS)
+
+        files = [
+            PurePosixPath(str(item.get("path", "")).replace("\\", "/"))
+            for item in status.get("files") or []
+        ]
+        files = [relative for relative in files if relative.suffix.lower() in extensions]
+        if not files:
+            raise DownloadImportError(f"No {library.library_type} files in the torrent")
+
+        placed: List[Path] = []
+        for relative in files:
+            source = Path(save_path, *relative.parts)
+            target = self._target(library, relative, len(files))
+            action = await asyncio.to_thread(self._place, source, target, settings.download_import_mode)
+            self.stats[action] += 1
+            placed.append(target)
+        self.stats["files"] += len(placed)
+
+        scanner = LibraryScanner(db)
+        scan_stats = await scanner.import_paths(library, placed, book=book)
+
+        now = datetime.utcnow()
+        download.status = "imported"
+        download.error = None
+        download.import_path = str(self._import_root(library, placed))
+        download.imported_at = now
+        download.updated_at = now
+        await db.commit()
+
+        logger.info(f"📦 Imported {download.title} into {library.name} ({len(placed)} files)")
+        return {"success": True, "library_id": library.id, "files": len(placed), "scan": scan_stats}
+
+    def _pick_library(self, download: Download, book: Optional[Book], libraries: List[Library]) -> Library:
+        """The wanted book's library, else the first enabled library for the media type"""
+        if book is not None and book.library_id:
+            for library in libraries:
+                if library.id == book.library_id:
+                    return library
+
+        library_type = MEDIA_LIBRARY_TYPES.get(download.media_type or "ebook", "books")
+        for library in libraries:
+            if library.library_type == library_type:
+                return library
+        raise DownloadImportError(f"No enabled {library_type} library")
+
+    def _target(self, library: Library, relative: PurePosixPath, file_count: int) -> Path:
+        """Where a torrent file goes in the library (same layout as in the torrent)"""
+        parts = [part for part in relative.parts if part not in ("", ".", "..", "/")]
+        if library.library_type == "audiobooks" and len(parts) == 1:
+            # Single-file audiobook - the scanner expects one folder per book
+            parts = [Path(parts[0]).stem, parts[0]]
+        return Path(library.path, *parts)
+
+    @staticmethod
+    def _import_root(library: Library, placed: List[Path]) -> Path:
+        """Common folder (or the single file) the download was imported to"""
+        if len(placed) == 1:
+            return placed[0]
+        return Path(os.path.commonpath([str(path) for path in placed]))
+
+    @staticmethod
+    def map_path(path: str) -> str:
+        """Translate a download client path to a local one using DOWNLOAD_PATH_MAP"""
+        for mapping in settings.download_path_map.split(","):
+            remote, sep, local = mapping.partition("=")
+            remote = remote.strip().rstrip("/")
+            if not sep or not remote:
+                continue
+            if path == remote or path.startswith(remote + "/"):
+                return local.strip().rstrip("/") + path[len(remote):]
+        return path
+
+    # ------------------------------------------------------------------
+    # File placement (runs in a worker thread)
+    # ------------------------------------------------------------------
+
+    def _place(self, source: Path, target: Path, mode: str) -> str:
+        """Put one file into the library; returns linked/moved/copied/existing"""
+        if mode not in IMPORT_MODES:
+            raise DownloadImportError(f"Unknown DOWNLOAD_IMPORT_MODE {mode!r} (use {', '.join(IMPORT_MODES)})")
+        if not source.is_file():
+            raise DownloadImportError(f"Downloaded file not found: {source}")
+
+        if target.exists():
+            # Already placed (e.g. an import retry)
+            if target.samefile(source) or target.stat().st_size == source.stat().st_size:
+                return "existing"
+            raise DownloadImportError(f"A different file already exists at {target}")
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        if mode in ("hardlink", "move"):
+            try:
+                if mode == "hardlink":
+                    os.link(source, target)
+                    return "linked"
+                os.rename(source, target)
+                return "moved"
+            except OSError as e:
+                # Other filesystem (or no hardlink support) - fall back to a verified copy
+                if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                    raise
+
+        self._verified_copy(source, target)
+        if mode == "move":
+            source.unlink()
+            return "moved"
+        return "copied"
+
+    @staticmethod
+    def _verified_copy(source: Path, target: Path):
+        """Copy under a temporary name, compare size + SHA-256, then rename into place"""
+        temp = target.with_name(f".{target.name}.importing")
+        try:
+            source_hash = hashlib.sha256()
+            with open(source, "rb") as src, open(temp, "wb") as dst:
+                while chunk := src.read(COPY_CHUNK):
+                    source_hash.update(chunk)
+                    dst.write(chunk)
+            shutil.copystat(source, temp)
+
+            copy_hash = hashlib.sha256()
+            with open(temp, "rb") as f:
+                while chunk := f.read(COPY_CHUNK):
+                    copy_hash.update(chunk)
+
+            if temp.stat().st_size != source.stat().st_size or copy_hash.digest() != source_hash.digest():
+                raise DownloadImportError(f"Copy of {source.name} does not match the original")
+
+            os.replace(temp, target)
+        finally:
+            if temp.exists():
+                temp.unlink()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "auto_import": settings.download_auto_import,
+            "mode": settings.download_import_mode,
+            "stats": dict(self.stats)
+        }
+
+
+# Singleton instance
+download_importer = DownloadImporter()
@@ -2,25 +2,67 @@
 """
 Download Manager Service
 Handles sending downloads to download clients with proper labeling
+
+Grabs go through a dispatch queue: grabs for the same client, label and
+download path arriving within DOWNLOAD_BATCH_WINDOW seconds are sent as one
+batch (Deluge: one web.add_torrents call, label checked once; qBittorrent:
+one /torrents/add request) and each caller gets its own item's result.
+
+Grabs without a specific client go to the best enabled client (see the
+client balancer) and fail over to the next one when a client can't be
+reached.
+
+Before sending, the link is resolved once (cached - the client add reuses
+it) and grabs whose infohash is already tracked, or being sent right now,
+are skipped.
 """
-import httpx
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.app.config import settings
 from backend.app.db.models.download_client import DownloadClient
 from backend.app.db.models.book import Book
-from backend.app.services.deluge_service import deluge_service
+from backend.app.db.models.download import Download
+from backend.app.services.client_balancer import client_balancer
+from backend.app.services.deluge_service import deluge_service, deluge_transport, is_connection_error
+from backend.app.services.download_tracker import download_tracker
+from backend.app.services.qbittorrent_service import qbittorrent_service
+from backend.app.services.torrent_resolver import torrent_resolver
 
 logger = logging.getLogger(__name__)
 
 
+class DispatchBatch:
+    """Grabs waiting to be sent to one client with the same label and path"""
+    
+    def __init__(self, client: DownloadClient, label: Optional[str], download_path: Optional[str]):
+        # Connection details are copied so the send doesn't touch the request's session
+        self.client_type = client.client_type
+        self.host = client.host
+        self.port = client.port
+        self.username = client.username
+        self.password = client.password or ""
+        self.use_ssl = client.use_ssl
+        self.transport = deluge_transport(client.config)
+        self.label = label
+        self.download_path = download_path
+        self.items: List[Tuple[str, asyncio.Future]] = []
+
+
 class DownloadManager:
     """Manages sending downloads to configured download clients"""
     
     def __init__(self):
         self.timeout = 10.0
+        self._batches: Dict[Tuple, DispatchBatch] = {}
+        self._sending = set()
+        # Infohashes between the already-grabbed check and being tracked
+        self._grabbing = set()
+        self.dispatch_stats = {"batches": 0, "items": 0}
+        self.grab_stats = {"already_grabbed": 0}
     
     async def send_to_client(
         self,
@@ -29,7 +71,9 @@ class DownloadManager:
         book_title: str,
         media_type: str = "ebook",
         file_format: Optional[str] = None,
-        client_id: Optional[int] = None
+        client_id: Optional[int] = None,
+        book_id: Optional[int] = None,
+        infohash: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Send download to appropriate client
@@ -40,47 +84,148 @@ class DownloadManager:
             book_title: Title of the book
             media_type: Type of media (ebook, audiobook, comic, magazine)
             file_format: File format (epub, mobi, etc.)
-            client_id: Optional specific client ID, otherwise uses default
+            client_id: Optional specific client ID, otherwise the least busy
+                enabled client (failing over to the next if unreachable)
+            book_id: Optional book the download is for
+            infohash: Infohash from the search result, if known (skips the
+                link request when the torrent is already grabbed or cached)
         
         Returns:
-            Dictionary with success status and details
+            Dictionary with success status and details (plus `download_id`
+            of the tracked download when the client returned a torrent ID).
+            Torrents already grabbed return success False, `already_grabbed`
+            and the existing `download_id`.
         """
+        # Already grabbed? Checked by the result's infohash first, then by the link's
+        checked = infohash.lower() if infohash else None
+        existing = await self._already_grabbed(db, checked)
+        if existing:
+            return existing
+        try:
+            torrent = await torrent_resolver.resolve(download_url, checked)
+        except Exception as e:
+            logger.error(f"Could not resolve torrent link: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
         
-        # Get download client
-        if client_id:
-            result = await db.execute(
-                select(DownloadClient).where(DownloadClient.id == client_id)
-            )
-            client = result.scalar_one_or_none()
-        else:
-            # Get default enabled client
-            result = await db.execute(
-                select(DownloadClient).where(
-                    DownloadClient.enabled == True,
-                    DownloadClient.is_default == True
-                )
-            )
-            client = result.scalar_one_or_none()
-            
-            if not client:
-                # Get any enabled client
-                result = await db.execute(
-                    select(DownloadClient).where(DownloadClient.enabled == True)
-                )
-                client = result.scalar_one_or_none()
+        infohash = torrent.infohash or checked
+        if infohash:
+            # Reserved before the next await, so concurrent grabs of it see it
+            if infohash in self._grabbing:
+                self.grab_stats["already_grabbed"] += 1
+                return {
+                    "success": False,
+                    "already_grabbed": True,
+                    "torrent_id": infohash,
+                    "error": "Already being sent to the download client"
+                }
+            self._grabbing.add(infohash)
+        try:
+            if infohash != checked:
+                existing = await self._already_grabbed(db, infohash)
+                if existing:
+                    return existing
+            return await self._send(db, download_url, book_title, media_type, file_format, client_id, book_id)
+        finally:
+            self._grabbing.discard(infohash)
+    
+    async def _already_grabbed(self, db: AsyncSession, infohash: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Result for a torrent that is already tracked, else None"""
+        if not infohash:
+            return None
         
-        if not client:
+        result = await db.execute(
+            select(Download.id, Download.status)
+            .where(Download.torrent_id == infohash, Download.status != "removed")
+            .limit(1)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        
+        self.grab_stats["already_grabbed"] += 1
+        logger.info(f"⏭️ Skipping grab - torrent {infohash} already grabbed (download {row.id}, {row.status})")
+        return {
+            "success": False,
+            "already_grabbed": True,
+            "torrent_id": infohash,
+            "download_id": row.id,
+            "error": f"Already grabbed (download {row.id}, {row.status})"
+        }
+    
+    async def _send(
+        self,
+        db: AsyncSession,
+        download_url: str,
+        book_title: str,
+        media_type: str,
+        file_format: Optional[str],
+        client_id: Optional[int],
+        book_id: Optional[int]
+    ) -> Dict[str, Any]:
+        
+        # Clients to try, best first (queue depth, free space, media type pins)
+        candidates = await client_balancer.candidates(db, media_type, client_id)
+        if not candidates:
             return {
                 "success": False,
                 "error": "No download client configured"
             }
         
-        logger.info(f"Sending '{book_title}' to {client.name} ({client.client_type})")
+        failed_over: List[str] = []
+        for position, client in enumerate(candidates):
+            logger.info(f"Sending '{book_title}' to {client.name} ({client.client_type})")
+            
+            # Get label and download path from client's label mappings
+            label_info = self._get_label_for_media_type(client, media_type)
+            
+            client_balancer.reserve(client)
+            try:
+                result = await self._send_to(client, download_url, label_info)
+            finally:
+                client_balancer.release(client)
+            
+            if result.get("connection_error"):
+                client_balancer.mark_down(client)
+                if position + 1 < len(candidates):
+                    client_balancer.stats["failovers"] += 1
+                    failed_over.append(client.name)
+                    logger.warning(f"⚠️ {client.name} unreachable ({result.get('error')}) - trying {candidates[position + 1].name}")
+                    continue
+            elif result.get("success"):
+                client_balancer.mark_up(client)
+            break
         
-        # Get label and download path from client's label mappings
-        label_info = self._get_label_for_media_type(client, media_type)
+        if failed_over:
+            result["failed_over"] = failed_over
         
-        # Send to appropriate client
+        # Follow the download's progress from now on
+        if result.get("success") and result.get("torrent_id"):
+            result["client_id"] = client.id
+            download = await download_tracker.track(
+                db,
+                client,
+                torrent_id=result["torrent_id"],
+                title=book_title,
+                book_id=book_id,
+                download_url=download_url,
+                media_type=media_type,
+                file_format=file_format,
+                label=label_info.get("label")
+            )
+            result["download_id"] = download.id
+        
+        return result
+    
+    async def _send_to(
+        self,
+        client: DownloadClient,
+        download_url: str,
+        label_info: Dict[str, Optional[str]]
+    ) -> Dict[str, Any]:
+        """Send to one client"""
         try:
             if client.client_type == "deluge":
                 return await self._send_to_deluge(
@@ -144,17 +289,22 @@ class DownloadManager:
         label: Optional[str] = None,
         download_path: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Send download to Deluge"""
+        """Send download to Deluge (batched with other grabs in the dispatch window)"""
         try:
-            result = await deluge_service.add_torrent(
-                host=client.host,
-                port=client.port,
-                password=client.password or "",
-                torrent_url=download_url,
-                label=label,
-                download_path=download_path,
-                use_ssl=client.use_ssl
-            )
+            if settings.download_batch_window > 0:
+                result = await self._dispatch(client, download_url, label, download_path)
+            else:
+                result = await deluge_service.add_torrent(
+                    host=client.host,
+                    port=client.port,
+                    password=client.password or "",
+                    torrent_url=download_url,
+                    label=label,
+                    download_path=download_path,
+                    use_ssl=client.use_ssl,
+                    username=client.username,
+                    transport=deluge_transport(client.config)
+                )
             
             if result.get("success"):
                 logger.info(f"Successfully added to Deluge with label '{label}'")
@@ -168,16 +318,92 @@ class DownloadManager:
             else:
                 return {
                     "success": False,
-                    "error": "Failed to add torrent to Deluge"
+                    "error": result.get("error") or "Failed to add torrent to Deluge",
+                    "connection_error": bool(result.get("connection_error"))
                 }
                 
         except Exception as e:
             logger.error(f"Deluge add torrent error: {e}")
             return {
                 "success": False,
-                "error": str(e)
+                "error": str(e),
+                "connection_error": is_connection_error(e)
             }
     
+    async def _dispatch(
+        self,
+        client: DownloadClient,
+        download_url: str,
+        label: Optional[str],
+        download_path: Optional[str]
+    ) -> Dict[str, Any]:
+        """Queue a grab for the next batch to its client and wait for its result"""
+        key = (client.id, label, download_path)
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = DispatchBatch(client, label, download_path)
+            asyncio.get_running_loop().call_later(
+                settings.download_batch_window, self._flush, key, batch
+            )
+        
+        future = asyncio.get_running_loop().create_future()
+        batch.items.append((download_url, future))
+        if len(batch.items) >= settings.download_batch_size:
+            self._flush(key, batch)
+        
+        return await future
+    
+    def _flush(self, key: Tuple, batch: DispatchBatch):
+        """Close a batch to new grabs and send it (no-op if already sent)"""
+        if self._batches.get(key) is not batch:
+            return
+        del self._batches[key]
+        task = asyncio.create_task(self._send_batch(batch))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+    
+    async def _send_batch(self, batch: DispatchBatch):
+        # Callers that gave up (e.g. disconnected) are not sent
+        items = [(url, future) for url, future in batch.items if not future.done()]
+        if not items:
+            return
+        
+        self.dispatch_stats["batches"] += 1
+        self.dispatch_stats["items"] += len(items)
+        logger.info(f"📦 Sending {len(items)} grab(s) to {batch.client_type} {batch.host}:{batch.port} (label '{batch.label}')")
+        
+        try:
+            if batch.client_type == "qbittorrent":
+                results = await qbittorrent_service.add_torrents(
+                    host=batch.host,
+                    port=batch.port,
+                    username=batch.username,
+                    password=batch.password,
+                    torrent_urls=[url for url, _ in items],
+                    category=batch.label,
+                    save_path=batch.download_path,
+                    use_ssl=batch.use_ssl
+                )
+            else:
+                results = await deluge_service.add_torrents(
+                    host=batch.host,
+                    port=batch.port,
+                    password=batch.password,
+                    torrent_urls=[url for url, _ in items],
+                    label=batch.label,
+                    download_path=batch.download_path,
+                    use_ssl=batch.use_ssl,
+                    username=batch.username,
+                    transport=batch.transport
+                )
+        except Exception as e:
+            logger.error(f"{batch.client_type} batch failed: {e}")
+            results = [{"success": False, "error": str(e), "connection_error": is_connection_error(e)}] * len(items)
+        
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+    
     async def _send_to_qbittorrent(
         self,
         client: DownloadClient,
@@ -185,12 +411,45 @@ class DownloadManager:
         category: Optional[str] = None,
         save_path: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Send download to qBittorrent - PLACEHOLDER"""
-        # TODO: Implement qBittorrent support
-        return {
-            "success": False,
-            "error": "qBittorrent support coming soon"
-        }
+        """Send download to qBittorrent (batched with other grabs in the dispatch window)"""
+        try:
+            if settings.download_batch_window > 0:
+                result = await self._dispatch(client, download_url, category, save_path)
+            else:
+                result = await qbittorrent_service.add_torrent(
+                    host=client.host,
+                    port=client.port,
+                    username=client.username,
+                    password=client.password,
+                    torrent_url=download_url,
+                    category=category,
+                    save_path=save_path,
+                    use_ssl=client.use_ssl
+                )
+            
+            if result.get("success"):
+                logger.info(f"Successfully added to qBittorrent with category '{category}'")
+                return {
+                    "success": True,
+                    "client": "qbittorrent",
+                    "torrent_id": result.get("torrent_id"),
+                    "label": category,
+                    "download_path": save_path
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": result.get("error") or "Failed to add torrent to qBittorrent",
+                    "connection_error": bool(result.get("connection_error"))
+                }
+        
+        except Exception as e:
+            logger.error(f"qBittorrent add torrent error: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "connection_error": is_connection_error(e)
+            }
     
     async def update_book_status(
         self,
@@ -0,0 +1,400 @@
+# File: backend/app/services/download_tracker.py
+"""
+📥 Download Tracker
+
+Follows every grab after it was sent to a download client.
+
+- Each successful grab is recorded as a `Download` row with the client's
+  torrent ID
+- A background poll asks each client for all of its tracked torrents in one
+  call (Deluge: core.get_torrents_status with only the fields we store;
+  qBittorrent: one incremental /sync/maindata) and writes only rows whose
+  progress changed, as one bulk UPDATE
+- Polling runs every DOWNLOAD_POLL_INTERVAL seconds while something is
+  downloading and backs off (doubling up to DOWNLOAD_POLL_MAX_INTERVAL)
+  while nothing is; a new grab wakes it immediately
+- Changes are pushed to subscribers (`GET /api/downloads/stream`)
+- Downloads that just completed are handed to the download importer
+  (DOWNLOAD_AUTO_IMPORT)
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.config import settings
+from backend.app.db.database import AsyncSessionLocal
+from backend.app.db.models.download import Download
+from backend.app.db.models.download_client import DownloadClient
+from backend.app.services.deluge_service import deluge_service, deluge_transport
+from backend.app.services.download_importer import download_importer
+from backend.app.services.qbittorrent_service import qbittorrent_service
+
+logger = logging.getLogger(__name__)
+
+# Progress columns the poll may change
+PROGRESS_COLUMNS = (
+    "status", "client_state", "error", "progress", "download_rate", "upload_rate",
+    "eta", "total_size", "downloaded", "save_path"
+)
+
+
+class DownloadTracker:
+    """Polls download clients for tracked torrents and publishes progress"""
+
+    # Deluge status fields requested per poll
+    DELUGE_FIELDS = [
+        "state", "progress", "download_payload_rate", "upload_payload_rate",
+        "eta", "total_wanted", "total_done", "save_path", "message"
+    ]
+    DELUGE_STATES = {
+        "Queued": "queued",
+        "Checking": "checking",
+        "Allocating": "checking",
+        "Moving": "checking",
+        "Downloading": "downloading",
+        "Seeding": "completed",
+        "Paused": "paused",
+        "Error": "error"
+    }
+    QBITTORRENT_STATES = {
+        "queuedDL": "queued",
+        "metaDL": "downloading",
+        "forcedMetaDL": "downloading",
+        "downloading": "downloading",
+        "forcedDL": "downloading",
+        "stalledDL": "downloading",
+        "checkingDL": "checking",
+        "checkingUP": "checking",
+        "checkingResumeData": "checking",
+        "allocating": "checking",
+        "moving": "checking",
+        "pausedDL": "paused",
+        "stoppedDL": "paused",
+        "uploading": "completed",
+        "forcedUP": "completed",
+        "stalledUP": "completed",
+        "queuedUP": "completed",
+        "pausedUP": "completed",
+        "stoppedUP": "completed",
+        "error": "error",
+        "missingFiles": "error"
+    }
+    # qBittorrent's "no ETA"
+    QBITTORRENT_ETA_INFINITE = 8640000
+    # Statuses still polled, and those that keep polling fast
+    TRACKED_STATUSES = ("queued", "checking", "downloading", "paused", "error")
+    ACTIVE_STATUSES = ("queued", "checking", "downloading")
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._imports: Set[asyncio.Task] = set()
+        self.interval = settings.download_poll_interval
+        self.last_poll: Optional[datetime] = None
+        self.stats = {"polls": 0, "client_calls": 0, "rows_updated": 0}
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the poll loop (no-op when DOWNLOAD_POLL_INTERVAL is 0)"""
+        if settings.download_poll_interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"📥 Download tracker started (every {settings.download_poll_interval:g}s while active)")
+
+    async def stop(self):
+        for task in list(self._imports):
+            task.cancel()
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def wake(self):
+        """Poll now and at the fast interval (e.g. after a grab)"""
+        self.interval = settings.download_poll_interval
+        self._wake.set()
+
+    async def _loop(self):
+        while True:
+            try:
+                active = await self.poll_once()
+            except Exception as e:
+                logger.error(f"Download poll failed: {e}", exc_info=True)
+                active = False
+
+            if active:
+                self.interval = settings.download_poll_interval
+            else:
+                self.interval = min(self.interval * 2, max(settings.download_poll_max_interval, settings.download_poll_interval))
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    # ------------------------------------------------------------------
+    # Tracking
+    # ------------------------------------------------------------------
+
+    async def track(
+        self,
+        db: AsyncSession,
+        client: DownloadClient,
+        torrent_id: str,
+        title: str,
+        book_id: Optional[int] = None,
+        download_url: Optional[str] = None,
+        media_type: Optional[str] = None,
+        file_format: Optional[str] = None,
+        label: Optional[str] = None
+    ) -> Download:
+        """Record a grab and poll for it right away"""
+        download = Download(
+            client_id=client.id,
+            torrent_id=torrent_id,
+            book_id=book_id,
+            title=title,
+            download_url=download_url,
+            media_type=media_type,
+            file_format=file_format,
+            label=label,
+            status="queued"
+        )
+        db.add(download)
+        await db.commit()
+
+        self._publish("added", [download.to_dict()])
+        self.wake()
+        return download
+
+    async def poll_once(self) -> bool:
+        """
+        Refresh all tracked downloads once
+
+        Returns True while something is still queued/checking/downloading.
+        """
+        self.stats["polls"] += 1
+        self.last_poll = datetime.utcnow()
+
+        async with AsyncSessionLocal() as db:
+            columns = [getattr(Download, name) for name in PROGRESS_COLUMNS]
+            rows = (await db.execute(
+                select(Download.id, Download.client_id, Download.torrent_id, Download.title, Download.book_id, *columns)
+                .where(Download.status.in_(self.TRACKED_STATUSES))
+            )).all()
+            if not rows:
+                return False
+
+            client_ids = {row.client_id for row in rows}
+            clients = {
+                client.id: client
+                for client in (await db.execute(
+                    select(DownloadClient).where(DownloadClient.id.in_(client_ids))
+                )).scalars().all()
+            }
+
+            by_client: Dict[int, List] = {}
+            for row in rows:
+                by_client.setdefault(row.client_id, []).append(row)
+
+            # One status call per client, all clients at once
+            client_order = list(by_client)
+            fetched = await asyncio.gather(
+                *(self._fetch(clients.get(client_id), [row.torrent_id for row in by_client[client_id]])
+                  for client_id in client_order),
+                return_exceptions=True
+            )
+
+            now = datetime.utcnow()
+            updates: List[Dict[str, Any]] = []
+            changed: List[Dict[str, Any]] = []
+            completed: List[int] = []
+            active = False
+
+            for client_id, statuses in zip(client_order, fetched):
+                if isinstance(statuses, BaseException):
+                    logger.warning(f"⚠️ Could not poll download client {client_id}: {statuses}")
+                    active = active or any(row.status in self.ACTIVE_STATUSES for row in by_client[client_id])
+                    continue
+
+                for row in by_client[client_id]:
+                    if statuses is None:
+                        values = {"status": "removed", "error": "Download client no longer exists"}
+                    elif row.torrent_id in statuses:
+                        if clients[client_id].client_type == "qbittorrent":
+                            values = self._from_qbittorrent(statuses[row.torrent_id])
+                        else:
+                            values = self._from_deluge(statuses[row.torrent_id])
+                    else:
+                        values = {"status": "removed", "error": "Torrent no longer in the download client",
+                                  "download_rate": 0, "upload_rate": 0}
+
+                    delta = {name: value for name, value in values.items() if getattr(row, name) != value}
+                    if delta:
+                        if delta.get("status") == "completed":
+                            delta["completed_at"] = now
+                            completed.append(row.id)
+                        updates.append({"id": row.id, **delta, "updated_at": now})
+                        current = {name: getattr(row, name) for name in PROGRESS_COLUMNS}
+                        current.update(delta)
+                        changed.append({
+                            "id": row.id,
+                            "client_id": client_id,
+                            "torrent_id": row.torrent_id,
+                            "title": row.title,
+                            "book_id": row.book_id,
+                            **current
+                        })
+
+                    if values["status"] in self.ACTIVE_STATUSES:
+                        active = True
+
+            if updates:
+                await db.execute(update(Download), updates)
+                await db.commit()
+                self.stats["rows_updated"] += len(updates)
+
+        if changed:
+            self._publish("progress", changed)
+        if completed and settings.download_auto_import:
+            self.import_downloads(completed)
+        return active
+
+    def import_downloads(self, download_ids: List[int]) -> asyncio.Task:
+        """Import downloads in the background and publish the results"""
+        task = asyncio.create_task(self._import(download_ids))
+        self._imports.add(task)
+        task.add_done_callback(self._imports.discard)
+        return task
+
+    async def _import(self, download_ids: List[int]) -> List[Dict[str, Any]]:
+        results = await download_importer.import_downloads(download_ids)
+        if results:
+            self._publish("imported", [result["download"] for result in results])
+        return results
+
+    async def _fetch(self, client: Optional[DownloadClient], torrent_ids: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """{torrent_id: status} from one client; None if the client was deleted"""
+        if client is None:
+            return None
+        self.stats["client_calls"] += 1
+        if client.client_type == "deluge":
+            return await deluge_service.get_torrents_status(
+                host=client.host,
+                port=client.port,
+                password=client.password or "",
+                torrent_ids=torrent_ids,
+                fields=self.DELUGE_FIELDS,
+                use_ssl=client.use_ssl,
+                username=client.username,
+                transport=deluge_transport(client.config)
+            )
+        if client.client_type == "qbittorrent":
+            return await qbittorrent_service.get_torrents_status(
+                host=client.host,
+                port=client.port,
+                username=client.username,
+                password=client.password,
+                torrent_ids=torrent_ids,
+                use_ssl=client.use_ssl
+            )
+        raise Exception(f"Client type {client.client_type} not yet supported")
+
+    def _from_deluge(self, status: Dict[str, Any]) -> Dict[str, Any]:
+        state = status.get("state")
+        progress = round(float(status.get("progress") or 0.0), 2)
+        values = {
+            "status": self.DELUGE_STATES.get(state, "downloading"),
+            "client_state": state,
+            "error": None,
+            "progress": progress,
+            "download_rate": int(status.get("download_payload_rate") or 0),
+            "upload_rate": int(status.get("upload_payload_rate") or 0),
+            "eta": int(status.get("eta") or 0) or None,
+            "total_size": status.get("total_wanted"),
+            "downloaded": status.get("total_done"),
+            "save_path": status.get("save_path")
+        }
+        if state == "Error":
+            values["error"] = status.get("message") or "Error"
+        elif state in ("Paused", "Queued") and progress >= 100:
+            # Finished and paused, or waiting for a seeding slot (Deluge's
+            # active seed limit) - like qBittorrent's pausedUP/queuedUP
+            values["status"] = "completed"
+        elif state == "Checking" and status.get("total_wanted") and (status.get("total_done") or 0) >= status["total_wanted"]:
+            # While checking, progress is the check's; all wanted data
+            # verified means the download is finished
+            values["status"] = "completed"
+        if values["status"] == "completed":
+            values.update(download_rate=0, eta=None)
+        return values
+
+    def _from_qbittorrent(self, status: Dict[str, Any]) -> Dict[str, Any]:
+        state = status.get("state")
+        eta = int(status.get("eta") or 0)
+        values = {
+            "status": self.QBITTORRENT_STATES.get(state, "downloading"),
+            "client_state": state,
+            "error": None,
+            "progress": round(float(status.get("progress") or 0.0) * 100, 2),
+            "download_rate": int(status.get("dlspeed") or 0),
+            "upload_rate": int(status.get("upspeed") or 0),
+            "eta": eta if 0 < eta < self.QBITTORRENT_ETA_INFINITE else None,
+            "total_size": status.get("size"),
+            "downloaded": status.get("completed"),
+            "save_path": status.get("save_path")
+        }
+        if values["status"] == "error":
+            values["error"] = "Files missing" if state == "missingFiles" else "Error"
+        if values["status"] == "completed":
+            values.update(download_rate=0, eta=None)
+        return values
+
+    # ------------------------------------------------------------------
+    # Push stream
+    # ------------------------------------------------------------------
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=100)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def _publish(self, event: str, downloads: List[Dict[str, Any]]):
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait((event, downloads))
+            except asyncio.QueueFull:
+                # Slow reader - it misses this update and gets the next one
+                pass
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "interval_seconds": self.interval,
+            "last_poll": self.last_poll.isoformat() if self.last_poll else None,
+            "subscribers": len(self._subscribers),
+            "importing": len(self._imports),
+            "stats": dict(self.stats),
+            "import": download_importer.status()
+        }
+
+
+# Singleton instance
+download_tracker = DownloadTracker()
@@ -0,0 +1,199 @@
+# File: backend/app/services/indexer_catalog.py
+"""
+🗂️ Indexer Catalog
+
+In-process snapshot of all apps and indexers, so searches and the indexer
+list don't query the `apps` / `indexers` tables on every request.
+
+- Loaded lazily in its own session; the objects are detached copies and
+  must be treated as read-only outside this module
+- Categories are parsed once per load
+- Summary counts (total / enabled / configured) are kept with the snapshot
+  and adjusted in place by small writes (enable/disable, priority, delete,
+  search and grab counters)
+- Anything bigger (indexer sync, app create/update/delete) calls
+  `invalidate()` and the next reader reloads
+
+A load that overlaps a write is not kept, so a reader never installs a
+snapshot older than the last write.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from backend.app.db.database import AsyncSessionLocal
+from backend.app.db.models.app import App
+from backend.app.db.models.indexer import Indexer
+
+logger = logging.getLogger(__name__)
+
+# App types searched for releases
+SEARCH_APP_TYPES = ("prowlarr", "jackett")
+
+
+class CatalogEntry:
+    """An indexer with its app and parsed categories"""
+
+    __slots__ = ("indexer", "app", "categories")
+
+    def __init__(self, indexer: Indexer, app: Optional[App]):
+        self.indexer = indexer
+        self.app = app
+        self.categories = indexer.categories.split(",") if indexer.categories else []
+
+
+class CatalogSnapshot:
+    """One consistent view of apps and indexers"""
+
+    def __init__(self, apps: List[App], indexers: List[Indexer]):
+        self.apps = {app.id: app for app in apps}
+        self.entries: Dict[int, CatalogEntry] = {
+            indexer.id: CatalogEntry(indexer, self.apps.get(indexer.app_id))
+            for indexer in indexers
+        }
+        self.stats = {
+            "total": len(indexers),
+            "enabled": sum(1 for indexer in indexers if indexer.enabled),
+            "configured": sum(1 for indexer in indexers if indexer.configured)
+        }
+        self.sort()
+
+        indexers_by_app: Dict[int, List[Indexer]] = {}
+        for indexer in indexers:
+            indexers_by_app.setdefault(indexer.app_id, []).append(indexer)
+        self.sources: List[Tuple[App, List[Indexer]]] = [
+            (app, indexers_by_app.get(app.id, []))
+            for app in apps
+            if app.enabled and app.app_type in SEARCH_APP_TYPES
+        ]
+
+    def sort(self):
+        # Listing order: priority (lower first), then name; indexers whose app is gone are not listed
+        self.listed = sorted(
+            (entry for entry in self.entries.values() if entry.app is not None),
+            key=lambda entry: (entry.indexer.priority if entry.indexer.priority is not None else 50, entry.indexer.name)
+        )
+
+    def update(self, indexer_id: int, values: Dict[str, Any]):
+        entry = self.entries.get(indexer_id)
+        if entry is None:
+            return
+        indexer = entry.indexer
+        if "enabled" in values and bool(values["enabled"]) != bool(indexer.enabled):
+            self.stats["enabled"] += 1 if values["enabled"] else -1
+        for name, value in values.items():
+            setattr(indexer, name, value)
+
+    def remove(self, indexer_id: int):
+        entry = self.entries.pop(indexer_id, None)
+        if entry is None:
+            return
+        self.stats["total"] -= 1
+        self.stats["enabled"] -= 1 if entry.indexer.enabled else 0
+        self.stats["configured"] -= 1 if entry.indexer.configured else 0
+        for _, indexers in self.sources:
+            if entry.indexer in indexers:
+                indexers.remove(entry.indexer)
+        self.sort()
+
+
+class IndexerCatalog:
+    """Cached apps/indexers with write invalidation"""
+
+    def __init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._generation = 0
+        self._lock = asyncio.Lock()
+        self.stats = {"loads": 0, "hits": 0, "invalidations": 0}
+
+    async def snapshot(self) -> CatalogSnapshot:
+        """Current snapshot, loading it if needed"""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            self.stats["hits"] += 1
+            return snapshot
+
+        async with self._lock:
+            if self._snapshot is not None:
+                return self._snapshot
+
+            generation = self._generation
+            async with AsyncSessionLocal() as session:
+                apps = (await session.execute(select(App))).scalars().all()
+                indexers = (await session.execute(select(Indexer))).scalars().all()
+            snapshot = CatalogSnapshot(list(apps), list(indexers))
+            self.stats["loads"] += 1
+
+            # Written to while loading - use it for this reader only
+            if generation == self._generation:
+                self._snapshot = snapshot
+            logger.debug(f"🗂️ Loaded indexer catalog: {len(snapshot.apps)} apps, {len(snapshot.entries)} indexers")
+            return snapshot
+
+    async def sources(self) -> List[Tuple[App, List[Indexer]]]:
+        """Enabled search apps with their indexers"""
+        return (await self.snapshot()).sources
+
+    async def entries(self) -> List[CatalogEntry]:
+        """Indexers with an app, by priority then name"""
+        return (await self.snapshot()).listed
+
+    async def counts(self) -> Dict[str, int]:
+        return dict((await self.snapshot()).stats)
+
+    def invalidate(self):
+        """Drop the snapshot after apps or indexers were written"""
+        self._generation += 1
+        self._snapshot = None
+        self.stats["invalidations"] += 1
+
+    # ------------------------------------------------------------------
+    # Incremental updates (after the database write has committed)
+    # ------------------------------------------------------------------
+
+    def _current(self) -> Optional[CatalogSnapshot]:
+        # Any load still running read the old rows - don't let it install
+        self._generation += 1
+        return self._snapshot
+
+    def update_indexers(self, indexer_ids: Iterable[int], **values):
+        """Apply column values (enabled, priority, ...) to cached indexers"""
+        snapshot = self._current()
+        if snapshot is None:
+            return
+        for indexer_id in indexer_ids:
+            snapshot.update(indexer_id, values)
+        if "priority" in values:
+            snapshot.sort()
+
+    def remove_indexer(self, indexer_id: int):
+        snapshot = self._current()
+        if snapshot is not None:
+            snapshot.remove(indexer_id)
+
+    def record_searches(self, counts: Dict[int, int], searched_at: datetime):
+        """Mirror a flushed batch of search counters"""
+        snapshot = self._current()
+        if snapshot is None:
+            return
+        for indexer_id, count in counts.items():
+            entry = snapshot.entries.get(indexer_id)
+            if entry is not None:
+                entry.indexer.total_searches = (entry.indexer.total_searches or 0) + count
+                entry.indexer.last_search_at = searched_at
+
+    def record_grab(self, indexer_id: int):
+        snapshot = self._current()
+        if snapshot is None:
+            return
+        entry = snapshot.entries.get(indexer_id)
+        if entry is not None:
+            entry.indexer.total_grabs = (entry.indexer.total_grabs or 0) + 1
+
+
+# Singleton instance
+indexer_catalog = IndexerCatalog()
@@ -0,0 +1,267 @@
+# File: backend/app/services/indexer_health.py
+"""
+🩺 Indexer Health Service
+
+Tracks how every search target behaves and uses it to decide how long to
+wait for it and whether to ask it at all.
+
+- Latency histogram and success/error/timeout counters per target
+- Adaptive timeout: a multiple of the recent p95 latency, capped by the
+  configured timeout
+- Circuit breaker: after INDEXER_FAILURE_THRESHOLD failures in a row the
+  target is skipped for INDEXER_COOLDOWN seconds, then one probe request
+  decides whether it is back (the cool-down doubles on each failed probe)
+
+Targets are Jackett trackers searched on their own ("indexer:<id>") and
+whole apps searched in one request - Prowlarr or Jackett's aggregate
+endpoint ("app:<id>").
+
+Also counts searches per indexer and writes them to
+`Indexer.total_searches` / `last_search_at`.
+"""
+
+import bisect
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from sqlalchemy import update
+
+from backend.app.config import settings
+from backend.app.db.database import AsyncSessionLocal
+from backend.app.db.models.indexer import Indexer
+from backend.app.services.indexer_catalog import indexer_catalog
+
+logger = logging.getLogger(__name__)
+
+
+class TargetHealth:
+    """Rolling health stats and breaker state for one target"""
+
+    # Histogram bucket upper bounds in ms (last bucket is everything above)
+    BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 20000, 30000, 60000)
+    WINDOW = 50
+
+    def __init__(self):
+        self.searches = 0
+        self.successes = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.skipped = 0
+        self.histogram = [0] * (len(self.BUCKETS_MS) + 1)
+        self.recent_latencies: Deque[float] = deque(maxlen=self.WINDOW)  # seconds, successes only
+        self.recent_outcomes: Deque[bool] = deque(maxlen=self.WINDOW)
+        self.last_error: Optional[str] = None
+        self.last_success_at: Optional[float] = None
+
+        self.state = "closed"  # closed / open / half_open
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.cooldown = 0.0
+        self.probe_started = 0.0
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.recent_latencies:
+            return None
+        ordered = sorted(self.recent_latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class IndexerHealthService:
+    """Per-target latency stats, adaptive timeouts and circuit breaking"""
+
+    # Adaptive timeout = p95 * MULTIPLIER, never below FLOOR seconds
+    TIMEOUT_MULTIPLIER = 2.0
+    TIMEOUT_FLOOR = 5.0
+    MIN_SAMPLES = 5
+    MAX_COOLDOWN_FACTOR = 8
+
+    def __init__(self):
+        self._targets: Dict[str, TargetHealth] = {}
+        # indexer id -> searches not yet written to the database
+        self._pending_usage: Dict[int, int] = {}
+        self._last_usage_at: Optional[datetime] = None
+
+    @staticmethod
+    def indexer_key(indexer_id: int) -> str:
+        return f"indexer:{indexer_id}"
+
+    @staticmethod
+    def app_key(app_id: int) -> str:
+        return f"app:{app_id}"
+
+    def _get(self, key: str) -> TargetHealth:
+        health = self._targets.get(key)
+        if health is None:
+            health = self._targets[key] = TargetHealth()
+        return health
+
+    # ------------------------------------------------------------------
+    # Decisions
+    # ------------------------------------------------------------------
+
+    def timeout_for(self, key: str, ceiling: float) -> float:
+        """Seconds to wait for a target: a multiple of its recent p95, capped at `ceiling`"""
+        health = self._targets.get(key)
+        if not health or len(health.recent_latencies) < self.MIN_SAMPLES:
+            return ceiling
+        adaptive = health.percentile(0.95) * self.TIMEOUT_MULTIPLIER
+        return min(ceiling, max(self.TIMEOUT_FLOOR, adaptive))
+
+    def allow(self, key: str) -> bool:
+        """
+        False while the target's circuit is open
+
+        Once the cool-down has passed a single probe is let through
+        (half-open); other callers keep skipping until it reports back.
+        """
+        health = self._targets.get(key)
+        if not health or health.state == "closed":
+            return True
+
+        now = time.monotonic()
+        probe_due = health.state == "open" and now >= health.open_until
+        # A probe that never reported back (e.g. cancelled) doesn't block forever
+        probe_lost = health.state == "half_open" and now - health.probe_started > max(health.cooldown, 60.0)
+        if probe_due or probe_lost:
+            health.state = "half_open"
+            health.probe_started = now
+            logger.info(f"🩺 Probing {key} after {health.cooldown:.0f}s cool-down")
+            return True
+
+        health.skipped += 1
+        return False
+
+    def retry_in(self, key: str) -> Optional[float]:
+        """Seconds until an open circuit allows a probe"""
+        health = self._targets.get(key)
+        if not health or health.state == "closed":
+            return None
+        return max(0.0, health.open_until - time.monotonic())
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record(self, key: str, status: str, latency_ms: float, error: Optional[str] = None):
+        """Record the outcome of one request: status is ok, timeout or error"""
+        health = self._get(key)
+        health.searches += 1
+        health.histogram[bisect.bisect_left(TargetHealth.BUCKETS_MS, latency_ms)] += 1
+
+        if status == "ok":
+            health.successes += 1
+            health.recent_latencies.append(latency_ms / 1000)
+            health.recent_outcomes.append(True)
+            health.last_success_at = time.time()
+            if health.state != "closed":
+                logger.info(f"🩺 {key} recovered, closing circuit")
+            health.state = "closed"
+            health.consecutive_failures = 0
+            health.cooldown = 0.0
+            return
+
+        if status == "timeout":
+            health.timeouts += 1
+        else:
+            health.errors += 1
+        health.recent_outcomes.append(False)
+        health.last_error = error
+        health.consecutive_failures += 1
+
+        if health.state == "half_open":
+            # Failed probe - back off further
+            base = settings.indexer_cooldown
+            health.cooldown = min(health.cooldown * 2, base * self.MAX_COOLDOWN_FACTOR) or base
+            self._open(key, health)
+        elif health.state == "closed" and health.consecutive_failures >= settings.indexer_failure_threshold:
+            health.cooldown = settings.indexer_cooldown
+            self._open(key, health)
+
+    @staticmethod
+    def _open(key: str, health: TargetHealth):
+        health.state = "open"
+        health.open_until = time.monotonic() + health.cooldown
+        logger.warning(
+            f"🚫 {key} failed {health.consecutive_failures} times in a row, "
+            f"skipping it for {health.cooldown:.0f}s"
+        )
+
+    def record_usage(self, indexer_ids: Iterable[int]):
+        """Count a search against indexers (written by `flush_usage`)"""
+        for indexer_id in indexer_ids:
+            self._pending_usage[indexer_id] = self._pending_usage.get(indexer_id, 0) + 1
+        self._last_usage_at = datetime.utcnow()
+
+    async def flush_usage(self):
+        """Add pending search counts to Indexer.total_searches and set last_search_at"""
+        if not self._pending_usage:
+            return
+
+        pending, self._pending_usage = self._pending_usage, {}
+        searched_at = self._last_usage_at or datetime.utcnow()
+
+        # Group by count so each distinct increment is one UPDATE
+        by_count: Dict[int, List[int]] = {}
+        for indexer_id, count in pending.items():
+            by_count.setdefault(count, []).append(indexer_id)
+
+        try:
+            async with AsyncSessionLocal() as session:
+                for count, indexer_ids in by_count.items():
+                    await session.execute(
+                        update(Indexer)
+                        .where(Indexer.id.in_(indexer_ids))
+                        .values(
+                            total_searches=Indexer.total_searches + count,
+                            last_search_at=searched_at
+                        )
+                    )
+                await session.commit()
+            indexer_catalog.record_searches(pending, searched_at)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not save indexer search stats: {e}")
+            for indexer_id, count in pending.items():
+                self._pending_usage[indexer_id] = self._pending_usage.get(indexer_id, 0) + count
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def snapshot(self, key: str, ceiling: float) -> Optional[Dict[str, Any]]:
+        """Health summary for a target (timeout capped at `ceiling`), or None if it was never searched"""
+        health = self._targets.get(key)
+        if not health:
+            return None
+
+        recent = health.recent_outcomes
+        p50 = health.percentile(0.5)
+        p95 = health.percentile(0.95)
+        labels = [f"le_{bound}ms" for bound in TargetHealth.BUCKETS_MS] + ["inf"]
+
+        return {
+            "target": key,
+            "searches": health.searches,
+            "successes": health.successes,
+            "errors": health.errors,
+            "timeouts": health.timeouts,
+            "skipped": health.skipped,
+            "error_rate": round(1 - sum(recent) / len(recent), 4) if recent else 0.0,
+            "p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000) if p95 is not None else None,
+            "timeout_seconds": round(self.timeout_for(key, ceiling), 2),
+            "latency_histogram": dict(zip(labels, health.histogram)),
+            "last_error": health.last_error,
+            "last_success_at": datetime.utcfromtimestamp(health.last_success_at).isoformat() if health.last_success_at else None,
+            "circuit": {
+                "state": health.state,
+                "consecutive_failures": health.consecutive_failures,
+                "retry_in_seconds": round(self.retry_in(key), 1) if health.state == "open" else None
+            }
+        }
+
+
+# Singleton instance
+indexer_health = IndexerHealthService()
@@ -0,0 +1,108 @@
+# File: backend/app/services/indexer_limiter.py
+"""
+🚦 Indexer Limiter
+
+Global request limits per search target, shared by interactive searches,
+bulk search jobs and the RSS monitor:
+
+- at most INDEXER_MAX_CONCURRENCY requests in flight per target
+- at most INDEXER_RATE_LIMIT requests per minute per target (token bucket
+  allowing short bursts of BURST requests)
+
+Targets use the same keys as indexer health: "indexer:<id>" for Jackett
+trackers searched on their own, "app:<id>" for apps searched in one request.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+
+from backend.app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TargetLimit:
+    """Concurrency slots and token bucket for one target"""
+
+    def __init__(self, concurrency: int, burst: int):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.waiting = 0
+        self.requests = 0
+        self.throttled = 0
+
+
+class IndexerLimiter:
+    """Per-target concurrency cap and rate limit"""
+
+    BURST = 5
+
+    def __init__(self):
+        self._targets: Dict[str, TargetLimit] = {}
+
+    def _get(self, key: str) -> TargetLimit:
+        target = self._targets.get(key)
+        if target is None:
+            target = self._targets[key] = TargetLimit(
+                max(1, settings.indexer_max_concurrency), self.BURST
+            )
+        return target
+
+    async def _wait_for_token(self, target: TargetLimit):
+        rate = settings.indexer_rate_limit / 60.0
+        if rate <= 0:
+            return
+
+        now = time.monotonic()
+        target.tokens = min(self.BURST, target.tokens + (now - target.updated) * rate)
+        target.updated = now
+        # Reserve a token now (possibly going negative) and sleep off the debt,
+        # so waiters are served in order without re-checking
+        target.tokens -= 1
+        if target.tokens < 0:
+            target.throttled += 1
+            try:
+                await asyncio.sleep(-target.tokens / rate)
+            except asyncio.CancelledError:
+                # Cancelled before its turn - give the token back so later
+                # callers don't sleep off debt for a request never sent
+                target.tokens += 1
+                raise
+
+    @asynccontextmanager
+    async def slot(self, key: str):
+        """Wait for a free slot and a rate-limit token for a target"""
+        target = self._get(key)
+        target.waiting += 1
+        try:
+            await target.semaphore.acquire()
+        finally:
+            target.waiting -= 1
+        try:
+            await self._wait_for_token(target)
+            target.requests += 1
+            yield
+        finally:
+            target.semaphore.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": settings.indexer_max_concurrency,
+            "rate_limit_per_minute": settings.indexer_rate_limit,
+            "targets": {
+                key: {
+                    "requests": target.requests,
+                    "throttled": target.throttled,
+                    "waiting": target.waiting
+                }
+                for key, target in self._targets.items()
+            }
+        }
+
+
+# Singleton instance
+indexer_limiter = IndexerLimiter()
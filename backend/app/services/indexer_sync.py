@@ -1,226 +1,253 @@
 """
 Indexer Sync Service
 Fetches indexers from connected apps (Prowlarr, Jackett) and syncs to database
+
+All apps are fetched concurrently. Each app's existing indexers are loaded in
+one query and compared field by field; only new, changed and removed rows
+are written (as bulk INSERT / UPDATE / DELETE statements), so the reported
+counts are exact and an unchanged sync writes nothing.
 """
+import asyncio
 import httpx
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from datetime import datetime
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app.db.models.app import App
 from backend.app.db.models.indexer import Indexer
+from backend.app.services.indexer_catalog import indexer_catalog
+from backend.app.services.jackett_session import jackett_sessions
 
 logger = logging.getLogger(__name__)
 
+# (external_id, fields compared and updated on every sync, extra fields for new rows)
+IndexerRecord = Tuple[str, Dict[str, Any], Dict[str, Any]]
+
 
 class IndexerSyncService:
     """Service for syncing indexers from external apps"""
-    
+
+    # Columns read back to decide whether an existing row changed
+    COMPARED_COLUMNS = ("name", "description", "protocol", "categories", "enabled", "configured")
+
     def __init__(self):
         self.timeout = 10.0
-    
+
     async def sync_all_indexers(self, db: AsyncSession) -> Dict[str, Any]:
         """
         Sync indexers from all enabled apps
         Returns summary of sync operation
         """
+        query = select(App).where(
+            App.enabled == True,
+            App.app_type.in_(("prowlarr", "jackett"))
+        )
+        apps = (await db.execute(query)).scalars().all()
+
+        logger.info(f"Found {len(apps)} enabled apps to sync")
+        return await self._sync_apps(db, apps)
+
+    async def sync_app_indexers(self, app_id: int, db: AsyncSession) -> Dict[str, Any]:
+        """Sync indexers from a single app (e.g. right after it was added)"""
+        app = (await db.execute(select(App).where(App.id == app_id))).scalar_one_or_none()
+        if not app:
+            raise ValueError(f"App {app_id} not found")
+        return await self._sync_apps(db, [app])
+
+    async def _sync_apps(self, db: AsyncSession, apps: List[App]) -> Dict[str, Any]:
         result = {
             "total_synced": 0,
             "prowlarr_count": 0,
             "jackett_count": 0,
             "new_indexers": 0,
             "updated_indexers": 0,
+            "removed_indexers": 0,
+            "unchanged_indexers": 0,
             "errors": []
         }
-        
+
+        # Fetch from every app at once; the database work below stays sequential
+        fetched = await asyncio.gather(
+            *(self._fetch(app) for app in apps),
+            return_exceptions=True
+        )
+
         try:
-            # Get all enabled apps
-            query = select(App).where(App.enabled == True)
-            apps_result = await db.execute(query)
-            apps = apps_result.scalars().all()
-            
-            logger.info(f"Found {len(apps)} enabled apps to sync")
-            
-            for app in apps:
-                try:
-                    if app.app_type == "prowlarr":
-                        count = await self._sync_prowlarr(db, app)
-                        result["prowlarr_count"] = count
-                        result["total_synced"] += count
-                        logger.info(f"Synced {count} indexers from Prowlarr")
-                        
-                    elif app.app_type == "jackett":
-                        count = await self._sync_jackett(db, app)
-                        result["jackett_count"] = count
-                        result["total_synced"] += count
-                        logger.info(f"Synced {count} indexers from Jackett")
-                        
-                except Exception as e:
-                    error_msg = f"Error syncing {app.name}: {str(e)}"
+            for app, records in zip(apps, fetched):
+                if isinstance(records, BaseException):
+                    error_msg = f"Error syncing {app.name}: {str(records)}"
                     logger.error(error_msg)
                     result["errors"].append(error_msg)
-            
+                    continue
+
+                counts = await self._apply(db, app, records)
+                for key, value in counts.items():
+                    result[key] += value
+                result[f"{app.app_type}_count"] += len(records)
+                result["total_synced"] += len(records)
+                logger.info(
+                    f"Synced {len(records)} indexers from {app.name} "
+                    f"({counts['new_indexers']} new, {counts['updated_indexers']} updated, "
+                    f"{counts['removed_indexers']} removed)"
+                )
+
             await db.commit()
-            
-            # Count new vs updated (simple heuristic based on last_sync_at)
-            all_indexers_query = await db.execute(select(Indexer))
-            for indexer in all_indexers_query.scalars().all():
-                # If last_sync_at is very recent (within last 5 seconds), consider it updated
-                if indexer.last_sync_at:
-                    time_diff = datetime.utcnow() - indexer.last_sync_at
-                    if time_diff.total_seconds() < 5:
-                        result["updated_indexers"] += 1
-                    else:
-                        result["new_indexers"] += 1
-                else:
-                    result["new_indexers"] += 1
-            
+            if result["new_indexers"] or result["updated_indexers"] or result["removed_indexers"]:
+                indexer_catalog.invalidate()
             logger.info(f"Sync complete: {result['total_synced']} total indexers")
-            
+
         except Exception as e:
             logger.error(f"Sync failed: {e}")
             result["errors"].append(str(e))
             await db.rollback()
-        
+
         return result
-    
-    async def _sync_prowlarr(self, db: AsyncSession, app: App) -> int:
-        """Sync indexers from Prowlarr"""
+
+    async def _fetch(self, app: App) -> List[IndexerRecord]:
+        if app.app_type == "prowlarr":
+            return await self._fetch_prowlarr(app)
+        if app.app_type == "jackett":
+            return await self._fetch_jackett(app)
+        return []
+
+    async def _apply(self, db: AsyncSession, app: App, records: List[IndexerRecord]) -> Dict[str, int]:
+        """Write one app's changes in bulk and return exact counts"""
+        columns = [getattr(Indexer, name) for name in self.COMPARED_COLUMNS]
+        rows = (await db.execute(
+            select(Indexer.id, Indexer.external_id, *columns).where(Indexer.app_id == app.id)
+        )).all()
+        existing = {row.external_id: row for row in rows}
+
+        now = datetime.utcnow()
+        inserts: List[Dict[str, Any]] = []
+        updates: List[Dict[str, Any]] = []
+        seen = set()
+        unchanged = 0
+
+        for external_id, fields, new_fields in records:
+            if external_id in seen:
+                continue
+            seen.add(external_id)
+
+            row = existing.get(external_id)
+            if row is None:
+                inserts.append({
+                    "app_id": app.id,
+                    "external_id": external_id,
+                    **fields,
+                    **new_fields,
+                    "created_at": now,
+                    "updated_at": now,
+                    "last_sync_at": now
+                })
+                continue
+
+            changed = {name: value for name, value in fields.items() if getattr(row, name) != value}
+            if changed:
+                updates.append({"id": row.id, **changed, "updated_at": now, "last_sync_at": now})
+            else:
+                unchanged += 1
+
+        removed = [row.id for external_id, row in existing.items() if external_id not in seen]
+
+        if inserts:
+            await db.execute(insert(Indexer), inserts)
+        if updates:
+            # ORM bulk UPDATE by primary key (one executemany per set of changed columns)
+            await db.execute(update(Indexer), updates)
+        if removed:
+            await db.execute(delete(Indexer).where(Indexer.id.in_(removed)))
+
+        return {
+            "new_indexers": len(inserts),
+            "updated_indexers": len(updates),
+            "removed_indexers": len(removed),
+            "unchanged_indexers": unchanged
+        }
+
+    async def _fetch_prowlarr(self, app: App) -> List[IndexerRecord]:
+        """Fetch indexers from Prowlarr"""
         async with httpx.AsyncClient(timeout=self.timeout) as client:
             response = await client.get(
                 f"{app.base_url}/api/v1/indexer",
                 headers={"X-Api-Key": app.api_key}
             )
-            
+
             if response.status_code != 200:
                 raise Exception(f"Prowlarr returned {response.status_code}")
-            
-            indexers_data = response.json()
-            count = 0
-            
-            for idx_data in indexers_data:
-                # Check if indexer already exists
-                query = select(Indexer).where(
-                    Indexer.app_id == app.id,
-                    Indexer.external_id == str(idx_data["id"])
-                )
-                result = await db.execute(query)
-                existing = result.scalar_one_or_none()
-                
+
+            records = []
+            for idx_data in response.json():
                 # Parse protocol
                 protocol = "usenet" if "usenet" in idx_data.get("protocol", "").lower() else "torrent"
-                
+
                 # Parse categories
                 categories = [cat.get("name") for cat in idx_data.get("capabilities", {}).get("categories", [])]
-                
-                if existing:
-                    # Update existing
-                    existing.name = idx_data["name"]
-                    existing.description = idx_data.get("description", "")
-                    existing.protocol = protocol
-                    existing.categories = ",".join(categories) if categories else None
-                    existing.enabled = idx_data.get("enable", True)
-                    existing.last_sync_at = datetime.utcnow()
-                else:
-                    # Create new
-                    new_indexer = Indexer(
-                        app_id=app.id,
-                        external_id=str(idx_data["id"]),
-                        name=idx_data["name"],
-                        description=idx_data.get("description", ""),
-                        protocol=protocol,
-                        categories=",".join(categories) if categories else None,
-                        enabled=idx_data.get("enable", True),
-                        configured=True,
-                        priority=idx_data.get("priority", 50),
-                        last_sync_at=datetime.utcnow()
-                    )
-                    db.add(new_indexer)
-                
-                count += 1
-            
-            return count
-    
-    async def _sync_jackett(self, db: AsyncSession, app: App) -> int:
-        """Sync indexers from Jackett"""
+
+                records.append((
+                    str(idx_data["id"]),
+                    {
+                        "name": idx_data["name"],
+                        "description": idx_data.get("description", ""),
+                        "protocol": protocol,
+                        "categories": ",".join(categories) if categories else None,
+                        "enabled": idx_data.get("enable", True)
+                    },
+                    {
+                        "configured": True,
+                        "priority": idx_data.get("priority", 50)
+                    }
+                ))
+
+            return records
+
+    async def _fetch_jackett(self, app: App) -> List[IndexerRecord]:
+        """Fetch indexers from Jackett"""
         async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=False) as client:
             # Build request params
             params = {"apikey": app.api_key}
-            
-            # If password provided, try to authenticate first
-            cookies = None
-            if app.password:
-                try:
-                    login_response = await client.post(
-                        f"{app.base_url}/UI/Dashboard",
-                        data={"password": app.password},
-                        headers={"Content-Type": "application/x-www-form-urlencoded"}
-                    )
-                    cookies = login_response.cookies
-                except Exception as e:
-                    logger.warning(f"Jackett login failed: {e}")
-            
-            # Fetch indexers
-            response = await client.get(
+
+            # Fetch indexers (with the cached login session if a password is set)
+            response = await jackett_sessions.request(
+                client, app, "GET",
                 f"{app.base_url}/api/v2.0/indexers",
-                params=params,
-                cookies=cookies
+                params=params
             )
-            
+
             if response.status_code != 200:
                 raise Exception(f"Jackett returned {response.status_code}")
-            
-            indexers_data = response.json()
-            count = 0
-            
-            for idx_data in indexers_data:
-                # Check if indexer already exists
-                query = select(Indexer).where(
-                    Indexer.app_id == app.id,
-                    Indexer.external_id == idx_data["id"]
-                )
-                result = await db.execute(query)
-                existing = result.scalar_one_or_none()
-                
+
+            records = []
+            for idx_data in response.json():
                 # Parse protocol
                 protocol = "usenet" if idx_data.get("type") == "nzb" else "torrent"
-                
+
                 # Parse categories - Jackett uses "caps" array
                 categories = []
                 for cap in idx_data.get("caps", []):
                     if isinstance(cap, dict) and "Name" in cap:
                         categories.append(cap["Name"])
-                
-                if existing:
-                    # Update existing
-                    existing.name = idx_data["name"]
-                    existing.description = idx_data.get("description", "")
-                    existing.protocol = protocol
-                    existing.categories = ",".join(categories) if categories else None
-                    existing.configured = idx_data.get("configured", False)
-                    existing.last_sync_at = datetime.utcnow()
-                else:
-                    # Create new
-                    new_indexer = Indexer(
-                        app_id=app.id,
-                        external_id=idx_data["id"],
-                        name=idx_data["name"],
-                        description=idx_data.get("description", ""),
-                        protocol=protocol,
-                        categories=",".join(categories) if categories else None,
-                        enabled=idx_data.get("configured", False),  # Only enable if configured in Jackett
-                        configured=idx_data.get("configured", False),
-                        priority=50,  # Default priority
-                        last_sync_at=datetime.utcnow()
-                    )
-                    db.add(new_indexer)
-                
-                count += 1
-            
-            return count
+
+                # "enabled" is only set on new rows - it stays the user's choice afterwards
+                records.append((
+                    idx_data["id"],
+                    {
+                        "name": idx_data["name"],
+                        "description": idx_data.get("description", ""),
+                        "protocol": protocol,
+                        "categories": ",".join(categories) if categories else None,
+                        "configured": idx_data.get("configured", False)
+                    },
+                    {
+                        "enabled": idx_data.get("configured", False),  # Only enable if configured in Jackett
+                        "priority": 50  # Default priority
+                    }
+                ))
+
+            return records
 
 
 # Singleton instance
-indexer_sync_service = IndexerSyncService()
\ No newline at end of file
+indexer_sync_service = IndexerSyncService()
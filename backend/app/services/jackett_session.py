@@ -0,0 +1,234 @@
+# File: backend/app/services/jackett_session.py
+"""
+🔑 Jackett Session Manager
+
+Jackett instances with an admin password need a login (POST /UI/Dashboard)
+before API calls. The session cookies are cached per app and shared by
+searches and indexer syncs, persisted in the config dir so restarts and
+other workers reuse them too. A new login only happens when Jackett rejects
+the cached session.
+
+Cookies are sent as an explicit `Cookie` header per app and kept out of the
+(shared) HTTP client's cookie jar, so apps on the same host never see each
+other's sessions.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+
+from backend.app.config import settings
+from backend.app.db.models.app import App
+
+logger = logging.getLogger(__name__)
+
+
+class JackettSessionManager:
+    """Caches Jackett auth cookies per app"""
+
+    FILENAME = "jackett_sessions.json"
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else settings.config_dir / self.FILENAME
+        self._sessions: Dict[str, Dict] = {}
+        self._loaded_mtime: Optional[float] = None
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self.stats = {"logins": 0, "reused": 0, "refreshed": 0}
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        """Re-read the session file if another process changed it"""
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            return
+        if mtime == self._loaded_mtime:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._sessions = json.load(f)
+            self._loaded_mtime = mtime
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read Jackett sessions: {e}")
+
+    def _save(self):
+        """Write the session file atomically"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".jackett-sessions-")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._sessions, f)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.path)
+            self._loaded_mtime = self.path.stat().st_mtime
+        except Exception as e:
+            logger.warning(f"⚠️ Could not save Jackett sessions: {e}")
+
+    @staticmethod
+    def _fingerprint(app: App) -> str:
+        """Changes when the URL or password changes, invalidating the session"""
+        return hashlib.sha256(f"{app.base_url}\n{app.password}".encode()).hexdigest()
+
+    def _cached(self, app: App) -> Optional[Dict[str, str]]:
+        self._load()
+        session = self._sessions.get(str(app.id))
+        if session and session.get("fingerprint") == self._fingerprint(app):
+            return session["cookies"]
+        return None
+
+    # ------------------------------------------------------------------
+    # Login
+    # ------------------------------------------------------------------
+
+    async def get_cookies(self, client: httpx.AsyncClient, app: App) -> Optional[Dict[str, str]]:
+        """
+        Return session cookies for an app, logging in only if none are cached
+
+        Concurrent callers for the same app wait on a single login.
+        Returns None when the app has no password or the login failed.
+        """
+        if not app.password:
+            return None
+
+        cookies = self._cached(app)
+        if cookies is not None:
+            self.stats["reused"] += 1
+            return cookies
+
+        lock = self._locks.setdefault(app.id, asyncio.Lock())
+        async with lock:
+            # Another caller may have logged in while we waited
+            cookies = self._cached(app)
+            if cookies is not None:
+                self.stats["reused"] += 1
+                return cookies
+            return await self._login(client, app)
+
+    async def _login(self, client: httpx.AsyncClient, app: App) -> Optional[Dict[str, str]]:
+        try:
+            response = await client.post(
+                f"{app.base_url}/UI/Dashboard",
+                data={"password": app.password},
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                follow_redirects=False
+            )
+            self._keep_out_of_jar(client, response)
+        except Exception as e:
+            logger.warning(f"Jackett login failed: {e}")
+            return None
+
+        cookies = dict(response.cookies)
+        if not cookies:
+            logger.warning(f"Jackett login failed for {app.name}: no session cookie (HTTP {response.status_code})")
+            return None
+
+        self.stats["logins"] += 1
+        self._store(app, cookies)
+        logger.info(f"🔑 Logged in to Jackett ({app.name})")
+        return cookies
+
+    def _store(self, app: App, cookies: Dict[str, str]):
+        self._load()
+        self._sessions[str(app.id)] = {
+            "fingerprint": self._fingerprint(app),
+            "cookies": cookies,
+            "created_at": time.time()
+        }
+        self._save()
+
+    async def refresh(
+        self,
+        client: httpx.AsyncClient,
+        app: App,
+        rejected: Optional[Dict[str, str]]
+    ) -> Optional[Dict[str, str]]:
+        """
+        Replace a session Jackett rejected
+
+        Only the first caller holding the rejected cookies logs in again;
+        later callers get the new session.
+        """
+        lock = self._locks.setdefault(app.id, asyncio.Lock())
+        async with lock:
+            current = self._cached(app)
+            if current is not None and current != rejected:
+                return current
+            self.stats["refreshed"] += 1
+            self._sessions.pop(str(app.id), None)
+            return await self._login(client, app)
+
+    @staticmethod
+    def is_auth_failure(response: httpx.Response) -> bool:
+        """Jackett answers expired sessions with 401/403 or a redirect to the login page"""
+        if response.status_code in (401, 403):
+            return True
+        return response.is_redirect and "login" in response.headers.get("location", "").lower()
+
+    async def request(
+        self,
+        client: httpx.AsyncClient,
+        app: App,
+        method: str,
+        url: str,
+        **kwargs
+    ) -> httpx.Response:
+        """Send a request with the app's session, logging in again once if it was rejected"""
+        cookies = await self.get_cookies(client, app)
+        response = await self._send(client, app, method, url, cookies, **kwargs)
+
+        if app.password and self.is_auth_failure(response):
+            logger.info(f"🔑 Jackett session for {app.name} rejected, logging in again")
+            cookies = await self.refresh(client, app, cookies)
+            response = await self._send(client, app, method, url, cookies, **kwargs)
+
+        return response
+
+    async def _send(
+        self,
+        client: httpx.AsyncClient,
+        app: App,
+        method: str,
+        url: str,
+        cookies: Optional[Dict[str, str]],
+        **kwargs
+    ) -> httpx.Response:
+        """One request with the session in the Cookie header (overrides the client's jar)"""
+        headers = dict(kwargs.pop("headers", None) or {})
+        if cookies:
+            headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in cookies.items())
+        response = await client.request(method, url, headers=headers, **kwargs)
+
+        renewed = self._keep_out_of_jar(client, response)
+        if cookies and renewed and {**cookies, **renewed} != cookies:
+            # Jackett slid the session's expiry - keep the new cookie
+            self._store(app, {**cookies, **renewed})
+        return response
+
+    @staticmethod
+    def _keep_out_of_jar(client: httpx.AsyncClient, response: httpx.Response) -> Dict[str, str]:
+        """Remove cookies a Jackett response set from the shared client's jar; returns them"""
+        cookies = dict(response.cookies)
+        for name in cookies:
+            client.cookies.delete(name, domain=response.url.host)
+        return cookies
+
+    def forget(self, app_id: int):
+        """Drop a cached session (e.g. when the app is deleted or edited)"""
+        self._load()
+        if self._sessions.pop(str(app_id), None) is not None:
+            self._save()
+
+
+# Singleton instance
+jackett_sessions = JackettSessionManager()
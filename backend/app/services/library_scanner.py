@@ -9,6 +9,7 @@ import hashlib
 from sqlalchemy import select, text
 from backend.app.services.metadata_manager import metadata_manager
 from backend.app.services.google_books import google_books_service
+from backend.app.services.metadata_snapshot import metadata_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -31,8 +32,14 @@ class LibraryScanner:
     # Audiobook formats that are typically multi-file
     MULTI_FILE_FORMATS = ['.mp3', '.m4a', '.aac', '.flac']
     
+    # Flush queued snapshot records every N books
+    SNAPSHOT_FLUSH_EVERY = 100
+    
     def __init__(self, db_session):
         self.db = db_session
+        self.library_path: Optional[str] = None
+        self.snapshot_index: Dict[str, Dict] = {}
+        self.snapshot_queue: List = []
         self.scan_stats = {
             'total_files': 0,
             'processed': 0,
@@ -59,6 +66,15 @@ class LibraryScanner:
         # Reset stats
         self.scan_stats = {k: 0 for k in self.scan_stats.keys()}
         
+        # 🗄️ Load the library snapshot so known books skip re-enrichment
+        self.library_path = library.path
+        self.snapshot_queue = []
+        try:
+            self.snapshot_index = metadata_snapshot.read(library.path)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read library snapshot: {e}")
+            self.snapshot_index = {}
+        
         # Find all files (or grouped audiobooks)
         if library.library_type == 'audiobooks':
             items = self._find_audiobook_folders(library.path)
@@ -94,13 +110,19 @@ class LibraryScanner:
                 # Yield control every 10 files to keep responsive
                 if self.scan_stats['processed'] % 10 == 0:
                     await asyncio.sleep(0)
+                
+                if len(self.snapshot_queue) >= self.SNAPSHOT_FLUSH_EVERY:
+                    self._flush_snapshot()
                     
             except Exception as e:
                 logger.error(f"❌ Error processing item: {e}")
                 self.scan_stats['errors'] += 1
         
+        self._flush_snapshot()
+        
         # 🧹 CLEANUP: Remove books whose files no longer exist
         await self._cleanup_missing_files(library)
+        metadata_snapshot.compact(library.path)
         
         # Update library stats - count ALL books in library, not just new ones
         result = await self.db.execute(
@@ -117,6 +139,88 @@ class LibraryScanner:
         
         return self.scan_stats
     
+    async def import_paths(self, library, paths: List[Path], book=None) -> Dict:
+        """
+        Process only the given files (e.g. a finished download) instead of
+        walking the whole library
+        
+        Files go through the same per-file processing as a scan; audiobook
+        files are processed as their folder. Cost is proportional to the
+        number of paths, not the library size. With `book` (a wanted book the
+        download was grabbed for), the first item fills that book instead of
+        adding a new one.
+        """
+        self.scan_stats = {k: 0 for k in self.scan_stats.keys()}
+        self.library_path = library.path
+        self.snapshot_index = {}
+        self.snapshot_queue = []
+        
+        if library.library_type == 'audiobooks':
+            folders = sorted({path.parent for path in paths})
+            items = [item for item in (self._audiobook_folder(folder) for folder in folders) if item]
+        else:
+            extensions = self.SUPPORTED_FORMATS.get(library.library_type, [])
+            items = [path for path in paths if path.suffix.lower() in extensions]
+        
+        self.scan_stats['total_files'] = len(items)
+        
+        for item in items:
+            try:
+                if book is not None and not book.file_path:
+                    await self._fill_book(book, item, library)
+                elif isinstance(item, dict):
+                    await self._process_audiobook_folder(item, library, {})
+                else:
+                    await self._process_file(item, library, {})
+                self.scan_stats['processed'] += 1
+            except Exception as e:
+                logger.error(f"❌ Error importing item: {e}")
+                self.scan_stats['errors'] += 1
+        
+        self._flush_snapshot()
+        
+        if self.scan_stats['added']:
+            library.total_items = (library.total_items or 0) + self.scan_stats['added']
+            await self.db.commit()
+        
+        logger.info(f"📥 Imported {len(items)} item(s) into {library.name}: {self.scan_stats}")
+        return self.scan_stats
+    
+    async def _fill_book(self, book, item, library):
+        """Point a wanted book at its imported file (or audiobook folder)"""
+        if isinstance(item, dict):
+            book.file_path = str(item['folder'])
+            book.file_format = 'audiobook'
+            book.file_size = item['total_size']
+            book.page_count = item['file_count']
+        else:
+            book.file_path = str(item)
+            book.file_format = item.suffix[1:].lower()
+            book.file_size = os.path.getsize(item)
+        book.library_id = library.id
+        book.status = 'available'
+        book.updated_at = datetime.utcnow()
+        await self.db.commit()
+        self._queue_snapshot(book, metadata_snapshot.fingerprint(book.file_path))
+        
+        logger.debug(f"✅ Wanted book now available: {book.title}")
+        self.scan_stats['added'] += 1
+    
+    def _queue_snapshot(self, book, fingerprint: Optional[str]):
+        """Queue a book's metadata for the library snapshot"""
+        if not fingerprint or not self.library_path:
+            return
+        payload = metadata_snapshot.payload_for(book, self.library_path)
+        # Unchanged since the last snapshot - nothing to append
+        if self.snapshot_index.get(fingerprint) != payload:
+            self.snapshot_queue.append((fingerprint, payload))
+    
+    def _flush_snapshot(self):
+        """Append queued records to the library snapshot"""
+        if self.snapshot_queue and self.library_path:
+            metadata_snapshot.append(self.library_path, self.snapshot_queue)
+        self.snapshot_queue = []
+    
     async def _cleanup_missing_files(self, library):
         """
         Remove books from database whose files no longer exist
@@ -161,35 +265,9 @@ class LibraryScanner:
             if not folder.is_dir():
                 continue
             
-            # Find audio files in this folder
-            audio_files = []
-            for ext in self.MULTI_FILE_FORMATS + ['.m4b']:
-                audio_files.extend(folder.glob(f'*{ext}'))
-            
-            if not audio_files:
-                continue
-            
-            # Sort files by name (usually Part01, Part02, etc.)
-            audio_files.sort()
-            
-            # Look for cover image
-            cover = None
-            for cover_ext in ['.jpg', '.jpeg', '.png']:
-                cover_files = list(folder.glob(f'*{cover_ext}'))
-                if cover_files:
-                    cover = cover_files[0]
-                    break
-            
-            # Calculate total size
-            total_size = sum(f.stat().st_size for f in audio_files)
-            
-            audiobooks.append({
-                'folder': folder,
-                'files': audio_files,
-                'cover': cover,
-                'total_size': total_size,
-                'file_count': len(audio_files)
-            })
+            audiobook = self._audiobook_folder(folder)
+            if audiobook:
+                audiobooks.append(audiobook)
         
         # Sort by modification time (newest first)
         audiobooks.sort(
@@ -200,6 +278,38 @@ class LibraryScanner:
         logger.info(f"🎧 Found {len(audiobooks)} audiobook folders")
         return audiobooks
     
+    def _audiobook_folder(self, folder: Path) -> Optional[Dict]:
+        """Audio files, cover and size of one audiobook folder (None if it has no audio)"""
+        # Find audio files in this folder
+        audio_files = []
+        for ext in self.MULTI_FILE_FORMATS + ['.m4b']:
+            audio_files.extend(folder.glob(f'*{ext}'))
+        
+        if not audio_files:
+            return None
+        
+        # Sort files by name (usually Part01, Part02, etc.)
+        audio_files.sort()
+        
+        # Look for cover image
+        cover = None
+        for cover_ext in ['.jpg', '.jpeg', '.png']:
+            cover_files = list(folder.glob(f'*{cover_ext}'))
+            if cover_files:
+                cover = cover_files[0]
+                break
+        
+        # Calculate total size
+        total_size = sum(f.stat().st_size for f in audio_files)
+        
+        return {
+            'folder': folder,
+            'files': audio_files,
+            'cover': cover,
+            'total_size': total_size,
+            'file_count': len(audio_files)
+        }
+    
     def _find_files(self, path: str, library_type: str) -> List[Path]:
         """Recursively find all supported files"""
         extensions = self.SUPPORTED_FORMATS.get(library_type, [])
@@ -306,6 +416,7 @@ class LibraryScanner:
                 book.updated_at = datetime.utcnow()
                 book.page_count = audiobook_data['file_count']  # Store file count as "page count"
                 await self.db.commit()
+                self._queue_snapshot(book, metadata_snapshot.fingerprint(folder_path))
                 logger.debug(f"🔄 Updated audiobook: {book.title}")
             self.scan_stats['updated'] += 1
         else:
@@ -325,6 +436,7 @@ class LibraryScanner:
             
             self.db.add(book)
             await self.db.commit()
+            self._queue_snapshot(book, metadata_snapshot.fingerprint(folder_path))
             
             logger.debug(f"➕ Added audiobook: {book.title} ({audiobook_data['file_count']} files)")
             self.scan_stats['added'] += 1
@@ -397,11 +509,11 @@ class LibraryScanner:
         
         if existing:
             # Update existing book
-            await self._update_book(existing[0], metadata, file_path)
+            await self._update_book(existing[0], metadata, file_path, quick_hash)
             self.scan_stats['updated'] += 1
         else:
             # Add new book
-            await self._add_book(library.id, metadata, file_path)
+            await self._add_book(library.id, metadata, file_path, quick_hash)
             self.scan_stats['added'] += 1
     
     def _extract_metadata(self, file_path: Path) -> Dict:
@@ -562,10 +674,33 @@ class LibraryScanner:
             'isbn': None
         }
     
-    async def _add_book(self, library_id: int, metadata: Dict, file_path: Path):
+    async def _add_book(
+        self,
+        library_id: int,
+        metadata: Dict,
+        file_path: Path,
+        fingerprint: Optional[str] = None
+    ):
         """Add new book to database with optional Google Books enrichment"""
         from ..db.models.book import Book
         
+        # 🗄️ Known from the library snapshot - restore without any network calls
+        snapshot = self.snapshot_index.get(fingerprint) if fingerprint else None
+        if snapshot:
+            logger.debug(f"🗄️ Using snapshot metadata for {file_path.name}")
+            book = Book(
+                library_id=library_id,
+                **{field: snapshot.get(field) for field in metadata_snapshot.FIELDS},
+                file_path=str(file_path)
+            )
+            book.file_size = os.path.getsize(file_path)
+            book.status = book.status or 'available'
+            book.monitored = bool(book.monitored)
+            self.db.add(book)
+            await self.db.commit()
+            self._queue_snapshot(book, fingerprint)
+            return
+        
         # 🌟 Try to enrich with Google Books
         google_metadata = None
         try:
@@ -626,11 +761,18 @@ class LibraryScanner:
         
         self.db.add(book)
         await self.db.commit()
+        self._queue_snapshot(book, fingerprint)
         
         logger.debug(f"➕ Added: {book.title} by {book.author_name}")
 
     
-    async def _update_book(self, book_id: int, metadata: Dict, file_path: Path):
+    async def _update_book(
+        self,
+        book_id: int,
+        metadata: Dict,
+        file_path: Path,
+        fingerprint: Optional[str] = None
+    ):
         """Update existing book"""
         from ..db.models.book import Book
         
@@ -642,5 +784,6 @@ class LibraryScanner:
             book.updated_at = datetime.utcnow()
             
             await self.db.commit()
+            self._queue_snapshot(book, fingerprint)
             
             logger.debug(f"🔄 Updated: {book.title}")
\ No newline at end of file
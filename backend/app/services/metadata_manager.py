@@ -9,13 +9,15 @@ Supports multiple formats:
 - cover.jpg (downloaded cover image)
 """
 
+import asyncio
 import os
 import json
 import logging
 from pathlib import Path
 from typing import Dict, Optional
 from datetime import datetime
-import httpx
+
+from backend.app.services.cover_cache import cover_cache
 
 logger = logging.getLogger(__name__)
 
@@ -141,31 +143,30 @@ class MetadataManager:
     async def download_cover(file_path: str, cover_url: str) -> Optional[str]:
         """
         Download cover image and save it alongside the book
-        
+
+        The image goes through the shared cover cache: it is streamed to disk,
+        revalidated with ETag/Last-Modified on later saves, and stored once per
+        content hash. The book folder gets a hardlink to the stored copy.
+
         Args:
             file_path: Path to the book file or folder
             cover_url: URL of the cover image
-        
+
         Returns:
             Path to saved cover, or None if failed
         """
         try:
             folder = MetadataManager.get_book_folder(file_path)
             cover_path = folder / MetadataManager.COVER_FILENAME
-            
-            # Download cover image
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(cover_url)
-                
-                if response.status_code != 200:
-                    logger.error(f"Failed to download cover: HTTP {response.status_code}")
-                    return None
-                
-                # Save cover
-                with open(cover_path, 'wb') as f:
-                    f.write(response.content)
-            
-            logger.info(f"✅ Downloaded cover to {cover_path}")
+
+            blob = await cover_cache.fetch(cover_url)
+            if not blob:
+                return None
+
+            if await asyncio.to_thread(cover_cache.link_into, blob, cover_path):
+                logger.info(f"✅ Saved cover to {cover_path}")
+            else:
+                logger.debug(f"🖼️ Cover already up to date at {cover_path}")
             return str(cover_path)
             
         except Exception as e:
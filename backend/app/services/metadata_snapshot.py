@@ -0,0 +1,256 @@
+# File: backend/app/services/metadata_snapshot.py
+"""
+🗄️ Library Metadata Snapshot
+
+One compact catalog file per library holding every book's metadata, keyed by
+a content fingerprint. Used to rebuild the database without rescanning or
+re-enriching anything.
+
+File layout (little-endian):
+- header:  8-byte magic, u16 format version, u16 reserved
+- records: u32 payload length, 16-byte fingerprint, UTF-8 JSON payload
+
+Records are only ever appended; a later record for the same fingerprint
+replaces the earlier one. The file is read through mmap and compacted when
+superseded records outnumber live ones.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MetadataSnapshot:
+    """Reads and writes the per-library catalog snapshot"""
+
+    FILENAME = ".evolibrary-catalog.snap"
+    MAGIC = b"EVOSNAP\x00"
+    VERSION = 1
+
+    HEADER = struct.Struct("<8sHH")
+    RECORD = struct.Struct("<I16s")
+
+    # Audio files that make up a multi-file audiobook folder
+    AUDIO_EXTENSIONS = ('.m4b', '.mp3', '.m4a', '.aac', '.flac')
+
+    # Book columns carried in the snapshot
+    FIELDS = (
+        'title', 'author_name', 'isbn', 'description', 'publisher',
+        'published_date', 'page_count', 'language', 'categories',
+        'cover_url', 'file_format', 'file_size', 'monitored', 'status'
+    )
+
+    # ------------------------------------------------------------------
+    # Fingerprints and payloads
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def fingerprint(cls, path: str) -> Optional[str]:
+        """
+        Content fingerprint for a book file or audiobook folder
+
+        Files use size + first 1KB (same as the scanner's quick hash);
+        folders use the names and sizes of their audio files.
+        """
+        try:
+            p = Path(path)
+            hasher = hashlib.md5()
+
+            if p.is_dir():
+                files = sorted(
+                    f for f in p.iterdir()
+                    if f.is_file() and f.suffix.lower() in cls.AUDIO_EXTENSIONS
+                )
+                for f in files:
+                    hasher.update(f.name.encode())
+                    hasher.update(str(f.stat().st_size).encode())
+            else:
+                hasher.update(str(p.stat().st_size).encode())
+                with open(p, 'rb') as f:
+                    hasher.update(f.read(1024))
+
+            return hasher.hexdigest()
+        except OSError as e:
+            logger.debug(f"Could not fingerprint {path}: {e}")
+            return None
+
+    @classmethod
+    def payload_for(cls, book, library_path: str) -> Dict:
+        """Build the snapshot payload for a Book row"""
+        payload = {field: getattr(book, field, None) for field in cls.FIELDS}
+        try:
+            payload['path'] = os.path.relpath(book.file_path, library_path)
+        except ValueError:
+            # Different drive on Windows - keep the absolute path
+            payload['path'] = book.file_path
+        return payload
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def snapshot_path(self, library_path: str) -> Path:
+        return Path(library_path) / self.FILENAME
+
+    def _encode(self, entries: Iterable[Tuple[str, Dict]]) -> Tuple[bytes, int]:
+        """Encode (fingerprint, payload) pairs into record bytes"""
+        buffer = bytearray()
+        count = 0
+        for fingerprint, payload in entries:
+            data = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+            buffer += self.RECORD.pack(len(data), bytes.fromhex(fingerprint))
+            buffer += data
+            count += 1
+        return bytes(buffer), count
+
+    def append(self, library_path: str, entries: Iterable[Tuple[str, Dict]]) -> int:
+        """
+        Append (fingerprint, payload) records to a library's snapshot
+
+        Returns the number of records written.
+        """
+        data, count = self._encode(entries)
+        if not count:
+            return 0
+
+        path = self.snapshot_path(library_path)
+        try:
+            with open(path, 'ab') as f:
+                if f.tell() == 0:
+                    f.write(self.HEADER.pack(self.MAGIC, self.VERSION, 0))
+                f.write(data)
+        except OSError as e:
+            logger.error(f"❌ Failed to write snapshot {path}: {e}")
+            return 0
+
+        logger.debug(f"🗄️ Appended {count} records to {path}")
+        return count
+
+    def put(self, library_path: str, book) -> bool:
+        """Record the current metadata of a single book"""
+        if not book.file_path:
+            return False
+        fingerprint = self.fingerprint(book.file_path)
+        if not fingerprint:
+            return False
+        return self.append(library_path, [(fingerprint, self.payload_for(book, library_path))]) == 1
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _walk(self, view: mmap.mmap, path: Path) -> Tuple[Dict[bytes, Tuple[int, int]], int, bool]:
+        """
+        Walk the records of a mapped snapshot
+
+        Returns {fingerprint: (offset, length)} for the latest record of each
+        fingerprint, the total number of records seen, and whether the file
+        ended cleanly (False when a torn write left a partial record).
+        """
+        size = len(view)
+        magic, version, _ = self.HEADER.unpack_from(view, 0)
+        if magic != self.MAGIC:
+            raise ValueError(f"{path} is not an Evolibrary snapshot")
+        if version > self.VERSION:
+            raise ValueError(f"Snapshot version {version} is newer than supported ({self.VERSION})")
+
+        latest: Dict[bytes, Tuple[int, int]] = {}
+        total = 0
+        offset = self.HEADER.size
+        record_size = self.RECORD.size
+
+        while offset + record_size <= size:
+            length, fingerprint = self.RECORD.unpack_from(view, offset)
+            start = offset + record_size
+            if start + length > size:
+                break
+            latest[fingerprint] = (start, length)
+            total += 1
+            offset = start + length
+
+        clean = offset == size
+        if not clean:
+            logger.warning(f"⚠️ Partial record at offset {offset} in {path}, ignoring tail")
+        return latest, total, clean
+
+    def _load(self, path: Path) -> Tuple[Dict[str, Dict], int, bool]:
+        """Decode the latest payload per fingerprint from a snapshot file"""
+        entries: Dict[str, Dict] = {}
+
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < self.HEADER.size:
+                return entries, 0, False
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                latest, total, clean = self._walk(view, path)
+                for fingerprint, (start, length) in latest.items():
+                    try:
+                        entries[fingerprint.hex()] = json.loads(view[start:start + length])
+                    except ValueError as e:
+                        logger.warning(f"⚠️ Skipping corrupt snapshot record {fingerprint.hex()}: {e}")
+
+        return entries, total, clean
+
+    def read(self, library_path: str) -> Dict[str, Dict]:
+        """
+        Load the latest payload for every fingerprint in a library's snapshot
+
+        Returns {fingerprint_hex: payload}; empty if there is no snapshot.
+        """
+        path = self.snapshot_path(library_path)
+        if not path.exists():
+            return {}
+
+        entries, _, _ = self._load(path)
+        logger.info(f"🗄️ Read {len(entries)} books from {path}")
+        return entries
+
+    def compact(self, library_path: str, force: bool = False) -> bool:
+        """
+        Rewrite the snapshot keeping only the latest record per fingerprint
+
+        Skipped unless superseded records outnumber live ones, the file has a
+        torn tail, or `force` is set. Records whose files no longer exist are
+        dropped.
+        """
+        path = self.snapshot_path(library_path)
+        if not path.exists():
+            return False
+
+        latest, total, clean = self._load(path)
+        if not force and clean and total - len(latest) <= len(latest):
+            return False
+
+        entries: List[Tuple[str, Dict]] = []
+        for fingerprint, payload in latest.items():
+            book_path = Path(library_path) / payload.get('path', '')
+            if book_path.exists():
+                entries.append((fingerprint, payload))
+
+        data, count = self._encode(entries)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".evolibrary-catalog-")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.HEADER.pack(self.MAGIC, self.VERSION, 0))
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"❌ Failed to compact snapshot {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return False
+
+        logger.info(f"🧹 Compacted snapshot {path}: {total} → {count} records")
+        return True
+
+
+# Singleton instance
+metadata_snapshot = MetadataSnapshot()
@@ -0,0 +1,342 @@
+# File: backend/app/services/qbittorrent_service.py
+"""
+qBittorrent Web API v2 client
+
+- One long-lived session per WebUI: logs in once and keeps the session
+  cookie (`SID`, or a per-port name on newer releases), logging in again
+  only when qBittorrent answers 403
+- Grabs are added with the category and save path from the client's
+  label mappings; categories are created once and cached
+- Several grabs go out in one /torrents/add request (magnets as `urls`,
+  .torrent files as multipart uploads)
+- Status comes from /sync/maindata?rid=N, which only returns what changed
+  since the last response; the session merges those deltas into its own
+  copy of the torrent list
+
+qBittorrent doesn't return IDs for added torrents, so the infohash of the
+magnet or .torrent (which is qBittorrent's torrent hash) is used.
+"""
+
+import asyncio
+import httpx
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from backend.app.services.torrent_resolver import torrent_resolver
+
+logger = logging.getLogger(__name__)
+
+class QBittorrentError(Exception):
+    """qBittorrent rejected a request"""
+
+
+class QBittorrentSession:
+    """Long-lived session with one qBittorrent WebUI"""
+
+    def __init__(self, base_url: str, username: str, password: str):
+        self.base_url = base_url
+        self.username = username
+        self.password = password
+        # qBittorrent's CSRF check wants a Referer/Origin matching the WebUI
+        self.client = httpx.AsyncClient(timeout=30.0, headers={"Referer": base_url})
+        self._authenticated = False
+        self._login_lock = asyncio.Lock()
+        self._sync_lock = asyncio.Lock()
+        self.categories: Optional[Set[str]] = None
+        # Incremental sync state
+        self.rid = 0
+        self.torrents: Dict[str, Dict[str, Any]] = {}
+        self.server_state: Dict[str, Any] = {}
+        self.stats = {"requests": 0, "logins": 0, "syncs": 0, "full_syncs": 0}
+
+    async def login(self):
+        """Log in (once for concurrent callers); raises if the credentials are rejected"""
+        async with self._login_lock:
+            if self._authenticated:
+                return
+            logger.info(f"[qBittorrent] 🔐 Authenticating to {self.base_url}...")
+            self.stats["requests"] += 1
+            self.stats["logins"] += 1
+            response = await self.client.post(
+                f"{self.base_url}/api/v2/auth/login",
+                data={"username": self.username, "password": self.password}
+            )
+            if response.status_code == 403:
+                raise QBittorrentError("IP banned after too many failed logins")
+            # "Ok." is the success signal; the session cookie (whatever its
+            # name) stays in the client's cookie jar
+            if response.text.strip() != "Ok.":
+                logger.error(f"[qBittorrent] ❌ Authentication failed!")
+                raise QBittorrentError("Authentication failed")
+            self._authenticated = True
+            logger.info(f"[qBittorrent] ✅ Authenticated (SID reused until qBittorrent drops it)")
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Call /api/v2/<path>; logs in again once if the SID expired"""
+        if not self._authenticated:
+            await self.login()
+
+        url = f"{self.base_url}/api/v2/{path}"
+        self.stats["requests"] += 1
+        response = await self.client.request(method, url, **kwargs)
+        if response.status_code == 403:
+            # SID expired (or WebUI restarted) - log in again and retry once
+            logger.info(f"[qBittorrent] 🔄 Session expired, re-authenticating")
+            self._authenticated = False
+            self.client.cookies.clear()
+            await self.login()
+            self.stats["requests"] += 1
+            response = await self.client.request(method, url, **kwargs)
+
+        if response.status_code >= 400:
+            raise QBittorrentError(f"{path} failed: HTTP {response.status_code} {response.text[:200]}")
+        return response
+
+    async def ensure_category(self, category: str, save_path: Optional[str] = None):
+        """Create a category unless it is known to exist (non-fatal on errors)"""
+        try:
+            if self.categories is None:
+                response = await self.request("GET", "torrents/categories")
+                self.categories = set(response.json() or {})
+            if category in self.categories:
+                return
+            try:
+                await self.request("POST", "torrents/createCategory", data={"category": category, "savePath": save_path or ""})
+            except QBittorrentError as e:
+                # 409: created meanwhile - fine
+                if "409" not in str(e):
+                    raise
+            self.categories.add(category)
+            logger.info(f"[qBittorrent] 🏷️  Category '{category}' ready")
+        except Exception as e:
+            logger.warning(f"[qBittorrent] ⚠️  Category setup failed (non-fatal): {e}")
+            self.categories = None
+
+    async def sync(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Bring the local torrent list up to date with one /sync/maindata call
+
+        Only changed fields are sent by qBittorrent; a `full_update` replaces
+        everything (first call, or when qBittorrent dropped our rid).
+        """
+        async with self._sync_lock:
+            response = await self.request("GET", "sync/maindata", params={"rid": self.rid})
+            data = response.json()
+            self.stats["syncs"] += 1
+
+            if data.get("full_update"):
+                self.stats["full_syncs"] += 1
+                self.torrents = {}
+                if "categories" in data:
+                    self.categories = set(data["categories"] or {})
+            elif self.categories is not None:
+                self.categories.update(data.get("categories") or {})
+                self.categories.difference_update(data.get("categories_removed") or [])
+
+            self.server_state.update(data.get("server_state") or {})
+            for torrent_hash, changes in (data.get("torrents") or {}).items():
+                self.torrents.setdefault(torrent_hash, {}).update(changes)
+            for torrent_hash in data.get("torrents_removed") or []:
+                self.torrents.pop(torrent_hash, None)
+
+            self.rid = data.get("rid", self.rid)
+            return self.torrents
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class QBittorrentService:
+    """Service for interacting with the qBittorrent WebUI"""
+
+    def __init__(self):
+        self._sessions: Dict[Tuple[str, str, str], QBittorrentSession] = {}
+
+    def session(self, host: str, port: int, username: Optional[str], password: Optional[str], use_ssl: bool = False) -> QBittorrentSession:
+        """Shared session for a WebUI (changed credentials get a new one)"""
+        protocol = "https" if use_ssl else "http"
+        base_url = f"{protocol}://{host}:{port}"
+        key = (base_url, username or "", password or "")
+        session = self._sessions.get(key)
+        if session is None:
+            session = self._sessions[key] = QBittorrentSession(base_url, username or "", password or "")
+        return session
+
+    async def close(self):
+        """Close all sessions (app shutdown)"""
+        sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            await session.close()
+
+    async def test_connection(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str],
+        password: Optional[str],
+        use_ssl: bool = False
+    ) -> Dict[str, Any]:
+        """Log in and read the application version"""
+        session = QBittorrentSession(f"{'https' if use_ssl else 'http'}://{host}:{port}", username or "", password or "")
+        try:
+            version = (await session.request("GET", "app/version")).text.strip()
+            api_version = (await session.request("GET", "app/webapiVersion")).text.strip()
+            return {
+                "success": True,
+                "message": f"Connected to qBittorrent {version}",
+                "version_info": {"version": version, "web_api": api_version}
+            }
+        except httpx.ConnectError:
+            return {
+                "success": False,
+                "message": f"Cannot connect to {host}:{port}. Is the qBittorrent WebUI running?"
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Error: {str(e)}"
+            }
+        finally:
+            await session.close()
+
+    async def add_torrents(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str],
+        password: Optional[str],
+        torrent_urls: List[str],
+        category: Optional[str] = None,
+        save_path: Optional[str] = None,
+        use_ssl: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Add torrents with the same category/save path in one /torrents/add request
+
+        Never raises - returns one {"success", "torrent_id" | "error"} per URL
+        (`connection_error` marks items that failed because qBittorrent was
+        unreachable).
+        """
+        session = self.session(host, port, username, password, use_ssl)
+        results: List[Dict[str, Any]] = [{"success": False, "error": "Not sent"} for _ in torrent_urls]
+
+        resolved = await asyncio.gather(
+            *(torrent_resolver.resolve(url) for url in torrent_urls),
+            return_exceptions=True
+        )
+
+        magnets: List[Tuple[int, str]] = []
+        files: List[Tuple[int, bytes]] = []
+        for position, item in enumerate(resolved):
+            if isinstance(item, BaseException):
+                results[position] = {"success": False, "error": str(item)}
+                continue
+            if not item.infohash:
+                results[position] = {"success": False, "error": "Could not read the torrent's info hash"}
+                continue
+            results[position] = {"success": True, "torrent_id": item.infohash}
+            (magnets if item.kind == "magnet" else files).append((position, item.payload))
+
+        sent = magnets + files
+        if not sent:
+            return results
+
+        if category:
+            await session.ensure_category(category, save_path)
+
+        data = {}
+        if magnets:
+            data["urls"] = "\n".join(magnet for _, magnet in magnets)
+        if category:
+            data["category"] = category
+        if save_path:
+            data["savepath"] = save_path
+
+        try:
+            response = await session.request(
+                "POST", "torrents/add",
+                data=data,
+                files=[("torrents", (f"{position}.torrent", torrent, "application/x-bittorrent")) for position, torrent in files] or None
+            )
+            if response.text.strip() == "Fails.":
+                raise QBittorrentError("qBittorrent did not accept the torrent(s)")
+        except Exception as e:
+            logger.error(f"[qBittorrent] ❌ Add failed: {e}")
+            for position, _ in sent:
+                results[position] = {"success": False, "error": str(e), "connection_error": isinstance(e, httpx.TransportError)}
+            return results
+
+        logger.info(
+            f"[qBittorrent] 📦 Added {len(sent)} of {len(torrent_urls)} "
+            f"({len(magnets)} magnets, {len(files)} files) category '{category or 'none'}'"
+        )
+        return results
+
+    async def add_torrent(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str],
+        password: Optional[str],
+        torrent_url: str,
+        category: Optional[str] = None,
+        save_path: Optional[str] = None,
+        use_ssl: bool = False
+    ) -> Dict[str, Any]:
+        """Add one torrent (see add_torrents)"""
+        results = await self.add_torrents(host, port, username, password, [torrent_url], category, save_path, use_ssl)
+        return results[0]
+
+    async def get_torrents_status(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str],
+        password: Optional[str],
+        torrent_ids: List[str],
+        use_ssl: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Status of several torrents from one incremental sync
+
+        Returns {torrent_id: maindata torrent fields}; torrents qBittorrent
+        no longer has are missing from the result.
+        """
+        session = self.session(host, port, username, password, use_ssl)
+        torrents = await session.sync()
+        return {
+            torrent_id: dict(torrents[torrent_id.lower()])
+            for torrent_id in torrent_ids
+            if torrent_id.lower() in torrents
+        }
+
+    async def get_free_space(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str],
+        password: Optional[str],
+        use_ssl: bool = False
+    ) -> Optional[int]:
+        """Free bytes on the default save path's disk (from the sync's server state)"""
+        session = self.session(host, port, username, password, use_ssl)
+        await session.sync()
+        return session.server_state.get("free_space_on_disk")
+
+    async def get_torrent_files(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str],
+        password: Optional[str],
+        torrent_id: str,
+        use_ssl: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Files of one torrent ({name, size, progress, ...}, name relative to its save path)"""
+        session = self.session(host, port, username, password, use_ssl)
+        response = await session.request("GET", "torrents/files", params={"hash": torrent_id.lower()})
+        return response.json() or []
+
+
+# Singleton instance
+qbittorrent_service = QBittorrentService()
@@ -0,0 +1,262 @@
+# File: backend/app/services/quality_profiles.py
+"""
+🎯 Quality Profile Engine
+
+Turns a QualityProfile row into a compiled decision function, once per
+profile version:
+
+- format_items JSON parsed once; enabled formats map to (priority, min, max bytes)
+- one regex per profile finds the profile's formats in release titles
+  (indexers rarely report a file format)
+- cutoff and upgrade rules resolved to priorities
+
+`CompiledProfile.rank` then accepts/rejects and orders a whole batch of
+search results with dict lookups and one regex scan per title. Results are
+ordered by format priority, then seeders, then smaller size; releases with
+no recognisable format rank after every known format.
+"""
+
+import json
+import logging
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.db.models.library import Library
+from backend.app.db.models.quality_profile import QualityProfile
+from backend.app.schemas.quality_profiles import FormatItem
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Library types (libraries.library_type) -> profile media types
+LIBRARY_MEDIA_TYPES = {
+    "books": "ebook",
+    "audiobooks": "audiobook",
+    "comics": "comic",
+    "magazines": "magazine",
+}
+
+
+class Decision(NamedTuple):
+    """Verdict for one release against a profile"""
+    accepted: bool
+    reason: Optional[str]       # Why it was rejected (None when accepted)
+    file_format: Optional[str]  # Format the profile matched (None if unknown)
+    priority: int               # Lower is better
+
+
+class CompiledProfile:
+    """A quality profile reduced to lookups and one title regex"""
+
+    def __init__(self, profile: QualityProfile):
+        self.id = profile.id
+        self.name = profile.name
+        self.media_type = profile.media_type
+        self.version = self.fingerprint(profile)
+
+        raw_items = json.loads(profile.format_items) if profile.format_items else []
+        self.format_items = [FormatItem(**item) for item in raw_items]
+
+        # format -> (priority, min bytes, max bytes or None); enabled formats only
+        self._rules: Dict[str, Tuple[int, int, Optional[int]]] = {}
+        self._disabled = set()
+        for item in self.format_items:
+            fmt = item.format.lower().lstrip(".")
+            if not item.enabled:
+                self._disabled.add(fmt)
+                continue
+            self._rules[fmt] = (
+                item.priority,
+                int(item.min_size_mb * MB),
+                int(item.max_size_mb * MB) if item.max_size_mb else None
+            )
+        self._disabled -= self._rules.keys()
+
+        # Releases without a recognisable format rank after every known one
+        self.unknown_priority = max((rule[0] for rule in self._rules.values()), default=0) + 1
+        self.best_priority = min((rule[0] for rule in self._rules.values()), default=1)
+
+        known = sorted(self._rules.keys() | self._disabled, key=len, reverse=True)
+        self._format_re = re.compile(
+            r'(?<![a-z0-9])(' + '|'.join(map(re.escape, known)) + r')(?![a-z0-9])'
+        ) if known else None
+
+        self.cutoff_format = (profile.cutoff_format or "").lower() or None
+        cutoff_rule = self._rules.get(self.cutoff_format) if self.cutoff_format else None
+        self.cutoff_priority = cutoff_rule[0] if cutoff_rule else None
+        self.allow_upgrades = bool(profile.allow_upgrades)
+        self.upgrade_until_cutoff = bool(profile.upgrade_until_cutoff)
+
+    @staticmethod
+    def fingerprint(profile: QualityProfile) -> Tuple:
+        """Everything the compiled form depends on"""
+        return (
+            profile.updated_at, profile.format_items, profile.cutoff_format,
+            profile.allow_upgrades, profile.upgrade_until_cutoff
+        )
+
+    def detect_format(self, title: str, file_format: Optional[str] = None) -> Optional[str]:
+        """
+        The release's format as the profile sees it
+
+        Uses the reported file format if there is one, otherwise the
+        best-priority profile format named in the title (multi-format packs
+        count as their best format). Disabled formats are only reported when
+        no enabled one is present.
+        """
+        if file_format:
+            return file_format.lower().lstrip(".")
+        if self._format_re is None:
+            return None
+
+        best = None
+        best_priority = None
+        for fmt in self._format_re.findall(title.lower()):
+            rule = self._rules.get(fmt)
+            if rule is None:
+                best = best or fmt
+            elif best_priority is None or rule[0] < best_priority:
+                best, best_priority = fmt, rule[0]
+        return best
+
+    def current_priority(self, current_format: Optional[str]) -> Optional[int]:
+        """Priority of an existing file (None when there is no file)"""
+        if not current_format:
+            return None
+        rule = self._rules.get(current_format.lower().lstrip("."))
+        return rule[0] if rule else self.unknown_priority
+
+    def wants_upgrade(self, current_format: Optional[str]) -> bool:
+        """Whether a book with a file in `current_format` should still be searched"""
+        current = self.current_priority(current_format)
+        if current is None:
+            return True
+        if not self.allow_upgrades or current <= self.best_priority:
+            return False
+        if self.upgrade_until_cutoff and self.cutoff_priority is not None:
+            return current > self.cutoff_priority
+        return True
+
+    def decide(
+        self,
+        title: str,
+        size_bytes: int = 0,
+        file_format: Optional[str] = None,
+        current_priority: Optional[int] = None
+    ) -> Decision:
+        """
+        Accept or reject one release
+
+        `current_priority` is the priority of the file already in the library
+        (see `current_priority`); only strictly better formats are upgrades.
+        """
+        fmt = self.detect_format(title, file_format)
+        rule = self._rules.get(fmt) if fmt else None
+
+        if rule is None:
+            if fmt in self._disabled or (fmt and file_format):
+                return Decision(False, "format_not_wanted", fmt, self.unknown_priority)
+            priority = self.unknown_priority
+        else:
+            priority, min_bytes, max_bytes = rule
+            if size_bytes:
+                if size_bytes < min_bytes:
+                    return Decision(False, "too_small", fmt, priority)
+                if max_bytes is not None and size_bytes > max_bytes:
+                    return Decision(False, "too_large", fmt, priority)
+
+        if current_priority is not None:
+            if not self.allow_upgrades:
+                return Decision(False, "upgrades_disabled", fmt, priority)
+            if (
+                self.upgrade_until_cutoff
+                and self.cutoff_priority is not None
+                and current_priority <= self.cutoff_priority
+            ):
+                return Decision(False, "cutoff_met", fmt, priority)
+            if priority >= current_priority:
+                return Decision(False, "not_an_upgrade", fmt, priority)
+
+        return Decision(True, None, fmt, priority)
+
+    def rank(self, results: Iterable, current_format: Optional[str] = None) -> List:
+        """
+        Accepted SearchResults, best first
+
+        Order: format priority, then seeders (descending), then size
+        (ascending). Logs how many were rejected and why.
+        """
+        current = self.current_priority(current_format)
+        decide = self.decide
+        scored = []
+        rejected: Counter = Counter()
+
+        for result in results:
+            decision = decide(result.title, result.size_bytes or 0, result.file_format, current)
+            if decision.accepted:
+                scored.append(((decision.priority, -(result.seeders or 0), result.size_bytes or 0), result))
+            else:
+                rejected[decision.reason] += 1
+
+        if rejected:
+            reasons = ", ".join(f"{reason}={count}" for reason, count in rejected.most_common())
+            logger.info(f"🎯 {self.name}: rejected {sum(rejected.values())} results ({reasons})")
+
+        scored.sort(key=lambda pair: pair[0])
+        return [result for _, result in scored]
+
+
+class QualityProfileEngine:
+    """Compiles quality profiles and keeps them until the profile changes"""
+
+    def __init__(self):
+        self._compiled: Dict[int, CompiledProfile] = {}
+        self.stats = {"compiled": 0, "reused": 0}
+
+    def compile(self, profile: QualityProfile) -> CompiledProfile:
+        """Compiled form of a profile row, rebuilt only when the row changed"""
+        compiled = self._compiled.get(profile.id)
+        if compiled is not None and compiled.version == CompiledProfile.fingerprint(profile):
+            self.stats["reused"] += 1
+            return compiled
+
+        compiled = CompiledProfile(profile)
+        self._compiled[profile.id] = compiled
+        self.stats["compiled"] += 1
+        return compiled
+
+    def invalidate(self, profile_id: int):
+        """Drop a compiled profile (e.g. when it is deleted)"""
+        self._compiled.pop(profile_id, None)
+
+    async def get(self, db: AsyncSession, profile_id: int) -> Optional[CompiledProfile]:
+        """Load and compile a profile by ID (None if it doesn't exist)"""
+        result = await db.execute(select(QualityProfile).where(QualityProfile.id == profile_id))
+        profile = result.scalar_one_or_none()
+        return self.compile(profile) if profile else None
+
+    async def get_default(self, db: AsyncSession, media_type: str = "ebook") -> Optional[CompiledProfile]:
+        """The default profile for a media type, else its first enabled one (None if there is none)"""
+        result = await db.execute(
+            select(QualityProfile)
+            .where(QualityProfile.media_type == media_type, QualityProfile.enabled == True)
+            .order_by(QualityProfile.is_default.desc(), QualityProfile.id)
+        )
+        profile = result.scalars().first()
+        return self.compile(profile) if profile else None
+
+    async def media_type_for(self, db: AsyncSession, library_id: Optional[int]) -> str:
+        """Profile media type for a book in this library (ebook when unknown)"""
+        if not library_id:
+            return "ebook"
+        result = await db.execute(select(Library.library_type).where(Library.id == library_id))
+        return LIBRARY_MEDIA_TYPES.get(result.scalar_one_or_none(), "ebook")
+
+
+# Singleton instance
+quality_engine = QualityProfileEngine()
@@ -0,0 +1,281 @@
+# File: backend/app/services/release_classifier.py
+"""
+🏷️ Release Classifier
+
+Decides whether an indexer release is a book/audiobook/comic/magazine and
+what kind, in one pass over the title.
+
+Every keyword the search filters care about is compiled once into a single
+trie-shaped regex inside a lookahead, so matches may overlap and each one is
+the longest keyword starting at that position. One `findall` over the
+lowercased title yields the set of keyword groups present (after a quick
+episode-tag check that blocks outright); the verdict is then a few flag
+tests.
+"""
+
+import logging
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Keyword groups (bit flags)
+TV = 1 << 0             # S01E01, Season 1, 1x01
+MOVIE = 1 << 1          # Strict movie/video release tags
+SOFTWARE = 1 << 2       # Game/software release tags
+FORMAT_HINT = 1 << 3    # ".epub", "[pdf]", "(mp3)", " cbz "
+BOOK_KEYWORD = 1 << 4   # "ebook", "novel", "manga", ...
+BOOK_HINT = 1 << 5      # Book indicators that override loose movie tags
+LOOSE_MOVIE = 1 << 6    # Movie/TV tags only blocked without a book indicator
+MAGAZINE_NAME = 1 << 7
+MAGAZINE_WORD = 1 << 8
+
+
+class Classification(NamedTuple):
+    """Verdict for one release"""
+    allowed: bool
+    reason: Optional[str]   # Why it was blocked (None when allowed)
+    media_type: str         # ebook / audiobook / comic / magazine
+
+
+_BLOCKED = {
+    reason: Classification(False, reason, "ebook")
+    for reason in ("tv", "movie", "video_format", "software", "unknown_format")
+}
+
+
+class ReleaseClassifier:
+    """Precompiled single-pass release filter"""
+
+    TV_PATTERNS = (
+        r's\d{2}e\d{2}',           # S01E01
+        r'season\s+\d+',           # Season 1
+        r's\d{2}\s',               # S01
+        r'\d{1,2}x\d{2}',          # 1x01
+    )
+
+    MOVIE_INDICATORS = (
+        'bluray', 'blu-ray', 'webrip', 'web-dl', 'hdtv', 'brrip',
+        '1080p', '720p', '2160p', '4k', 'x264', 'x265', 'hevc',
+        'dvdrip', 'xvid', 'web.dl', 'webdl', 'hdrip', 'cam',
+        'screener', 'ts', 'proper', 'repack', 'remux'
+    )
+
+    SOFTWARE_KEYWORDS = ('repack', 'cracked', 'trainer', 'multi2', 'multi5', 'flt')
+
+    VALID_FORMATS = (
+        # Ebooks
+        'epub', 'mobi', 'azw', 'azw3', 'pdf', 'txt', 'rtf', 'doc', 'docx',
+        # Audiobooks
+        'm4b', 'mp3', 'aac', 'flac', 'ogg', 'opus',
+        # Comics
+        'cbz', 'cbr', 'cb7', 'cbt',
+        # Archives (might contain books/comics)
+        'zip', 'rar', '7z'
+    )
+
+    BOOK_KEYWORDS = (
+        'ebook', 'e-book', 'audiobook', 'comic', 'comics', 'manga',
+        'novel', 'book', 'magazine', 'periodical', 'anthology'
+    )
+
+    # If present, likely not a movie even with a loose movie tag
+    BOOK_INDICATORS = (
+        'epub', 'mobi', 'azw', 'azw3', 'cbz', 'cbr', 'cb7', 'cbt',
+        'm4b', 'audiobook', 'comic', 'manga', 'graphic.novel',
+        'ebook', 'e-book', 'magazine', 'pdf'
+    )
+
+    LOOSE_MOVIE_INDICATORS = (
+        'bluray', 'blu-ray', 'webrip', 'web-dl', 'hdtv', 'brrip',
+        '1080p', '720p', '2160p', '4k', 'x264', 'x265', 'hevc',
+        'dvdrip', 'cam', 'hdrip', 'proper', 'repack', 'remux',
+        'web.dl', 'webdl', 'hdcam', 'screener', 'dvdscr',
+        's01e', 's02e', 's03e', 's04e', 's05e',  # TV series patterns
+        'season', 'complete.series'
+    )
+
+    VIDEO_FORMATS = frozenset((
+        'mp4', 'avi', 'mkv', 'mov', 'wmv', 'flv', 'webm',
+        'm4v', 'mpg', 'mpeg', 'ts', 'vob', '3gp', 'ogv',
+        'divx', 'xvid', 'rm', 'rmvb', 'asf', 'qt'
+    ))
+
+    AUDIOBOOK_FORMATS = frozenset(('m4b', 'mp3', 'aac', 'flac', 'ogg', 'opus'))
+    COMIC_FORMATS = frozenset(('cbz', 'cbr', 'cb7', 'cbt'))
+
+    MAGAZINE_NAMES = (
+        'wired', 'vogue', 'time', 'forbes', 'economist', 'nature',
+        'maxim', 'playboy', 'penthouse', 'gq', 'esquire'
+    )
+    MAGAZINE_WORDS = ('magazine', 'monthly', 'weekly')
+    MAGAZINE_DATE = re.compile(
+        r'\d{4}[-/]\d{2}|\b(january|february|march|april|may|june|july|august|'
+        r'september|october|november|december)\s+\d{4}\b'
+    )
+
+    def __init__(self):
+        self._valid_formats = frozenset(self.VALID_FORMATS)
+        self._keywords = self._build_keywords()
+
+        self._tv = re.compile('|'.join(self.TV_PATTERNS))
+        # The trie reports the longest keyword at each position; any shorter
+        # keyword matching there is its prefix, whose flags are folded in
+        self._pattern = re.compile(r'(?=(' + self._trie_pattern(self._keywords) + r'))')
+
+    def _build_keywords(self) -> Dict[str, int]:
+        """Map every keyword to the groups it (and any keyword prefixing it) belongs to"""
+        groups = (
+            (self.MOVIE_INDICATORS, MOVIE),
+            (self.SOFTWARE_KEYWORDS, SOFTWARE),
+            (tuple(
+                pattern.format(fmt)
+                for fmt in self.VALID_FORMATS
+                for pattern in ('.{}', '[{}]', '({})', ' {} ')
+            ), FORMAT_HINT),
+            (self.BOOK_KEYWORDS, BOOK_KEYWORD),
+            (self.BOOK_INDICATORS, BOOK_HINT),
+            (self.LOOSE_MOVIE_INDICATORS, LOOSE_MOVIE),
+            (self.MAGAZINE_NAMES, MAGAZINE_NAME),
+            (self.MAGAZINE_WORDS, MAGAZINE_WORD),
+        )
+
+        flags: Dict[str, int] = {}
+        for keywords, flag in groups:
+            for keyword in keywords:
+                flags[keyword] = flags.get(keyword, 0) | flag
+
+        return {
+            keyword: flag | self._prefix_flags(keyword, flags)
+            for keyword, flag in flags.items()
+        }
+
+    @staticmethod
+    def _prefix_flags(keyword: str, flags: Dict[str, int]) -> int:
+        combined = 0
+        for end in range(1, len(keyword)):
+            combined |= flags.get(keyword[:end], 0)
+        return combined
+
+    @staticmethod
+    def _trie_pattern(words: Iterable[str]) -> str:
+        """
+        Regex alternation factored by common prefixes
+
+        The engine tries alternatives one by one, so sharing prefixes makes
+        a miss at a position cost a handful of character tests instead of
+        one per keyword. Optional tails are greedy, so the longest keyword
+        wins.
+        """
+        trie: Dict[str, Dict] = {}
+        for word in words:
+            node = trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node[''] = {}
+
+        def build(node: Dict[str, Dict]) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ''
+            body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+            return '(?:' + body + ')?' if '' in node else body
+
+        return build(trie)
+
+    def scan(self, title_lower: str) -> int:
+        """Return the OR of all keyword groups present in a lowercased title"""
+        if self._tv.search(title_lower):
+            return TV
+        return self._scan_keywords(title_lower)
+
+    def _scan_keywords(self, title_lower: str) -> int:
+        found = 0
+        keywords = self._keywords
+        for keyword in self._pattern.findall(title_lower):
+            found |= keywords[keyword]
+        return found
+
+    def classify(self, title: str, file_format: Optional[str] = None) -> Classification:
+        """
+        Classify one release
+
+        Blocks TV episodes, movies, video files and software; allows only
+        releases with a known book/audio/comic format or a book keyword.
+        """
+        title_lower = title.lower()
+        fmt = file_format.lower() if file_format else None
+        found = self.scan(title_lower)
+
+        if found & TV:
+            return _BLOCKED["tv"]
+        if found & MOVIE:
+            return _BLOCKED["movie"]
+        if fmt in self.VIDEO_FORMATS:
+            return _BLOCKED["video_format"]
+        if found & SOFTWARE:
+            return _BLOCKED["software"]
+        if fmt not in self._valid_formats and not found & (FORMAT_HINT | BOOK_KEYWORD):
+            return _BLOCKED["unknown_format"]
+        if found & LOOSE_MOVIE and not found & BOOK_HINT:
+            return _BLOCKED["movie"]
+
+        return Classification(True, None, self._media_type(fmt, title_lower, found))
+
+    def _media_type(self, fmt: Optional[str], title_lower: str, found: int) -> str:
+        if not fmt:
+            return "ebook"
+        if fmt in self.AUDIOBOOK_FORMATS:
+            return "audiobook"
+        if fmt in self.COMIC_FORMATS:
+            return "comic"
+        if fmt == 'pdf':
+            # Magazine: a known title, or a date together with "magazine"/"monthly"/...
+            if found & MAGAZINE_NAME or (
+                found & MAGAZINE_WORD and self.MAGAZINE_DATE.search(title_lower)
+            ):
+                return "magazine"
+        return "ebook"
+
+    def media_type(self, title: str, file_format: Optional[str] = None) -> str:
+        """Media type only: ebook, audiobook, comic or magazine"""
+        fmt = file_format.lower() if file_format else None
+        if fmt != 'pdf':
+            return self._media_type(fmt, "", 0)
+        title_lower = title.lower()
+        return self._media_type(fmt, title_lower, self._scan_keywords(title_lower))
+
+    def classify_batch(self, releases: Iterable[Tuple[str, Optional[str]]]) -> List[Classification]:
+        """Classify (title, file_format) pairs"""
+        classify = self.classify
+        return [classify(title, file_format) for title, file_format in releases]
+
+    def filter(self, results: List) -> List:
+        """
+        Keep allowed SearchResults, recording each one's media type
+
+        Logs how many were dropped and why.
+        """
+        kept = []
+        blocked: Counter = Counter()
+        classify = self.classify
+
+        for result in results:
+            verdict = classify(result.title, result.file_format)
+            if verdict.allowed:
+                result.media_type = verdict.media_type
+                kept.append(result)
+            else:
+                blocked[verdict.reason] += 1
+
+        if blocked:
+            reasons = ", ".join(f"{reason}={count}" for reason, count in blocked.most_common())
+            logger.info(f"🗑️ Filtered {sum(blocked.values())} of {len(results)} results ({reasons})")
+
+        return kept
+
+
+# Singleton instance
+release_classifier = ReleaseClassifier()
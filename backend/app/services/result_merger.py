@@ -0,0 +1,161 @@
+# File: backend/app/services/result_merger.py
+"""
+🔗 Search Result Merger
+
+The same release often comes back from several indexers. Duplicates are
+collapsed into one result that lists every source, keeping the best seeders
+and download link.
+
+Two results are the same release when:
+- their torrent infohashes match, or
+- (without a hash) their normalized titles match and their sizes are within
+  SIZE_TOLERANCE of each other - indexers round sizes differently.
+
+Both checks are hash lookups, so merging is linear in the number of results.
+"""
+
+import base64
+import logging
+import math
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_BTIH_RE = re.compile(r'xt=urn:btih:([0-9a-z]+)', re.IGNORECASE)
+_WORD_RE = re.compile(r'[^\W_]+')
+
+
+def parse_infohash(*candidates: Optional[str]) -> Optional[str]:
+    """
+    Return the first valid BitTorrent v1 infohash as 40 lowercase hex chars
+
+    Accepts bare hashes (hex or base32) and magnet URIs.
+    """
+    for candidate in candidates:
+        if not candidate:
+            continue
+        match = _BTIH_RE.search(candidate)
+        value = match.group(1) if match else candidate.strip()
+
+        if len(value) == 40:
+            try:
+                int(value, 16)
+                return value.lower()
+            except ValueError:
+                continue
+        if len(value) == 32:
+            try:
+                return base64.b32decode(value.upper()).hex()
+            except ValueError:
+                continue
+    return None
+
+
+class ResultMerger:
+    """Collapses duplicate SearchResults across indexers"""
+
+    # Sizes within 1% count as the same release
+    SIZE_TOLERANCE = 0.01
+
+    def __init__(self):
+        self._log_base = math.log1p(self.SIZE_TOLERANCE)
+
+    @staticmethod
+    def normalize_title(title: str) -> str:
+        """Case-fold and reduce to alphanumeric words ("The.Hobbit-[EPUB]" -> "the hobbit epub")"""
+        return " ".join(_WORD_RE.findall(title.casefold()))
+
+    def _size_bucket(self, size: int) -> int:
+        """Log-scale bucket; sizes within the tolerance land in the same or an adjacent bucket"""
+        return int(math.log(size) / self._log_base) if size > 0 else -1
+
+    def _sizes_match(self, a: int, b: int) -> bool:
+        if a <= 0 or b <= 0:
+            return a == b
+        return abs(a - b) <= self.SIZE_TOLERANCE * max(a, b)
+
+    def merge(self, results: List) -> List:
+        """
+        Collapse duplicates, keeping first-seen order
+
+        The merged result takes the title, link and metadata of its
+        best-seeded copy (magnet links win ties), the highest seeder count,
+        and lists every copy in `sources`.
+        """
+        if len(results) < 2:
+            return results
+
+        merged: List = []
+        by_hash: Dict[str, int] = {}
+        by_title: Dict[Tuple[str, int], List[int]] = {}
+        # (indexer_id, download_url) of every source already in each merged result
+        seen_sources: Dict[int, Set[Tuple]] = {}
+
+        for result in results:
+            index = None
+
+            if result.infohash:
+                index = by_hash.get(result.infohash)
+
+            title_key = self.normalize_title(result.title)
+            bucket = self._size_bucket(result.size_bytes)
+            if index is None:
+                for neighbour in (bucket, bucket - 1, bucket + 1):
+                    for candidate in by_title.get((title_key, neighbour), ()):
+                        existing = merged[candidate]
+                        if (
+                            self._sizes_match(existing.size_bytes, result.size_bytes)
+                            # Different known hashes are different releases
+                            and not (existing.infohash and result.infohash
+                                     and existing.infohash != result.infohash)
+                        ):
+                            index = candidate
+                            break
+                    if index is not None:
+                        break
+
+            if index is None:
+                index = len(merged)
+                merged.append(result)
+                by_title.setdefault((title_key, bucket), []).append(index)
+            else:
+                seen = seen_sources.get(index)
+                if seen is None:
+                    seen = seen_sources[index] = {self._source_key(s) for s in merged[index].get_sources()}
+                merged[index] = self._combine(merged[index], result, seen)
+
+            if result.infohash:
+                by_hash.setdefault(result.infohash, index)
+
+        duplicates = len(results) - len(merged)
+        if duplicates:
+            logger.info(f"🔗 Merged {duplicates} duplicate results ({len(results)} → {len(merged)})")
+
+        return merged
+
+    @staticmethod
+    def _source_key(source: Dict) -> Tuple:
+        return source["indexer_id"], source["download_url"]
+
+    def _combine(self, kept, other, seen: Set[Tuple]):
+        """Fold `other` into `kept`, returning whichever copy should represent both"""
+        sources = kept.get_sources()
+        for source in other.get_sources():
+            key = self._source_key(source)
+            if key not in seen:
+                seen.add(key)
+                sources.append(source)
+
+        def rank(result):
+            return (result.seeders or 0, result.download_url.startswith("magnet:"))
+
+        best = other if rank(other) > rank(kept) else kept
+        best.sources = sources
+        best.infohash = best.infohash or kept.infohash or other.infohash
+        best.seeders = max(kept.seeders or 0, other.seeders or 0)
+        return best
+
+
+# Singleton instance
+result_merger = ResultMerger()
@@ -0,0 +1,332 @@
+# File: backend/app/services/rss_monitor.py
+"""
+📡 RSS Monitor
+
+Finds releases for wanted books without searching for each one.
+
+Once per RSS_SYNC_INTERVAL minutes the latest book releases are pulled from
+every enabled Prowlarr/Jackett app (an empty-query search, which both serve
+from the indexers' RSS feeds) and matched locally against an in-memory
+token index of all monitored books still waiting for a download. Matches
+are ranked by the book's quality profile and either grabbed (RSS_AUTO_GRAB)
+or reported in the monitor status.
+
+Each release is looked up by a single "anchor" token per wanted book - the
+book's rarest title word - so matching costs a few dict lookups per release
+no matter how long the wanted list is. Releases already handled in an
+earlier run are skipped; a release whose grab failed stays unseen, so the
+next run tries it again.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from backend.app.config import settings
+from backend.app.db.database import AsyncSessionLocal
+from backend.app.db.models.book import Book
+from backend.app.services.download_manager import download_manager
+from backend.app.services.quality_profiles import quality_engine
+from backend.app.services.result_merger import result_merger
+from backend.app.services.search_service import SearchResult, search_service
+
+logger = logging.getLogger(__name__)
+
+# Words too common to identify a title
+STOPWORDS = frozenset(("the", "a", "an", "of", "and", "in", "on", "to", "for", "by"))
+
+
+def tokenize(text: Optional[str]) -> FrozenSet[str]:
+    """Case-folded alphanumeric words"""
+    if not text:
+        return frozenset()
+    return frozenset(result_merger.normalize_title(text).split())
+
+
+class WantedBook(NamedTuple):
+    id: int
+    title: str
+    library_id: Optional[int]
+    title_tokens: FrozenSet[str]     # Every one must appear in the release
+    author_token: Optional[str]      # Author's last name, if known
+
+
+class WantedIndex:
+    """Token index of wanted books for matching release titles"""
+
+    def __init__(self, books: Iterable[Tuple[int, str, Optional[str], Optional[int]]]):
+        self.books: List[WantedBook] = []
+        for book_id, title, author_name, library_id in books:
+            tokens = tokenize(title)
+            significant = tokens - STOPWORDS or tokens
+            if not significant:
+                continue
+            author_words = result_merger.normalize_title(author_name or "").split()
+            self.books.append(WantedBook(
+                book_id, title, library_id, significant,
+                author_words[-1] if author_words else None
+            ))
+
+        # Anchor each book on its rarest title token (longest on ties)
+        frequency: Dict[str, int] = {}
+        for book in self.books:
+            for token in book.title_tokens:
+                frequency[token] = frequency.get(token, 0) + 1
+
+        self._by_anchor: Dict[str, List[WantedBook]] = {}
+        for book in self.books:
+            anchor = min(book.title_tokens, key=lambda token: (frequency[token], -len(token), token))
+            self._by_anchor.setdefault(anchor, []).append(book)
+
+    def __len__(self) -> int:
+        return len(self.books)
+
+    def match(self, release_tokens: FrozenSet[str]) -> List[WantedBook]:
+        """Wanted books whose title words (and author's last name) all appear in a release"""
+        matches = []
+        by_anchor = self._by_anchor
+        for token in release_tokens:
+            for book in by_anchor.get(token, ()):
+                if book.title_tokens <= release_tokens and (
+                    book.author_token is None or book.author_token in release_tokens
+                ):
+                    matches.append(book)
+        return matches
+
+
+class RssMonitor:
+    """Background job matching indexer RSS feeds against wanted books"""
+
+    # Newznab categories: Books, Audio/Audiobook
+    CATEGORIES = ["7000", "3030"]
+    SEEN_LIMIT = 10000
+    # Book statuses still waiting for a download
+    WANTED_STATUSES = ("wanted", "monitoring")
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._index: Optional[WantedIndex] = None
+        self._index_version: Optional[Tuple] = None
+        # Release keys already processed, oldest first
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self.recent_matches: Deque[Dict[str, Any]] = deque(maxlen=100)
+        self.last_run: Optional[Dict[str, Any]] = None
+        self.stats = {"runs": 0, "releases": 0, "new_releases": 0, "matches": 0, "grabbed": 0, "errors": 0}
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the periodic job (no-op when RSS_SYNC_INTERVAL is 0)"""
+        if settings.rss_sync_interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"📡 RSS monitor started (every {settings.rss_sync_interval:g} min)")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"RSS sync failed: {e}", exc_info=True)
+            await asyncio.sleep(settings.rss_sync_interval * 60)
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    async def _load_index(self, db) -> WantedIndex:
+        """Wanted-book index, rebuilt only when the wanted list changed"""
+        wanted = (Book.monitored == True, Book.status.in_(self.WANTED_STATUSES))
+        version = tuple((await db.execute(
+            select(func.count(Book.id), func.max(Book.updated_at)).where(*wanted)
+        )).one())
+
+        if self._index is None or version != self._index_version:
+            rows = (await db.execute(
+                select(Book.id, Book.title, Book.author_name, Book.library_id).where(*wanted)
+            )).all()
+            self._index = WantedIndex(rows)
+            self._index_version = version
+            logger.info(f"📡 Indexed {len(self._index)} wanted books")
+        return self._index
+
+    @staticmethod
+    def _seen_key(result: SearchResult) -> str:
+        return result.infohash or result.download_url
+
+    def _mark_seen(self, result: SearchResult):
+        self._seen[self._seen_key(result)] = None
+        if len(self._seen) > self.SEEN_LIMIT:
+            self._seen.popitem(last=False)
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Pull the feeds once, match new releases and grab/report the best per book"""
+        async with self._lock:
+            started = time.monotonic()
+            self.stats["runs"] += 1
+
+            async with AsyncSessionLocal() as db:
+                index = await self._load_index(db)
+                sources = await search_service.load_sources(db) if len(index) else []
+
+            summary = {
+                "started_at": datetime.utcnow().isoformat(),
+                "wanted": len(index),
+                "releases": 0,
+                "new_releases": 0,
+                "matches": 0,
+                "grabbed": 0,
+                "errors": 0,
+                "sources": []
+            }
+            if not sources:
+                # Nothing wanted (or no apps) - don't touch the indexers
+                summary["elapsed_ms"] = round((time.monotonic() - started) * 1000)
+                self.last_run = summary
+                return summary
+
+            raw_results: List[SearchResult] = []
+            async for results, source in search_service.stream_sources(
+                sources, "", categories=self.CATEGORIES, limit=settings.rss_feed_limit
+            ):
+                raw_results.extend(results)
+                summary["sources"].append(source)
+            releases = search_service.filter_and_sort(raw_results)
+            new_releases: Dict[str, SearchResult] = {}
+            for release in releases:
+                key = self._seen_key(release)
+                if key not in self._seen:
+                    new_releases.setdefault(key, release)
+            new_releases = list(new_releases.values())
+
+            candidates: Dict[int, Tuple[WantedBook, List[SearchResult]]] = {}
+            unhandled = set()
+            for release in new_releases:
+                for book in index.match(tokenize(release.title)):
+                    candidates.setdefault(book.id, (book, []))[1].append(release)
+
+            # Concurrently, so auto-grabs reach the download client as one batch
+            outcomes = await asyncio.gather(*(
+                self._handle_match(book, book_releases) for book, book_releases in candidates.values()
+            ), return_exceptions=True)
+
+            for (book, book_releases), outcome in zip(candidates.values(), outcomes):
+                if isinstance(outcome, Exception):
+                    logger.error(f"📡 RSS match for wanted book '{book.title}' failed: {outcome}")
+                    summary["errors"] += 1
+                elif outcome is None or not outcome["error"]:
+                    continue
+                # Not handled (error or failed grab) - try these releases again next run
+                unhandled.update(self._seen_key(release) for release in book_releases)
+
+            for release in new_releases:
+                if self._seen_key(release) not in unhandled:
+                    self._mark_seen(release)
+            summary["grabbed"] = sum(
+                1 for outcome in outcomes if isinstance(outcome, dict) and outcome["grabbed"]
+            )
+
+            summary.update(
+                releases=len(releases),
+                new_releases=len(new_releases),
+                matches=len(candidates),
+                elapsed_ms=round((time.monotonic() - started) * 1000)
+            )
+            for key in ("releases", "new_releases", "matches", "grabbed", "errors"):
+                self.stats[key] += summary[key]
+            self.last_run = summary
+
+            logger.info(
+                f"📡 RSS sync: {len(new_releases)} new of {len(releases)} releases, "
+                f"{len(candidates)} wanted books matched, {summary['grabbed']} grabbed"
+            )
+            return summary
+
+    async def _handle_match(self, book: WantedBook, releases: List[SearchResult]) -> Optional[Dict[str, Any]]:
+        """
+        Pick the best release by the book's quality profile, then grab or report it
+
+        Returns the match (None if no release fits the profile); a failed grab
+        has `error` set.
+        """
+        async with AsyncSessionLocal() as db:
+            media_type = await quality_engine.media_type_for(db, book.library_id)
+            profile = await quality_engine.get_default(db, media_type)
+            ranked = profile.rank(releases) if profile else releases
+            if not ranked:
+                return None
+
+            best = ranked[0]
+            match = {
+                "book_id": book.id,
+                "book_title": book.title,
+                "release": {
+                    "title": best.title,
+                    "indexer_name": best.indexer_name,
+                    "seeders": best.seeders,
+                    "size_mb": best.size_mb,
+                    "download_url": best.download_url
+                },
+                "candidates": len(ranked),
+                "quality_profile": profile.name if profile else None,
+                "grabbed": False,
+                "error": None,
+                "matched_at": datetime.utcnow().isoformat()
+            }
+
+            if settings.rss_auto_grab:
+                result = await download_manager.send_to_client(
+                    db=db,
+                    download_url=best.download_url,
+                    book_title=book.title,
+                    media_type=media_type,
+                    file_format=best.file_format,
+                    book_id=book.id,
+                    infohash=best.infohash
+                )
+                if result.get("success"):
+                    await download_manager.update_book_status(db=db, book_id=book.id, status="downloading")
+                    match["grabbed"] = True
+                else:
+                    match["error"] = result.get("error", "Download failed")
+
+        self.recent_matches.appendleft(match)
+        if match["grabbed"]:
+            logger.info(f"📡 RSS grabbed '{best.title}' for wanted book '{book.title}'")
+        else:
+            logger.info(f"📡 RSS match for wanted book '{book.title}': '{best.title}'")
+        return match
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.rss_sync_interval > 0,
+            "running": self._task is not None,
+            "interval_minutes": settings.rss_sync_interval,
+            "auto_grab": settings.rss_auto_grab,
+            "wanted": len(self._index) if self._index is not None else None,
+            "stats": dict(self.stats),
+            "last_run": self.last_run,
+            "recent_matches": list(self.recent_matches)
+        }
+
+
+# Singleton instance
+rss_monitor = RssMonitor()
@@ -0,0 +1,241 @@
+# File: backend/app/services/search_cache.py
+"""
+Search Result Cache
+Size-bounded LRU with TTL and stale-while-revalidate for indexer searches
+"""
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from backend.app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# A fetch returns (value, cacheable) - e.g. partial searches are not cached
+Fetcher = Callable[[], Awaitable[Tuple[Any, bool]]]
+
+_WORD_RE = re.compile(r"\w+")
+
+
+class SearchCache:
+    """
+    LRU cache for search results
+
+    - Fresh entries (younger than `ttl`) are returned directly
+    - Stale entries (up to `ttl + stale_ttl`) are returned immediately while
+      a background task refreshes them
+    - Concurrent misses for the same key share one fetch, run in a task
+      owned by the cache: a caller that is cancelled (e.g. a client that
+      disconnected) stops waiting without cancelling the fetch for the
+      others; the fetch is only cancelled when its last caller leaves
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: float = 300.0,
+        stale_ttl: float = 900.0
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self._refreshing: Set[Hashable] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "bypassed": 0,
+            "evictions": 0,
+            "refreshes": 0,
+            "refresh_errors": 0
+        }
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Case-fold and strip punctuation/extra whitespace"""
+        return " ".join(_WORD_RE.findall(query.casefold()))
+
+    @classmethod
+    def make_key(cls, query: str, *parts: Any) -> Tuple:
+        """
+        Build a cache key from the normalized query and other parameters
+
+        Lists/sets are sorted so ordering differences don't cause misses.
+        """
+        normalized = []
+        for part in parts:
+            if isinstance(part, (list, tuple, set, frozenset)):
+                part = tuple(sorted(str(p) for p in part))
+            normalized.append(part)
+        return (cls.normalize_query(query), *normalized)
+
+    def lookup(self, key: Hashable) -> Tuple[Optional[Any], Optional[str]]:
+        """
+        Return (value, "fresh" | "stale") or (None, None) on a miss
+
+        Entries past the stale window are dropped.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, None
+
+        stored_at, value = entry
+        age = time.monotonic() - stored_at
+
+        if age < self.ttl:
+            self._entries.move_to_end(key)
+            return value, "fresh"
+        if age < self.ttl + self.stale_ttl:
+            self._entries.move_to_end(key)
+            return value, "stale"
+
+        del self._entries[key]
+        return None, None
+
+    def store(self, key: Hashable, value: Any):
+        """Insert or replace an entry, evicting the least recently used"""
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def get(self, key: Hashable, refresh: Optional[Fetcher] = None) -> Tuple[Optional[Any], Optional[str]]:
+        """
+        Return (value, "hit" | "stale") for a cached key, or (None, None)
+
+        A stale hit starts a background `refresh` when one is given.
+        Misses are not counted here - see `get_or_fetch` / `record`.
+        """
+        value, freshness = self.lookup(key)
+
+        if freshness == "fresh":
+            self.stats["hits"] += 1
+            return value, "hit"
+
+        if freshness == "stale":
+            self.stats["stale_hits"] += 1
+            if refresh:
+                self._schedule_refresh(key, refresh)
+            return value, "stale"
+
+        return None, None
+
+    async def get_or_fetch(self, key: Hashable, fetch: Fetcher, refresh: Optional[Fetcher] = None) -> Tuple[Any, str]:
+        """
+        Return (value, cache_state) for a key, fetching on a miss
+
+        cache_state is "hit", "stale" (background refresh started),
+        "coalesced" (joined an in-flight fetch) or "miss". The background
+        refresh uses `refresh` when given (it outlives the caller, so it
+        mustn't use anything the caller owns), otherwise `fetch`.
+        """
+        value, state = self.get(key, refresh=refresh or fetch)
+        if state:
+            return value, state
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            return await self._wait(inflight), "coalesced"
+
+        self.stats["misses"] += 1
+        return await self._fetch(key, fetch), "miss"
+
+    async def _fetch(self, key: Hashable, fetch: Fetcher) -> Any:
+        """Start a fetch in a cache-owned task and wait for it"""
+
+        async def run() -> Any:
+            try:
+                value, cacheable = await fetch()
+                if cacheable:
+                    self.store(key, value)
+                return value
+            finally:
+                if self._inflight.get(key) is task:
+                    del self._inflight[key]
+
+        task = asyncio.create_task(run())
+        # Avoid "exception was never retrieved" when every caller left
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight[key] = task
+        return await self._wait(task)
+
+    async def _wait(self, task: asyncio.Task) -> Any:
+        """Wait for a shared fetch; cancel it only if this was its last caller"""
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            waiters = self._waiters[task] - 1
+            if waiters:
+                self._waiters[task] = waiters
+            else:
+                del self._waiters[task]
+
+    def _schedule_refresh(self, key: Hashable, fetch: Fetcher):
+        """Refresh a stale entry in the background (once per key)"""
+        if key in self._refreshing or key in self._inflight:
+            return
+
+        async def refresh():
+            try:
+                await self._fetch(key, fetch)
+                self.stats["refreshes"] += 1
+            except Exception as e:
+                self.stats["refresh_errors"] += 1
+                logger.warning(f"♻️ Background search refresh failed: {e}")
+            finally:
+                self._refreshing.discard(key)
+
+        self._refreshing.add(key)
+        task = asyncio.create_task(refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def record(self, stat: str):
+        """Count an event that happened outside get/get_or_fetch (e.g. "bypassed")"""
+        self.stats[stat] += 1
+
+    def clear(self) -> int:
+        """Drop all entries; returns how many were removed"""
+        count = len(self._entries)
+        self._entries.clear()
+        return count
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters plus derived hit rate (stale and coalesced count as hits)"""
+        served = self.stats["hits"] + self.stats["stale_hits"] + self.stats["coalesced"]
+        lookups = served + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "stale_ttl_seconds": self.stale_ttl,
+            "hit_rate": round(served / lookups, 4) if lookups else 0.0
+        }
+
+
+# Singleton instance
+search_cache = SearchCache(
+    max_entries=settings.search_cache_size,
+    ttl=settings.search_cache_ttl,
+    stale_ttl=settings.search_cache_stale_ttl
+)
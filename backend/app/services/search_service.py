@@ -4,22 +4,46 @@ Search Service - STRICT FILTERING VERSION
 Only allows known book/audiobook/comic file formats
 Blocks TV shows, movies, games, software, etc.
 """
+import asyncio
 import httpx
 import logging
-import re
-from typing import List, Dict, Any, Optional
+import time
+from contextlib import nullcontext
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from datetime import datetime
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.app.config import settings
 from backend.app.db.models.app import App
 from backend.app.db.models.indexer import Indexer
+from backend.app.services.indexer_catalog import indexer_catalog
+from backend.app.services.indexer_health import indexer_health
+from backend.app.services.indexer_limiter import indexer_limiter
+from backend.app.services.jackett_session import jackett_sessions
+from backend.app.services.release_classifier import release_classifier
+from backend.app.services.result_merger import parse_infohash, result_merger
+from backend.app.services.search_cache import search_cache
 
 logger = logging.getLogger(__name__)
 
+# Cancellations this close to a deadline (timer granularity) count as hitting it
+DEADLINE_SLACK = 0.05
+
 
 class SearchResult:
-    """Standardized search result from any indexer"""
+    """
+    Standardized search result from any indexer
+    
+    Slotted (no per-instance __dict__) since a search builds thousands of
+    these; derived fields (size_mb, media_type, sources) are computed on
+    first use.
+    """
+    
+    __slots__ = (
+        "title", "download_url", "indexer_id", "indexer_name", "size_bytes",
+        "seeders", "protocol", "publish_date", "info_url", "categories",
+        "file_format", "infohash", "media_type", "sources"
+    )
     
     def __init__(
         self,
@@ -33,131 +57,57 @@ class SearchResult:
         publish_date: Optional[datetime] = None,
         info_url: Optional[str] = None,
         categories: Optional[List[str]] = None,
-        file_format: Optional[str] = None
+        file_format: Optional[str] = None,
+        infohash: Optional[str] = None
     ):
         self.title = title
         self.download_url = download_url
         self.indexer_id = indexer_id
         self.indexer_name = indexer_name
         self.size_bytes = size_bytes
-        self.size_mb = round(size_bytes / 1024 / 1024, 2)
         self.seeders = seeders
         self.protocol = protocol
         self.publish_date = publish_date
         self.info_url = info_url
-        self.categories = categories or []
+        self.categories = categories
         self.file_format = file_format
+        self.infohash = infohash
+        # Set by the release classifier when the result is filtered
+        self.media_type: Optional[str] = None
+        # Set when duplicates from other indexers are merged into this result
+        self.sources: Optional[List[Dict[str, Any]]] = None
+    
+    @property
+    def size_mb(self) -> float:
+        return round(self.size_bytes / 1048576, 2)
     
     def get_media_type(self) -> str:
         """
         Detect media type from file format
         Returns: 'ebook', 'audiobook', 'comic', or 'magazine'
         """
-        if not self.file_format:
-            return "ebook"
-        
-        fmt = self.file_format.lower()
-        
-        # Audiobook formats
-        if fmt in ['m4b', 'mp3', 'aac', 'flac', 'ogg', 'opus']:
-            return "audiobook"
-        
-        # Comic formats
-        if fmt in ['cbz', 'cbr', 'cb7', 'cbt']:
-            return "comic"
-        
-        # Magazine detection (PDF only)
-        if fmt == 'pdf':
-            title_lower = self.title.lower()
-            
-            magazine_names = [
-                'wired', 'vogue', 'time', 'forbes', 'economist', 'nature',
-                'maxim', 'playboy', 'penthouse', 'gq', 'esquire'
-            ]
-            
-            has_magazine_name = any(mag in title_lower for mag in magazine_names)
-            has_date_pattern = bool(re.search(r'\d{4}[-/]\d{2}|\b(january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{4}\b', title_lower))
-            has_magazine_keyword = any(word in title_lower for word in ['magazine', 'monthly', 'weekly'])
-            
-            if has_magazine_name or (has_date_pattern and has_magazine_keyword):
-                return "magazine"
-        
-        return "ebook"
+        if self.media_type is None:
+            self.media_type = release_classifier.media_type(self.title, self.file_format)
+        return self.media_type
     
     def is_valid_media_file(self) -> bool:
         """
         STRICT filtering - only allow known book/audiobook/comic formats
         Blocks TV shows, movies, anime, games, software, etc.
         """
-        title_lower = self.title.lower()
-        
-        # BLOCK 1: TV Show patterns (S01E01, S02E03, Season 1, etc.)
-        tv_patterns = [
-            r's\d{2}e\d{2}',           # S01E01
-            r'season\s+\d+',           # Season 1
-            r's\d{2}\s',               # S01 
-            r'\d{1,2}x\d{2}',          # 1x01
-        ]
-        if any(re.search(pattern, title_lower) for pattern in tv_patterns):
-            return False
-        
-        # BLOCK 2: Movie/Video indicators
-        movie_indicators = [
-            'bluray', 'blu-ray', 'webrip', 'web-dl', 'hdtv', 'brrip',
-            '1080p', '720p', '2160p', '4k', 'x264', 'x265', 'hevc',
-            'dvdrip', 'xvid', 'web.dl', 'webdl', 'hdrip', 'cam', 
-            'screener', 'ts', 'proper', 'repack', 'remux'
-        ]
-        if any(ind in title_lower for ind in movie_indicators):
-            return False
-        
-        # BLOCK 3: Video file extensions
-        if self.file_format:
-            fmt = self.file_format.lower()
-            video_formats = [
-                'mp4', 'avi', 'mkv', 'mov', 'wmv', 'flv', 'webm', 
-                'm4v', 'mpg', 'mpeg', 'ts', 'vob', '3gp', 'ogv'
-            ]
-            if fmt in video_formats:
-                return False
-        
-        # BLOCK 4: Game/Software indicators
-        software_keywords = ['repack', 'cracked', 'trainer', 'multi2', 'multi5', 'flt']
-        if any(kw in title_lower for kw in software_keywords):
-            return False
-        
-        # ALLOW: Valid book/comic/audiobook formats
-        valid_formats = [
-            # Ebooks
-            'epub', 'mobi', 'azw', 'azw3', 'pdf', 'txt', 'rtf', 'doc', 'docx',
-            # Audiobooks
-            'm4b', 'mp3', 'aac', 'flac', 'ogg', 'opus',
-            # Comics
-            'cbz', 'cbr', 'cb7', 'cbt',
-            # Archives (might contain books/comics)
-            'zip', 'rar', '7z'
-        ]
-        
-        # Check file format
-        if self.file_format and self.file_format.lower() in valid_formats:
-            return True
-        
-        # Check title for format keywords
-        for fmt in valid_formats:
-            patterns = [f'.{fmt}', f'[{fmt}]', f'({fmt})', f' {fmt} ']
-            if any(pattern in title_lower for pattern in patterns):
-                return True
-        
-        # Check for explicit book keywords
-        book_keywords = [
-            'ebook', 'e-book', 'audiobook', 'comic', 'comics', 'manga',
-            'novel', 'book', 'magazine', 'periodical', 'anthology'
-        ]
-        if any(kw in title_lower for kw in book_keywords):
-            return True
-        
-        # Default: Block everything else
-        return False
+        return release_classifier.classify(self.title, self.file_format).allowed
+    
+    def get_sources(self) -> List[Dict[str, Any]]:
+        """Every indexer copy of this release (just this one unless merged)"""
+        if self.sources is None:
+            return [{
+                "indexer_id": self.indexer_id,
+                "indexer_name": self.indexer_name,
+                "seeders": self.seeders,
+                "download_url": self.download_url,
+                "info_url": self.info_url
+            }]
+        return self.sources
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for API response"""
@@ -167,14 +117,16 @@ class SearchResult:
             "indexer_id": self.indexer_id,
             "indexer_name": self.indexer_name,
             "size_bytes": self.size_bytes,
-            "size_mb": self.size_mb,
+            "size_mb": round(self.size_bytes / 1048576, 2),
             "seeders": self.seeders,
             "protocol": self.protocol,
             "publish_date": self.publish_date.isoformat() if self.publish_date else None,
             "info_url": self.info_url,
-            "categories": self.categories,
+            "categories": self.categories or [],
             "file_format": self.file_format,
-            "media_type": self.get_media_type()
+            "media_type": self.get_media_type(),
+            "infohash": self.infohash,
+            "sources": self.get_sources()
         }
 
 
@@ -182,7 +134,11 @@ class SearchService:
     """Service for searching books across indexers"""
     
     def __init__(self):
+        # Per-app deadline (each backend gets this long on its own)
         self.timeout = 60.0
+        # Search deadline - each source gets this long once its request is
+        # sent (time queued in the indexer limiter doesn't count)
+        self.deadline = 45.0
     
     async def search(
         self,
@@ -193,230 +149,717 @@ class SearchService:
         limit: int = 100
     ) -> List[SearchResult]:
         """Search for books across all enabled indexers"""
-        apps_query = select(App).where(App.enabled == True)
-        result = await db.execute(apps_query)
-        apps = result.scalars().all()
+        results, _, _ = await self.search_with_status(
+            db=db,
+            query=query,
+            indexer_ids=indexer_ids,
+            categories=categories,
+            limit=limit
+        )
+        return results
+    
+    async def search_with_status(
+        self,
+        db: AsyncSession,
+        query: str,
+        indexer_ids: Optional[List[int]] = None,
+        categories: Optional[List[str]] = None,
+        limit: int = 100,
+        deadline: Optional[float] = None,
+        use_cache: bool = True
+    ) -> Tuple[List[SearchResult], List[Dict[str, Any]], str]:
+        """
+        Search all enabled apps concurrently
         
-        if not apps:
-            logger.warning("No enabled apps found")
-            return []
+        Each app runs with its own `timeout`, capped at `deadline` seconds
+        from when its request is sent; apps that miss it are reported as
+        timeouts and the results that arrived in time are returned.
+        Results are served from the search cache unless `use_cache` is False
+        (fresh results are still stored).
         
-        logger.info(f"🔍 Searching via {len(apps)} apps for: '{query}'")
+        Returns:
+            (filtered and sorted results, per-source status list, cache state)
+            Each status has app_id, app_name, app_type, status
+            (ok/partial/timeout/error), latency_ms, results and error;
+            Jackett sources also list per-tracker `indexers` statuses.
+            Cache state is hit, stale, coalesced, miss or bypass.
+        """
+        sources = await self.load_sources(db)
+        return await self.search_sources(
+            sources, query, categories, limit, indexer_ids, deadline, use_cache
+        )
+    
+    async def search_sources(
+        self,
+        sources: List[Tuple[App, List[Indexer]]],
+        query: str,
+        categories: Optional[List[str]] = None,
+        limit: int = 100,
+        indexer_ids: Optional[List[int]] = None,
+        deadline: Optional[float] = None,
+        use_cache: bool = True,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> Tuple[List[SearchResult], List[Dict[str, Any]], str]:
+        """
+        `search_with_status` for sources already loaded (no DB session needed)
         
-        all_results = []
+        `client` lets many searches share one connection pool. It is only
+        used while this call runs; a background refresh of a stale cache hit
+        opens its own clients, since the caller may close `client` first.
+        """
+        fetch = self._fetcher(sources, query, categories, limit, indexer_ids, deadline, client)
+        key = self.cache_key(sources, query, categories, limit, indexer_ids)
         
-        for app in apps:
-            try:
-                if app.app_type == "prowlarr":
-                    results = await self._search_prowlarr(db, app, query, categories, limit)
-                    all_results.extend(results)
-                    logger.info(f"[Prowlarr] Got {len(results)} results")
-                    
-                elif app.app_type == "jackett":
-                    results = await self._search_jackett(db, app, query, categories, limit, indexer_ids)
-                    all_results.extend(results)
-                    logger.info(f"[Jackett] Got {len(results)} results")
-                    
-            except Exception as e:
-                logger.error(f"Error searching {app.name}: {e}", exc_info=True)
-                continue
+        if use_cache:
+            refresh = self._fetcher(sources, query, categories, limit, indexer_ids, deadline) if client else None
+            (results, statuses), cache_state = await search_cache.get_or_fetch(key, fetch, refresh)
+            if cache_state != "miss":
+                logger.info(f"⚡ Search cache {cache_state} for '{query}' ({len(results)} results)")
+        else:
+            search_cache.record("bypassed")
+            (results, statuses), cacheable = await fetch()
+            if cacheable:
+                search_cache.store(key, (results, statuses))
+            cache_state = "bypass"
         
-        await db.commit()
+        return list(results), statuses, cache_state
+    
+    async def _collect(
+        self,
+        sources: List[Tuple[App, List[Indexer]]],
+        query: str,
+        categories: Optional[List[str]],
+        limit: int,
+        indexer_ids: Optional[List[int]],
+        deadline: Optional[float],
+        client: Optional[httpx.AsyncClient] = None
+    ) -> Tuple[List[SearchResult], List[Dict[str, Any]]]:
+        """Run a full search and return (filtered results, statuses)"""
+        all_results = []
+        statuses = []
+        async for results, source in self.stream_sources(
+            sources, query, categories, limit, indexer_ids, deadline, client
+        ):
+            all_results.extend(results)
+            statuses.append(source)
         
         logger.info(f"📊 Raw results: {len(all_results)}")
         
-        # STRICT filtering
-        filtered_results = [r for r in all_results if r.is_valid_media_file()]
-        filtered_count = len(all_results) - len(filtered_results)
+        filtered_results = self.filter_and_sort(all_results)
         
-        if filtered_count > 0:
-            logger.info(f"🗑️ Filtered {filtered_count} invalid files")
+        logger.info(f"✅ Returning {len(filtered_results)} valid results")
+        return filtered_results, statuses
+    
+    def _fetcher(
+        self,
+        sources: List[Tuple[App, List[Indexer]]],
+        query: str,
+        categories: Optional[List[str]],
+        limit: int,
+        indexer_ids: Optional[List[int]],
+        deadline: Optional[float],
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        """Build the cache fetch callable for a search (needs no DB session)"""
+        async def fetch():
+            results, statuses = await self._collect(
+                sources, query, categories, limit, indexer_ids, deadline, client
+            )
+            return (results, statuses), self.is_complete(statuses)
+        return fetch
+    
+    @staticmethod
+    def is_complete(statuses: List[Dict[str, Any]]) -> bool:
+        """
+        True if every source answered - only complete searches are cached
         
-        filtered_results.sort(key=lambda x: (-x.seeders, x.size_bytes))
+        Sources skipped by the circuit breaker don't make a search incomplete;
+        they would be skipped again on a fresh search.
+        """
+        return (
+            any(status["status"] == "ok" for status in statuses)
+            and all(status["status"] in ("ok", "skipped") for status in statuses)
+        )
+    
+    @staticmethod
+    def cache_key(
+        sources: List[Tuple[App, List[Indexer]]],
+        query: str,
+        categories: Optional[List[str]],
+        limit: int,
+        indexer_ids: Optional[List[int]]
+    ) -> Tuple:
+        """
+        Cache key: normalized query, categories, requested indexers, limit and
+        the set of enabled sources (so enabling/disabling an indexer misses)
+        """
+        source_set = tuple(
+            (app.id, tuple(sorted(idx.id for idx in indexers if idx.enabled)))
+            for app, indexers in sources
+        )
+        return search_cache.make_key(
+            query, categories or [], indexer_ids or [], limit, source_set
+        )
+    
+    def get_cached(
+        self,
+        sources: List[Tuple[App, List[Indexer]]],
+        query: str,
+        categories: Optional[List[str]] = None,
+        limit: int = 100,
+        indexer_ids: Optional[List[int]] = None,
+        deadline: Optional[float] = None
+    ) -> Tuple[Optional[Tuple[List[SearchResult], List[Dict[str, Any]]]], Optional[str]]:
+        """
+        Look up a search in the cache without fetching
         
-        logger.info(f"✅ Returning {len(filtered_results)} valid results")
+        Returns ((results, statuses), "hit" | "stale") or (None, None).
+        A stale hit refreshes in the background.
+        """
+        key = self.cache_key(sources, query, categories, limit, indexer_ids)
+        fetch = self._fetcher(sources, query, categories, limit, indexer_ids, deadline)
+        return search_cache.get(key, refresh=fetch)
+    
+    def remember(
+        self,
+        sources: List[Tuple[App, List[Indexer]]],
+        query: str,
+        results: List[SearchResult],
+        statuses: List[Dict[str, Any]],
+        categories: Optional[List[str]] = None,
+        limit: int = 100,
+        indexer_ids: Optional[List[int]] = None
+    ):
+        """Store raw results of a complete search (e.g. a finished stream)"""
+        if self.is_complete(statuses):
+            key = self.cache_key(sources, query, categories, limit, indexer_ids)
+            search_cache.store(key, (self.filter_and_sort(results), statuses))
+    
+    async def load_sources(self, db: AsyncSession) -> List[Tuple[App, List[Indexer]]]:
+        """
+        Enabled search apps with their indexers, from the indexer catalog
+        
+        Everything a search needs from the database is read here, so the
+        searches themselves can run concurrently (and outlive the request's
+        session when streaming). The catalog is cached in memory and
+        invalidated on writes, so this normally doesn't touch the database.
+        """
+        sources = await indexer_catalog.sources()
+        if not sources:
+            logger.warning("No enabled apps found")
+        return sources
+    
+    async def stream_sources(
+        self,
+        sources: List[Tuple[App, List[Indexer]]],
+        query: str,
+        categories: Optional[List[str]] = None,
+        limit: int = 100,
+        indexer_ids: Optional[List[int]] = None,
+        deadline: Optional[float] = None,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> AsyncIterator[Tuple[List[SearchResult], Dict[str, Any]]]:
+        """
+        Search every source concurrently, yielding (raw results, status) per
+        source as soon as it answers
+        
+        Each source gets `deadline` seconds from when its request is sent -
+        time spent queued in the indexer limiter doesn't count against it -
+        and is reported with a "timeout" status if it misses it. Results are
+        not filtered here.
+        """
+        if not sources:
+            return
+        
+        deadline = deadline or self.deadline
+        logger.info(f"🔍 Searching via {len(sources)} apps for: '{query}' (deadline {deadline}s)")
+        
+        pending = {
+            asyncio.create_task(
+                self._search_app(app, indexers, query, categories, limit, indexer_ids, client, deadline)
+            )
+            for app, indexers in sources
+        }
+        
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            
+            await indexer_health.flush_usage()
+        finally:
+            # Also reached when the consumer stops early (e.g. client disconnect)
+            for task in pending:
+                task.cancel()
+    
+    def filter_and_sort(self, results: List[SearchResult]) -> List[SearchResult]:
+        """
+        Merge cross-indexer duplicates, apply STRICT filtering (books only -
+        no TV, movies, video or software) and sort by seeders, then size
+        """
+        filtered_results = release_classifier.filter(result_merger.merge(results))
+        filtered_results.sort(key=lambda x: (-x.seeders, x.size_bytes))
         return filtered_results
     
+    @staticmethod
+    def _source_status(
+        app: App,
+        status: str,
+        started: float,
+        results: int = 0,
+        error: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build the per-source status entry for a search response"""
+        return {
+            "app_id": app.id,
+            "app_name": app.name,
+            "app_type": app.app_type,
+            "status": status,
+            "latency_ms": round((time.monotonic() - started) * 1000),
+            "results": results,
+            "error": error
+        }
+    
+    async def _search_app(
+        self,
+        app: App,
+        indexers: List[Indexer],
+        query: str,
+        categories: Optional[List[str]],
+        limit: int,
+        indexer_ids: Optional[List[int]] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        deadline: Optional[float] = None
+    ) -> Tuple[List[SearchResult], Dict[str, Any]]:
+        """
+        Search one app under its own deadline; never raises
+        
+        Apps searched in one request (Prowlarr, Jackett's aggregate endpoint)
+        get an adaptive timeout, are skipped while their circuit is open and
+        wait for a slot from the indexer limiter; per-tracker Jackett
+        searches do the same for each tracker. `deadline` (seconds) caps the
+        timeout; both start once the slot is acquired, so a search cancelled
+        while still queued records nothing.
+        """
+        started = time.monotonic()
+        
+        health_key = self._health_key(app)
+        timeout = self.timeout
+        if health_key:
+            if not indexer_health.allow(health_key):
+                logger.info(f"🚫 [{app.name}] Skipped - failing repeatedly, circuit open")
+                return [], self._source_status(app, "skipped", started, error="Skipped after repeated failures")
+            timeout = indexer_health.timeout_for(health_key, self.timeout)
+        timeout_error = f"Timed out after {timeout:.1f}s"
+        if deadline is not None and deadline < timeout:
+            timeout, timeout_error = deadline, f"Search deadline of {deadline}s exceeded"
+        
+        try:
+            trackers = None
+            async with (indexer_limiter.slot(health_key) if health_key else nullcontext()):
+                # Time spent queueing for the limiter is neither the app's
+                # latency nor part of its deadline
+                started = time.monotonic()
+                if app.app_type == "prowlarr":
+                    indexer_health.record_usage(idx.id for idx in indexers if idx.enabled)
+                    search = self._search_prowlarr(app, indexers, query, categories, limit, client)
+                    results = await asyncio.wait_for(search, timeout=timeout)
+                else:
+                    search = self._search_jackett(app, indexers, query, categories, limit, indexer_ids, client, started + timeout)
+                    results, trackers = await asyncio.wait_for(search, timeout=timeout)
+            
+            logger.info(f"[{app.name}] Got {len(results)} results")
+            
+            if trackers is None:
+                source = self._source_status(app, "ok", started, results=len(results))
+            else:
+                source = self._tracker_summary(app, trackers, started, len(results))
+            
+            if health_key:
+                indexer_health.record(health_key, "ok", source["latency_ms"])
+            return results, source
+            
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ [{app.name}] {timeout_error}")
+            source = self._source_status(app, "timeout", started, error=timeout_error)
+        except Exception as e:
+            logger.error(f"Error searching {app.name}: {e}", exc_info=True)
+            source = self._source_status(app, "error", started, error=str(e))
+        
+        if health_key:
+            indexer_health.record(health_key, source["status"], source["latency_ms"], source["error"])
+        return [], source
+    
+    @staticmethod
+    def _client(client: Optional[httpx.AsyncClient], **client_kwargs):
+        """The caller's shared client, or a new one for this search"""
+        if client is not None:
+            return nullcontext(client)
+        return httpx.AsyncClient(**client_kwargs)
+    
+    def shared_client(self) -> httpx.AsyncClient:
+        """
+        A client for running many searches over one connection pool
+        
+        Matches the per-search clients: no redirects, and certificate checks
+        off (as for every https app).
+        """
+        return httpx.AsyncClient(timeout=self.timeout, follow_redirects=False, verify=False)
+    
+    @staticmethod
+    def _health_key(app: App) -> Optional[str]:
+        """Health target for apps searched in one request (None for per-tracker Jackett)"""
+        if app.app_type != "prowlarr" and settings.jackett_per_tracker:
+            return None
+        return indexer_health.app_key(app.id)
+    
+    def _tracker_summary(
+        self,
+        app: App,
+        trackers: List[Dict[str, Any]],
+        started: float,
+        results: int
+    ) -> Dict[str, Any]:
+        """
+        Source status for a per-tracker Jackett search
+        
+        ok when every queried tracker answered (skipped ones don't count),
+        partial when some dropped out (not cached), otherwise
+        timeout/error/skipped for the app as a whole.
+        """
+        answered = [t for t in trackers if t["status"] == "ok"]
+        failed = [t for t in trackers if t["status"] in ("timeout", "error")]
+        skipped = [t for t in trackers if t["status"] == "skipped"]
+        
+        if answered:
+            status = "partial" if failed else "ok"
+        elif failed:
+            status = "timeout" if all(t["status"] == "timeout" for t in failed) else "error"
+        else:
+            status = "skipped" if skipped else "ok"
+        
+        error = None
+        if failed or skipped:
+            error = "; ".join(f"{t['indexer_name']}: {t['error']}" for t in failed + skipped)
+        
+        source = self._source_status(app, status, started, results=results, error=error)
+        source["indexers"] = trackers
+        return source
+    
     async def _search_prowlarr(
         self,
-        db: AsyncSession,
         app: App,
+        indexers: List[Indexer],
         query: str,
         categories: Optional[List[str]],
-        limit: int
+        limit: int,
+        client: Optional[httpx.AsyncClient] = None
     ) -> List[SearchResult]:
         """Search via Prowlarr API"""
-        try:
-            client_kwargs = {"timeout": self.timeout}
-            if app.base_url.startswith("https://"):
-                client_kwargs["verify"] = False
+        client_kwargs = {"timeout": self.timeout}
+        if app.base_url.startswith("https://"):
+            client_kwargs["verify"] = False
+        
+        async with self._client(client, **client_kwargs) as client:
+            params = {
+                "query": query,
+                "limit": limit,
+                "type": "search"
+            }
             
-            async with httpx.AsyncClient(**client_kwargs) as client:
-                params = {
-                    "query": query,
-                    "limit": limit,
-                    "type": "search"
-                }
-                
-                if categories:
-                    params["categories"] = ",".join(categories)
-                
-                response = await client.get(
-                    f"{app.base_url}/api/v1/search",
-                    params=params,
-                    headers={"X-Api-Key": app.api_key}
-                )
-                
-                if response.status_code != 200:
-                    logger.error(f"[Prowlarr] Failed: HTTP {response.status_code}")
-                    return []
-                
-                data = response.json()
-                
-                indexers_query = select(Indexer).where(Indexer.app_id == app.id)
-                indexers_result = await db.execute(indexers_query)
-                indexers = {idx.external_id: idx for idx in indexers_result.scalars().all()}
-                
-                results = []
-                for item in data:
-                    try:
-                        prowlarr_indexer_id = str(item.get("indexerId", ""))
-                        indexer = indexers.get(prowlarr_indexer_id)
-                        
-                        if not indexer:
-                            indexer_id = 0
-                            indexer_name = item.get("indexer", "Unknown")
-                        else:
-                            indexer_id = indexer.id
-                            indexer_name = indexer.name
-                        
-                        result = SearchResult(
-                            title=item.get("title", "Unknown"),
-                            download_url=item.get("downloadUrl") or item.get("magnetUrl", ""),
-                            indexer_id=indexer_id,
-                            indexer_name=indexer_name,
-                            size_bytes=item.get("size", 0),
-                            seeders=item.get("seeders", 0),
-                            protocol="torrent" if item.get("protocol") == "torrent" else "usenet",
-                            publish_date=datetime.fromisoformat(item["publishDate"].replace("Z", "+00:00")) if item.get("publishDate") else None,
-                            info_url=item.get("infoUrl"),
-                            categories=[cat.get("name") for cat in item.get("categories", [])]
-                        )
-                        results.append(result)
-                        
-                    except Exception as e:
-                        logger.error(f"Error parsing result: {e}")
-                        continue
-                
-                return results
-                
-        except Exception as e:
-            logger.error(f"Prowlarr error: {e}", exc_info=True)
-            return []
+            if categories:
+                params["categories"] = ",".join(categories)
+            
+            response = await client.get(
+                f"{app.base_url}/api/v1/search",
+                params=params,
+                headers={"X-Api-Key": app.api_key}
+            )
+            
+            if response.status_code != 200:
+                logger.error(f"[Prowlarr] Failed: HTTP {response.status_code}")
+                raise Exception(f"Prowlarr returned HTTP {response.status_code}")
+            
+            data = response.json()
+            
+            indexers = {idx.external_id: idx for idx in indexers}
+            
+            results = []
+            for item in data:
+                try:
+                    prowlarr_indexer_id = str(item.get("indexerId", ""))
+                    indexer = indexers.get(prowlarr_indexer_id)
+                    
+                    if not indexer:
+                        indexer_id = 0
+                        indexer_name = item.get("indexer", "Unknown")
+                    else:
+                        indexer_id = indexer.id
+                        indexer_name = indexer.name
+                    
+                    result = SearchResult(
+                        title=item.get("title", "Unknown"),
+                        download_url=item.get("downloadUrl") or item.get("magnetUrl", ""),
+                        indexer_id=indexer_id,
+                        indexer_name=indexer_name,
+                        size_bytes=item.get("size", 0),
+                        seeders=item.get("seeders", 0),
+                        protocol="torrent" if item.get("protocol") == "torrent" else "usenet",
+                        publish_date=datetime.fromisoformat(item["publishDate"].replace("Z", "+00:00")) if item.get("publishDate") else None,
+                        info_url=item.get("infoUrl"),
+                        categories=[cat.get("name") for cat in item.get("categories", [])],
+                        infohash=parse_infohash(item.get("infoHash"), item.get("magnetUrl"))
+                    )
+                    results.append(result)
+                    
+                except Exception as e:
+                    logger.error(f"Error parsing result: {e}")
+                    continue
+            
+            return results
     
     async def _search_jackett(
         self,
-        db: AsyncSession,
         app: App,
+        indexers: List[Indexer],
         query: str,
         categories: Optional[List[str]],
         limit: int,
-        indexer_ids: Optional[List[int]] = None
-    ) -> List[SearchResult]:
-        """Search via Jackett API"""
+        indexer_ids: Optional[List[int]] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        expires_at: Optional[float] = None
+    ) -> Tuple[List[SearchResult], Optional[List[Dict[str, Any]]]]:
+        """
+        Search via Jackett API
+        
+        With JACKETT_PER_TRACKER each enabled tracker is queried on its own
+        endpoint, so one slow tracker can't hold up the rest. `expires_at` is
+        when the app's deadline cancels the trackers.
+        
+        Returns:
+            (results, per-tracker statuses - None for the aggregate endpoint)
+        """
+        client_kwargs = {"timeout": self.timeout, "follow_redirects": False}
+        if app.base_url.startswith("https://"):
+            client_kwargs["verify"] = False
+        
+        async with self._client(client, **client_kwargs) as client:
+            params = {
+                "apikey": app.api_key,
+                "Query": query,
+                "limit": limit
+            }
+            
+            indexers = [
+                idx for idx in indexers
+                if idx.enabled and (not indexer_ids or idx.id in indexer_ids)
+            ]
+            
+            if not indexers:
+                logger.warning("[Jackett] No enabled indexers")
+                return [], None
+            
+            if categories:
+                params["Category[]"] = categories
+            
+            if settings.jackett_per_tracker:
+                return await self._search_jackett_trackers(client, app, indexers, params, expires_at)
+            
+            params["Tracker[]"] = [indexer.external_id for indexer in indexers]
+            indexer_health.record_usage(indexer.id for indexer in indexers)
+            
+            response = await jackett_sessions.request(
+                client, app, "GET",
+                f"{app.base_url}/api/v2.0/indexers/all/results",
+                params=params
+            )
+            
+            if response.status_code != 200:
+                logger.error(f"Jackett failed: HTTP {response.status_code}")
+                raise Exception(f"Jackett returned HTTP {response.status_code}")
+            
+            return self._parse_jackett_results(response.json(), indexers), None
+    
+    async def _search_jackett_trackers(
+        self,
+        client: httpx.AsyncClient,
+        app: App,
+        indexers: List[Indexer],
+        params: Dict[str, Any],
+        expires_at: Optional[float] = None
+    ) -> Tuple[List[SearchResult], List[Dict[str, Any]]]:
+        """
+        Query each Jackett tracker's own results endpoint concurrently
+        
+        At most JACKETT_MAX_CONCURRENCY requests run at once; each gets
+        JACKETT_TRACKER_TIMEOUT seconds once it starts (less for trackers whose
+        recent p95 is well below that). Trackers that fail or miss their
+        deadline are dropped and the rest are merged as they arrive; trackers
+        whose circuit is open are skipped without a request. Trackers still
+        running at `expires_at` are cancelled and reported as timeouts, and
+        the results already collected are returned.
+        """
+        semaphore = asyncio.Semaphore(max(1, settings.jackett_max_concurrency))
+        
+        async def query_tracker(indexer: Indexer):
+            health_key = indexer_health.indexer_key(indexer.id)
+            if not indexer_health.allow(health_key):
+                return [], self._tracker_status(indexer, "skipped", time.monotonic(), error="Skipped after repeated failures")
+            
+            tracker_timeout = indexer_health.timeout_for(health_key, settings.jackett_tracker_timeout)
+            indexer_health.record_usage([indexer.id])
+            
+            result = await self._query_tracker(client, app, indexer, params, semaphore, tracker_timeout, expires_at)
+            status = result[1]
+            indexer_health.record(health_key, status["status"], status["latency_ms"], status["error"])
+            return result
+        
+        results = []
+        statuses = []
+        started = time.monotonic()
+        tasks = {asyncio.create_task(query_tracker(indexer)): indexer for indexer in indexers}
         try:
-            client_kwargs = {"timeout": self.timeout, "follow_redirects": False}
-            if app.base_url.startswith("https://"):
-                client_kwargs["verify"] = False
+            # Stop just before the app/overall deadline so the trackers that
+            # answered are returned instead of being cancelled with the rest
+            timeout = None
+            if expires_at is not None:
+                timeout = max(0.0, expires_at - time.monotonic() - DEADLINE_SLACK)
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
             
-            async with httpx.AsyncClient(**client_kwargs) as client:
-                params = {
-                    "apikey": app.api_key,
-                    "Query": query,
-                    "limit": limit
-                }
-                
-                indexers_query = select(Indexer).where(
-                    Indexer.app_id == app.id,
-                    Indexer.enabled == True
-                )
-                if indexer_ids:
-                    indexers_query = indexers_query.where(Indexer.id.in_(indexer_ids))
-                
-                indexers_result = await db.execute(indexers_query)
-                indexers = indexers_result.scalars().all()
-                
-                if not indexers:
-                    logger.warning("[Jackett] No enabled indexers")
-                    return []
-                
-                for indexer in indexers:
-                    params.setdefault("Tracker[]", []).append(indexer.external_id)
-                
-                if categories:
-                    params["Category[]"] = categories
-                
-                cookies = None
-                if app.password:
-                    try:
-                        login_response = await client.post(
-                            f"{app.base_url}/UI/Dashboard",
-                            data={"password": app.password},
-                            headers={"Content-Type": "application/x-www-form-urlencoded"}
-                        )
-                        cookies = login_response.cookies
-                    except Exception as e:
-                        logger.warning(f"Jackett login failed: {e}")
-                
-                response = await client.get(
-                    f"{app.base_url}/api/v2.0/indexers/all/results",
-                    params=params,
-                    cookies=cookies
+            for task in tasks:
+                if task in done:
+                    tracker_results, tracker_status = task.result()
+                    results.extend(tracker_results)
+                    statuses.append(tracker_status)
+                else:
+                    indexer = tasks[task]
+                    logger.warning(f"⏱️ [{app.name}/{indexer.name}] Missed the search deadline")
+                    statuses.append(self._tracker_status(indexer, "timeout", started, error="Search deadline exceeded"))
+            
+            if pending:
+                # Cancelled trackers that had started record their own timeout
+                for task in pending:
+                    task.cancel()
+                await asyncio.wait(pending)
+        finally:
+            # Cancelled by the caller - stop the trackers before the client
+            # they share is closed
+            for task in tasks:
+                task.cancel()
+        
+        answered = sum(1 for status in statuses if status["status"] == "ok")
+        logger.info(f"[{app.name}] {answered}/{len(statuses)} trackers answered")
+        
+        return results, statuses
+    
+    async def _query_tracker(
+        self,
+        client: httpx.AsyncClient,
+        app: App,
+        indexer: Indexer,
+        params: Dict[str, Any],
+        semaphore: asyncio.Semaphore,
+        tracker_timeout: float,
+        expires_at: Optional[float] = None
+    ) -> Tuple[List[SearchResult], Dict[str, Any]]:
+        """
+        One tracker's results endpoint under its own deadline; never raises
+        
+        Cancelled at `expires_at` (the app's deadline, by
+        `_search_jackett_trackers`) it counts as a timeout; any other
+        cancellation (client gone) leaves health alone.
+        """
+        async with semaphore, indexer_limiter.slot(indexer_health.indexer_key(indexer.id)):
+            started = time.monotonic()
+            try:
+                response = await asyncio.wait_for(
+                    jackett_sessions.request(
+                        client, app, "GET",
+                        f"{app.base_url}/api/v2.0/indexers/{indexer.external_id}/results",
+                        params=params
+                    ),
+                    timeout=tracker_timeout
                 )
-                
                 if response.status_code != 200:
-                    logger.error(f"Jackett failed: HTTP {response.status_code}")
-                    return []
-                
-                data = response.json()
-                indexer_lookup = {idx.external_id: idx for idx in indexers}
+                    raise Exception(f"HTTP {response.status_code}")
+                results = self._parse_jackett_results(response.json(), [indexer])
+                return results, self._tracker_status(indexer, "ok", started, results=len(results))
+            except asyncio.CancelledError:
+                # The app's deadline hit first - still a timeout
+                if expires_at is not None and time.monotonic() >= expires_at - DEADLINE_SLACK:
+                    indexer_health.record(
+                        indexer_health.indexer_key(indexer.id), "timeout",
+                        (time.monotonic() - started) * 1000, "Search deadline exceeded"
+                    )
+                raise
+            except asyncio.TimeoutError:
+                logger.warning(f"⏱️ [{app.name}/{indexer.name}] Timed out after {tracker_timeout:.1f}s")
+                return [], self._tracker_status(indexer, "timeout", started, error=f"Timed out after {tracker_timeout:.1f}s")
+            except Exception as e:
+                logger.warning(f"[{app.name}/{indexer.name}] Search failed: {e}")
+                return [], self._tracker_status(indexer, "error", started, error=str(e))
+    
+    @staticmethod
+    def _tracker_status(
+        indexer: Indexer,
+        status: str,
+        started: float,
+        results: int = 0,
+        error: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build the per-tracker status entry nested in a Jackett source status"""
+        return {
+            "indexer_id": indexer.id,
+            "indexer_name": indexer.name,
+            "status": status,
+            "latency_ms": round((time.monotonic() - started) * 1000),
+            "results": results,
+            "error": error
+        }
+    
+    @staticmethod
+    def _parse_jackett_results(data: Dict[str, Any], indexers: List[Indexer]) -> List[SearchResult]:
+        """Convert a Jackett results payload into SearchResults"""
+        indexer_lookup = {idx.external_id: idx for idx in indexers}
+        
+        results = []
+        for item in data.get("Results", []):
+            try:
+                # TrackerId is the indexer id; Tracker is its display name
+                tracker_id = item.get("TrackerId") or item.get("Tracker")
+                indexer = indexer_lookup.get(tracker_id)
+                if not indexer and len(indexers) == 1:
+                    # Single-tracker endpoint - every result is from that tracker
+                    indexer = indexers[0]
                 
-                results = []
-                for item in data.get("Results", []):
-                    try:
-                        tracker_id = item.get("Tracker")
-                        indexer = indexer_lookup.get(tracker_id)
-                        
-                        if not indexer:
-                            indexer_id = 0
-                            indexer_name = tracker_id or "Unknown"
-                        else:
-                            indexer_id = indexer.id
-                            indexer_name = indexer.name
-                        
-                        result = SearchResult(
-                            title=item.get("Title", "Unknown"),
-                            download_url=item.get("MagnetUri") or item.get("Link", ""),
-                            indexer_id=indexer_id,
-                            indexer_name=indexer_name,
-                            size_bytes=item.get("Size", 0),
-                            seeders=item.get("Seeders", 0),
-                            protocol="torrent",
-                            publish_date=datetime.fromisoformat(item["PublishDate"]) if item.get("PublishDate") else None,
-                            info_url=item.get("Details"),
-                            categories=[str(cat) for cat in item.get("CategoryDesc", [])]
-                        )
-                        results.append(result)
-                        
-                    except Exception as e:
-                        logger.error(f"Error parsing result: {e}")
-                        continue
+                if not indexer:
+                    indexer_id = 0
+                    indexer_name = tracker_id or "Unknown"
+                else:
+                    indexer_id = indexer.id
+                    indexer_name = indexer.name
                 
-                return results
+                result = SearchResult(
+                    title=item.get("Title", "Unknown"),
+                    download_url=item.get("MagnetUri") or item.get("Link", ""),
+                    indexer_id=indexer_id,
+                    indexer_name=indexer_name,
+                    size_bytes=item.get("Size", 0),
+                    seeders=item.get("Seeders", 0),
+                    protocol="torrent",
+                    publish_date=datetime.fromisoformat(item["PublishDate"]) if item.get("PublishDate") else None,
+                    info_url=item.get("Details"),
+                    categories=[str(cat) for cat in item.get("CategoryDesc", [])],
+                    infohash=parse_infohash(item.get("InfoHash"), item.get("MagnetUri"))
+                )
+                results.append(result)
                 
-        except Exception as e:
-            logger.error(f"Jackett error: {e}", exc_info=True)
-            return []
+            except Exception as e:
+                logger.error(f"Error parsing result: {e}")
+                continue
+        
+        return results
 
 
 search_service = SearchService()
\ No newline at end of file
@@ -0,0 +1,192 @@
+# File: backend/app/services/torrent_resolver.py
+"""
+🧲 Torrent Resolver
+
+Turns whatever a search result links to into something a download client
+can add, with one request per link:
+
+- Magnet links need no request
+- Indexer links (Prowlarr/Jackett `/download?apikey=...`, tracker .torrent
+  URLs) are fetched once without following redirects automatically, and the
+  answer is classified: redirect to a magnet, redirect to another URL
+  (followed, up to MAX_REDIRECTS hops), a magnet in the body, or .torrent
+  data (checked to be a bencoded torrent, capped at TORRENT_MAX_SIZE)
+- Resolved links are cached by URL and by infohash (TORRENT_CACHE_SIZE
+  entries for TORRENT_CACHE_TTL seconds), and concurrent resolves of the
+  same URL share one request - so the already-grabbed check and the
+  download client's add don't fetch the same .torrent twice. .torrent
+  files over TORRENT_CACHE_MAX_FILE_SIZE are not cached, so each cache
+  holds at most TORRENT_CACHE_SIZE x TORRENT_CACHE_MAX_FILE_SIZE bytes
+"""
+
+import hashlib
+import logging
+from typing import Dict, Optional
+from urllib.parse import urljoin
+
+import httpx
+
+from backend.app.config import settings
+from backend.app.services.result_merger import parse_infohash
+from backend.app.services.search_cache import SearchCache
+
+logger = logging.getLogger(__name__)
+
+MAX_REDIRECTS = 5
+
+
+def torrent_infohash(data: bytes) -> Optional[str]:
+    """SHA-1 of the bencoded `info` dictionary of a .torrent file (None if malformed)"""
+
+    def skip(position: int) -> int:
+        # Position just after the bencoded value starting at `position`
+        # (iterative, so deeply nested lists can't exhaust the stack)
+        depth = 0
+        while True:
+            token = data[position:position + 1]
+            if token == b"i":
+                position = data.index(b"e", position) + 1
+            elif token in (b"l", b"d"):
+                depth += 1
+                position += 1
+                continue
+            elif token == b"e" and depth:
+                depth -= 1
+                position += 1
+            else:
+                colon = data.index(b":", position)
+                length = data[position:colon]
+                if not length.isdigit():
+                    raise ValueError("Bad string length")
+                position = colon + 1 + int(length)
+            if depth == 0:
+                return position
+
+    try:
+        if data[:1] != b"d":
+            return None
+        position = 1
+        while data[position:position + 1] != b"e":
+            key_end = skip(position)
+            value_end = skip(key_end)
+            if data[position:key_end] == b"4:info":
+                return hashlib.sha1(data[key_end:value_end]).hexdigest()
+            position = value_end
+    except (ValueError, IndexError):
+        return None
+    return None
+
+
+class ResolvedTorrent:
+    """A magnet link or .torrent data, with its infohash when known"""
+
+    __slots__ = ("kind", "payload", "infohash")
+
+    def __init__(self, kind: str, payload, infohash: Optional[str]):
+        self.kind = kind  # "magnet" or "file"
+        self.payload = payload  # magnet URI (str) or .torrent data (bytes)
+        self.infohash = infohash
+
+
+class TorrentResolver:
+    """Resolves and caches torrent links"""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._by_url = SearchCache(max_entries=settings.torrent_cache_size, ttl=settings.torrent_cache_ttl, stale_ttl=0)
+        self._by_hash = SearchCache(max_entries=settings.torrent_cache_size, ttl=settings.torrent_cache_ttl, stale_ttl=0)
+        self.stats = {"requests": 0, "magnets": 0, "files": 0, "hash_hits": 0}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=30.0)
+        return self._client
+
+    async def resolve(self, url: str, infohash: Optional[str] = None) -> ResolvedTorrent:
+        """
+        Resolve a link (cached)
+
+        `infohash`, when the search result already knows it, finds a torrent
+        cached under another indexer's URL without any request.
+        """
+        if url.startswith("magnet:"):
+            return ResolvedTorrent("magnet", url, parse_infohash(url))
+
+        if infohash:
+            cached, _ = self._by_hash.get(infohash.lower())
+            if cached is not None:
+                self.stats["hash_hits"] += 1
+                # The client add resolves by URL - let it find this one too
+                self._by_url.store(url, cached)
+                return cached
+
+        async def fetch():
+            resolved = await self._fetch(url)
+            return resolved, self._cacheable(resolved)
+
+        resolved, _ = await self._by_url.get_or_fetch(url, fetch)
+        if resolved.infohash and self._cacheable(resolved):
+            self._by_hash.store(resolved.infohash, resolved)
+        return resolved
+
+    @staticmethod
+    def _cacheable(resolved: ResolvedTorrent) -> bool:
+        # Large .torrent files (whole-series packs) are only shared by
+        # concurrent resolves, not kept - caps the cache's memory
+        return resolved.kind == "magnet" or len(resolved.payload) <= settings.torrent_cache_max_file_size
+
+    async def _fetch(self, url: str) -> ResolvedTorrent:
+        """Fetch a link once (plus redirect hops) and classify the answer"""
+        for _ in range(MAX_REDIRECTS + 1):
+            if url.startswith("magnet:"):
+                self.stats["magnets"] += 1
+                logger.info(f"🧲 Link resolved to a magnet")
+                return ResolvedTorrent("magnet", url, parse_infohash(url))
+            if not (url.startswith("http://") or url.startswith("https://")):
+                logger.warning(f"⚠️ Unexpected torrent link: {url[:100]}")
+                raise Exception("Only magnet links and HTTP(S) URLs are supported")
+
+            self.stats["requests"] += 1
+            async with self.client.stream("GET", url, follow_redirects=False) as response:
+                if response.is_redirect:
+                    url = urljoin(url, response.headers.get("location", ""))
+                    continue
+                if response.status_code >= 400:
+                    raise Exception(f"Failed to download torrent file: HTTP {response.status_code}")
+
+                declared = int(response.headers.get("content-length") or 0)
+                if declared > settings.torrent_max_size:
+                    raise Exception(f"Torrent file too large ({declared} bytes)")
+                data = bytearray()
+                async for chunk in response.aiter_bytes():
+                    data.extend(chunk)
+                    if len(data) > settings.torrent_max_size:
+                        raise Exception(f"Torrent file larger than {settings.torrent_max_size} bytes")
+
+            data = bytes(data)
+            if data.startswith(b"magnet:"):
+                url = data.decode("utf-8", "replace").strip()
+                continue
+
+            infohash = torrent_infohash(data)
+            if infohash is None:
+                raise Exception("Link did not return a .torrent file or magnet")
+            self.stats["files"] += 1
+            logger.info(f"📥 Downloaded .torrent ({len(data)} bytes, {infohash})")
+            return ResolvedTorrent("file", data, infohash)
+
+        raise Exception("Too many redirects")
+
+    async def close(self):
+        """Close the HTTP client (app shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def status(self) -> Dict[str, object]:
+        return {"stats": dict(self.stats), "cache": self._by_url.metrics()}
+
+
+# Singleton instance
+torrent_resolver = TorrentResolver()